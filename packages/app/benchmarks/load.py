@@ -0,0 +1,455 @@
+"""
+Load test of the web application, replaying a mix of requests from concurrent clients against a synthetic plant.
+
+Run from `packages/app`, optionally serving the app with Hypercorn rather than calling it in-process:
+
+    uv run -m benchmarks.load
+    uv run -m benchmarks.load --blocks 100000 --clients 32 --requests 2000
+    uv run -m benchmarks.load --server --mix search=2 blocks=1 calc=1 --depth 3
+    uv run -m benchmarks.load --dumps ../../icc_dumps --save results.json
+
+Each route of the mix is loaded on its own, so that memory growth can be put down to it, then the whole mix is loaded
+together. Requests are generated from a seed, so runs with the same arguments replay the same requests. Memory is the
+resident set size of the process serving the app, which is read from `/proc` and so only reported on Linux.
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import random
+import socket
+import sys
+import time
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Protocol
+from urllib.parse import urlencode
+
+import uvloop
+from app.run import create_app
+from foxdata import initialise_data
+from foxdata.models import Data
+from foxdata.synthetic import PlantSpec, write_dumps
+from quart.typing import TestAppProtocol
+
+SEARCH_FIELDS = ("COMPOUND", "NAME", "TYPE", "CP", "IOM_ID")
+SEARCH_TYPES = ("", "AIN", "AOUT", "PIDA", "CALC")
+HISTOGRAM_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, float("inf"))
+"""Upper bounds of latency histogram buckets in seconds."""
+
+DEFAULT_MIX = (("search", 1.0), ("blocks", 1.0), ("calc", 1.0))
+STARTUP_TIMEOUT = 300
+
+
+@dataclass(frozen=True)
+class Request:
+    route: str
+    method: str
+    path: str
+    headers: dict[str, str] = field(default_factory=dict)
+    form: dict[str, str] | None = None
+
+
+@dataclass
+class Targets:
+    """Blocks of the plant that requests are made for."""
+
+    compounds: list[str]
+    blocks: list[tuple[str, str]]
+    calcs: list[tuple[str, str]]
+
+    @staticmethod
+    def from_data(data: Data) -> "Targets":
+        blocks = [(block.compound, block.name) for block in data.blocks if block["TYPE"] != "COMPND"]
+        calcs = [(block.compound, block.name) for block in data.blocks if block["TYPE"] == "CALC"]
+        compounds = sorted({compound for compound, _ in blocks})
+
+        if not blocks or not calcs:
+            description = "plant must include at least one CALC block"
+            raise RuntimeError(description)
+
+        return Targets(compounds, blocks, calcs)
+
+
+def search_request(rng: random.Random, targets: Targets, _depth: int) -> Request:
+    """Filter the search table as typing into a search input does."""
+    compound = rng.choice(targets.compounds)
+    fields = dict.fromkeys(SEARCH_FIELDS, "")
+    fields["COMPOUND"] = compound[: rng.randrange(len(compound) // 2, len(compound) + 1)]
+    fields["TYPE"] = rng.choice(SEARCH_TYPES)
+    trigger = f"query-{rng.choice(('COMPOUND', 'TYPE'))}"
+    headers = {
+        "HX-Request": "true",
+        "HX-Current-URL": "http://localhost/search",
+        "HX-Target": "table-container",
+        "HX-Trigger": trigger,
+        "HX-Trigger-Name": trigger,
+    }
+    form = {f"query-{key}": value for key, value in fields.items()} | {"page": "1", "lines": "18"}
+    return Request("search", "POST", "/search/table", headers, form)
+
+
+def blocks_request(rng: random.Random, targets: Targets, depth: int) -> Request:
+    """Fetch a connection diagram as the diagram page does."""
+    compound, name = rng.choice(targets.blocks)
+    return Request("blocks", "GET", f"/blocks/{compound}/{name}/dot?{urlencode({'depth': depth})}")
+
+
+def calc_request(rng: random.Random, targets: Targets, _depth: int) -> Request:
+    """Fetch a CALC logic flow diagram as the diagram page does."""
+    compound, name = rng.choice(targets.calcs)
+    return Request("calc", "GET", f"/calc/{compound}/{name}/dot")
+
+
+ROUTES: dict[str, Callable[[random.Random, Targets, int], Request]] = {
+    "search": search_request,
+    "blocks": blocks_request,
+    "calc": calc_request,
+}
+
+
+def generate_requests(
+    mix: tuple[tuple[str, float], ...],
+    targets: Targets,
+    count: int,
+    depth: int,
+    seed: int,
+) -> list[Request]:
+    rng = random.Random(seed)  # noqa: S311
+    routes, weights = zip(*mix, strict=True)
+    return [ROUTES[route](rng, targets, depth) for route in rng.choices(routes, weights, k=count)]
+
+
+class Client(Protocol):
+    async def send(self, request: Request) -> int:
+        """Send a request, returning the status code of the response."""
+        ...
+
+
+class AppClient:
+    """Calls the app in-process with the Quart test client, which keeps its own session cookie."""
+
+    def __init__(self, test_app: TestAppProtocol) -> None:
+        self.client = test_app.test_client()
+
+    async def send(self, request: Request) -> int:
+        response = await self.client.open(
+            request.path, method=request.method, headers=request.headers, form=request.form
+        )
+        await response.get_data()
+        return response.status_code
+
+
+class HttpClient:
+    """Sends requests over a keep-alive HTTP connection, in a thread so that clients block independently."""
+
+    def __init__(self, host: str, port: int, executor: ThreadPoolExecutor) -> None:
+        self.connection = http.client.HTTPConnection(host, port, timeout=STARTUP_TIMEOUT)
+        self.executor = executor
+        self.cookie: str | None = None
+
+    def send_sync(self, request: Request) -> int:
+        headers = dict(request.headers)
+        body = None
+
+        if request.form is not None:
+            body = urlencode(request.form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        if self.cookie is not None:
+            headers["Cookie"] = self.cookie
+
+        self.connection.request(request.method, request.path, body, headers)
+        response = self.connection.getresponse()
+        response.read()
+
+        if cookie := response.getheader("Set-Cookie"):
+            self.cookie = cookie.split(";", 1)[0]
+
+        return response.status
+
+    async def send(self, request: Request) -> int:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.send_sync, request)
+
+
+@dataclass
+class RouteResult:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def percentile(self, q: float) -> float:
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+
+    def histogram(self) -> list[int]:
+        counts = [0] * len(HISTOGRAM_BUCKETS)
+
+        for latency in self.latencies:
+            counts[next(i for i, bound in enumerate(HISTOGRAM_BUCKETS) if latency <= bound)] += 1
+
+        return counts
+
+
+@dataclass
+class Phase:
+    """Results of loading the app with a set of requests, by route."""
+
+    name: str
+    seconds: float
+    rss_before: int | None
+    rss_after: int | None
+    routes: dict[str, RouteResult]
+
+    @property
+    def requests(self) -> int:
+        return sum(len(result.latencies) for result in self.routes.values())
+
+    @property
+    def rss_growth(self) -> int | None:
+        return None if self.rss_before is None or self.rss_after is None else self.rss_after - self.rss_before
+
+    def to_dict(self) -> dict:
+        return {
+            "seconds": self.seconds,
+            "requests": self.requests,
+            "throughput": self.requests / self.seconds,
+            "rss_before": self.rss_before,
+            "rss_growth": self.rss_growth,
+            "routes": {
+                route: {
+                    "requests": len(result.latencies),
+                    "errors": result.errors,
+                    **{f"p{q}": result.percentile(q / 100) for q in (50, 90, 99)},
+                    "max": max(result.latencies, default=0.0),
+                    "histogram": dict(zip(map(str, HISTOGRAM_BUCKETS), result.histogram(), strict=True)),
+                }
+                for route, result in self.routes.items()
+            },
+        }
+
+
+def resident_memory(pid: int) -> int | None:
+    """Resident set size of a process in bytes, or `None` where `/proc` isn't available."""
+    try:
+        pages = int(Path(f"/proc/{pid}/statm").read_text().split()[1])
+    except OSError:
+        return None
+    else:
+        return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+async def load(name: str, clients: list[Client], requests: list[Request], pid: int) -> Phase:
+    """Send requests from every client concurrently, each client waiting for its response before sending another."""
+    pending = iter(requests)
+    routes = {request.route: RouteResult() for request in requests}
+
+    async def run(client: Client) -> None:
+        for request in pending:
+            start = time.perf_counter()
+
+            try:
+                status = await client.send(request)
+            except (OSError, http.client.HTTPException):
+                status = None
+
+            result = routes[request.route]
+            result.latencies.append(time.perf_counter() - start)
+            result.errors += status is None or status >= 400  # noqa: PLR2004
+
+    rss_before = resident_memory(pid)
+    start = time.perf_counter()
+    await asyncio.gather(*(run(client) for client in clients))
+    seconds = time.perf_counter() - start
+    return Phase(name, seconds, rss_before, resident_memory(pid), routes)
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3)):
+        if seconds >= scale:
+            return f"{seconds / scale:.1f} {unit}"
+
+    return f"{seconds / 1e-6:.0f} us"
+
+
+def format_bytes(size: int | None) -> str:
+    return "-" if size is None else f"{size / 2**20:+.1f} MB"
+
+
+def report(phase: Phase) -> None:
+    print(  # noqa: T201
+        f"\n{phase.name}: {phase.requests} requests in {phase.seconds:.2f} s,"
+        f" {phase.requests / phase.seconds:.1f} req/s, memory {format_bytes(phase.rss_growth)}"
+    )
+
+    for route, result in phase.routes.items():
+        print(  # noqa: T201
+            f"  {route:<8} {len(result.latencies):>7} requests {result.errors:>5} errors"
+            f"  p50 {format_seconds(result.percentile(0.5)):>9}  p90 {format_seconds(result.percentile(0.9)):>9}"
+            f"  p99 {format_seconds(result.percentile(0.99)):>9}  max {format_seconds(max(result.latencies)):>9}"
+        )
+        counts = result.histogram()
+        peak = max(counts)
+
+        for bound, count in zip(HISTOGRAM_BUCKETS, counts, strict=True):
+            if count:
+                label = f"<= {format_seconds(bound)}" if bound != float("inf") else "slower"
+                print(f"    {label:>11} {count:>7} {'#' * max(1, round(40 * count / peak))}")  # noqa: T201
+
+
+@contextmanager
+def dataset(args: Namespace) -> Iterator[tuple[Path, Path]]:
+    """Provide the ICC dumps to serve and a path for their data pickle, generating a synthetic plant if not given."""
+    with TemporaryDirectory(prefix="foxconnect-load-") as directory:
+        if (dumps := args.dumps) is None:
+            dumps = Path(directory) / "dumps"
+            write_dumps(dumps, PlantSpec(blocks=args.blocks, seed=args.seed))
+
+        yield dumps, Path(directory) / "data.pickle"
+
+
+def environment(dumps: Path, data_pickle: Path) -> dict[str, str]:
+    """Environment that the app is configured from, see `config.init_app`."""
+    return {
+        "QUART_FOXDATA_ICC_DUMPS_PATH": json.dumps(str(dumps.resolve())),
+        "QUART_FOXDATA_DATA_PICKLE_PATH": json.dumps(str(data_pickle.resolve())),
+        "QUART_SECRET_KEY": json.dumps("load test"),
+    }
+
+
+@asynccontextmanager
+async def serve_in_process(clients: int) -> AsyncIterator[tuple[list[Client], int]]:
+    app = create_app()
+
+    async with app.test_app() as test_app:
+        yield [AppClient(test_app) for _ in range(clients)], os.getpid()
+
+
+@asynccontextmanager
+async def serve_hypercorn(clients: int, env: dict[str, str], log: Path) -> AsyncIterator[tuple[list[Client], int]]:
+    """Serve the app with Hypercorn in a subprocess, as the production server does."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    command = ("-m", "app", "--host", "127.0.0.1", "--port", str(port))
+
+    with log.open("w") as file:
+        server = await asyncio.create_subprocess_exec(
+            sys.executable, *command, env=os.environ | env, stdout=file, stderr=file
+        )
+
+        try:
+            deadline = time.monotonic() + STARTUP_TIMEOUT
+
+            while True:
+                if server.returncode is not None or time.monotonic() > deadline:
+                    description = f"server failed to start, see {log}"
+                    raise RuntimeError(description)
+
+                try:
+                    _, writer = await asyncio.open_connection("127.0.0.1", port)
+                    writer.close()
+                    break
+                except OSError:
+                    await asyncio.sleep(0.2)
+
+            with ThreadPoolExecutor(max_workers=clients) as executor:
+                yield [HttpClient("127.0.0.1", port, executor) for _ in range(clients)], server.pid
+        finally:
+            if server.returncode is None:
+                server.terminate()
+                await server.wait()
+
+
+def route_weight(value: str) -> tuple[str, float]:
+    """Parse a `ROUTE=WEIGHT` pair of a request mix."""
+    route, _, weight = value.partition("=")
+
+    if route not in ROUTES:
+        description = f"unknown route '{route}', expected one of {', '.join(ROUTES)}"
+        raise ArgumentTypeError(description)
+
+    try:
+        return route, float(weight or 1)
+    except ValueError:
+        description = f"expected ROUTE=WEIGHT, got '{value}'"
+        raise ArgumentTypeError(description) from None
+
+
+async def run(args: Namespace, targets: Targets, env: dict[str, str], log: Path) -> list[Phase]:
+    mix = tuple((route, weight) for route, weight in args.mix if weight > 0)
+    loads = [(route, ((route, 1.0),)) for route, _ in mix]
+
+    if len(mix) > 1:
+        loads.append(("mix", mix))
+
+    server = serve_hypercorn(args.clients, env, log) if args.server else serve_in_process(args.clients)
+
+    async with server as (clients, pid):
+        # The app is configured from a .env file ahead of the environment, which could point it at other data
+        check = ROUTES["calc"](random.Random(args.seed), targets, args.depth)  # noqa: S311
+
+        if (status := await clients[0].send(check)) != 200:  # noqa: PLR2004
+            description = f"app isn't serving the plant, {check.path} returned {status}"
+            raise RuntimeError(description)
+
+        for route, _ in mix:
+            warmup = generate_requests(((route, 1.0),), targets, args.warmup, args.depth, args.seed - 1)
+            await load(route, clients, warmup, pid)
+
+        phases = []
+
+        for i, (name, load_mix) in enumerate(loads):
+            requests = generate_requests(load_mix, targets, args.requests, args.depth, args.seed + i)
+            phase = await load(name, clients, requests, pid)
+            report(phase)
+            phases.append(phase)
+
+        return phases
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dumps", type=Path, help="directory containing ICC dumps, a synthetic plant if not given")
+    parser.add_argument("--blocks", type=int, default=10000, help="number of blocks in the synthetic plant")
+    parser.add_argument("--server", action="store_true", help="serve the app with Hypercorn rather than in-process")
+    parser.add_argument("--clients", type=int, default=16, help="number of concurrent clients")
+    parser.add_argument("--requests", type=int, default=500, help="number of requests in each phase")
+    parser.add_argument("--warmup", type=int, default=20, help="number of unmeasured requests to each route first")
+    parser.add_argument(
+        "--mix",
+        type=route_weight,
+        nargs="+",
+        default=DEFAULT_MIX,
+        metavar="ROUTE=WEIGHT",
+        help=f"proportion of requests to each route, of {', '.join(ROUTES)}",
+    )
+    parser.add_argument("--depth", type=int, default=2, help="depth of connection diagrams")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic plant and requests")
+    parser.add_argument("--save", type=Path, help="path to save results to as JSON")
+    args = parser.parse_args()
+
+    with dataset(args) as (dumps, data_pickle):
+        # The app is configured from the environment, and parses the plant from the pickle written here
+        env = environment(dumps, data_pickle)
+        os.environ.update(env)
+        targets = Targets.from_data(initialise_data(data_pickle, dumps.glob("*/*.d")))
+        phases = uvloop.run(run(args, targets, env, data_pickle.with_name("server.log")))
+
+    if args.save is not None:
+        results = {
+            "server": "hypercorn" if args.server else "in-process",
+            "clients": args.clients,
+            "phases": {phase.name: phase.to_dict() for phase in phases},
+        }
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,13 @@ from foxdata.models import Block
 from quart import Blueprint, Quart, Request, make_response, render_template, request
 from werkzeug.exceptions import NotFound
 
-from app.extensions.foxdata import get_block_from_name
+from app.extensions.foxdata import get_block_from_hash, get_block_from_name, get_connectivity, get_related_blocks
 from app.extensions.htmx import Response
 
-from .graphing import create_dot
+from .graphing import create_dot, create_path_dot
+
+DEFAULT_PATH_HOPS = 10
+MAX_PATH_HOPS = 50
 
 bp = Blueprint("blocks", __name__, template_folder="templates", static_folder="static", url_prefix="/blocks")
 
@@ -35,10 +38,58 @@ def get_depth(request: Request) -> int:
     return max(0, min(5, request.args.get("depth", default=1, type=int)))
 
 
+def get_hops(request: Request) -> int:
+    """Retrieve and validate hop limit parameter for path queries from request args."""
+    return max(1, min(MAX_PATH_HOPS, request.args.get("hops", default=DEFAULT_PATH_HOPS, type=int)))
+
+
+def get_traversal_depth(request: Request) -> int | None:
+    """Retrieve optional traversal depth parameter from request args, unlimited if not given."""
+    depth = request.args.get("depth", default=None, type=int)
+    return None if depth is None else max(1, depth)
+
+
+def serialise_related(distances: dict[int, int]) -> list[dict[str, str | int]]:
+    """Serialise related blocks and their distance in hops for a JSON response."""
+    return [
+        {"compound": b.compound, "name": b.name, "type": b.type, "distance": d}
+        for b, d in get_related_blocks(distances)
+    ]
+
+
 @bp.route("/<compound>/<block>/detail")
 async def view_detail(compound: str, block: str) -> str:
     """View block detail."""
-    return await render_template("view_detail.html.j2", obj=get_obj(compound, block))
+    obj = get_obj(compound, block)
+    feedback_loop = sorted(filter(None, map(get_block_from_hash, get_connectivity().loop(hash(obj)))), key=repr)
+    return await render_template("view_detail.html.j2", obj=obj, feedback_loop=feedback_loop)
+
+
+@bp.route("/<compound>/<block>/connectivity")
+async def connectivity(compound: str, block: str) -> dict:
+    """Serve precomputed connectivity analytics of the block as JSON."""
+    block_hash = hash(get_obj(compound, block))
+    analytics = get_connectivity()
+    return {
+        "fan_in": analytics.fan_in(block_hash),
+        "fan_out": analytics.fan_out(block_hash),
+        "component_size": len(analytics.component(block_hash)),
+        "loop": sorted(repr(b) for b in filter(None, map(get_block_from_hash, analytics.loop(block_hash)))),
+    }
+
+
+@bp.route("/<compound>/<block>/upstream")
+async def upstream(compound: str, block: str) -> dict:
+    """Serve all blocks transitively feeding the block as JSON, optionally limited by depth."""
+    distances = get_connectivity().upstream(hash(get_obj(compound, block)), get_traversal_depth(request))
+    return {"blocks": serialise_related(distances)}
+
+
+@bp.route("/<compound>/<block>/downstream")
+async def downstream(compound: str, block: str) -> dict:
+    """Serve all blocks transitively fed by the block as JSON, optionally limited by depth."""
+    distances = get_connectivity().downstream(hash(get_obj(compound, block)), get_traversal_depth(request))
+    return {"blocks": serialise_related(distances)}
 
 
 @bp.route("/<compound>/<block>/diagram")
@@ -51,3 +102,17 @@ async def view_diagram(compound: str, block: str) -> str:
 async def dot(compound: str, block: str) -> Response:
     """Construct diagram in DOT format and serve as plain text."""
     return await serve_plain_text(await create_dot(get_obj(compound, block), get_depth(request)))
+
+
+@bp.route("/<compound>/<block>/paths/<sink_compound>/<sink_block>/dot")
+async def paths_dot(compound: str, block: str, sink_compound: str, sink_block: str) -> Response:
+    """Construct diagram of the shortest paths from one block to another in DOT format and serve as plain text."""
+    source = get_obj(compound, block)
+    sink = get_obj(sink_compound, sink_block)
+    hops = get_hops(request)
+
+    if not (positions := get_connectivity().paths(hash(source), hash(sink), hops)):
+        description = f'No path from "{source!r}" to "{sink!r}" within {hops} hops.'
+        raise NotFound(description)
+
+    return await serve_plain_text(await create_path_dot(source, sink, positions))
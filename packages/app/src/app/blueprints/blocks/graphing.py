@@ -1,8 +1,8 @@
 from foxdata.models import Block, Connection
 from quart import render_template
-from utils import Stringable
+from utils import DotGraph
 
-from app.extensions.foxdata import get_block_from_ref
+from app.extensions.foxdata import get_block_from_hash, get_block_from_ref
 
 
 def create_graph(root: Block, depth: int) -> tuple[set[Block], set[Connection]]:
@@ -27,8 +27,33 @@ def create_graph(root: Block, depth: int) -> tuple[set[Block], set[Connection]]:
     return (blocks, connections)
 
 
+def create_path_graph(positions: dict[int, int]) -> tuple[set[Block], set[Connection]]:
+    """Resolve blocks on paths and the connections between consecutive blocks along those paths."""
+    blocks = {block for block_hash in positions if (block := get_block_from_hash(block_hash)) is not None}
+    connections = {
+        c
+        for block in blocks
+        for c in block.connections
+        if c.source.matches_block(block) and positions.get(c.sink.block_hash) == positions[hash(block)] + 1
+    }
+    return (blocks, connections)
+
+
 async def create_dot(root: Block, depth: int) -> str:
     """Create a diagram in DOT format based on a graph of Block objects."""
+    (blocks, connections) = create_graph(root, depth)
+    return await render_dot(f"{root.compound}__{root.name}__depth-{depth}", blocks, connections, {root})
+
+
+async def create_path_dot(source: Block, sink: Block, positions: dict[int, int]) -> str:
+    """Create a diagram in DOT format of the blocks and connections on paths between two blocks."""
+    (blocks, connections) = create_path_graph(positions)
+    name = f"{source.compound}__{source.name}__to__{sink.compound}__{sink.name}"
+    return await render_dot(name, blocks, connections, {source, sink})
+
+
+async def render_dot(name: str, blocks: set[Block], connections: set[Connection], highlighted: set[Block]) -> str:
+    """Render Block and Connection objects into a diagram in DOT format, highlighting the given blocks."""
     origin_colour = "#ffd84d"
     other_colour = "#d4cfca"
     appearance = {
@@ -43,13 +68,12 @@ async def create_dot(root: Block, depth: int) -> str:
         "cell_spacing": 6,
     }
 
-    (blocks, connections) = create_graph(root, depth)
-    diagram = DotGraph(f"{root.compound}__{root.name}__depth-{depth}", rankdir="LR", ranksep=3, bgcolor="transparent")
+    diagram = DotGraph(name, rankdir="LR", ranksep=3, bgcolor="transparent")
 
     for block in blocks:
         sourced_p = sorted({c.source.parameter for c in block.connections if c.source.matches_block(block)})
         sinked_p = sorted({c.sink.parameter for c in block.connections if c.sink.matches_block(block)})
-        fillcolor = origin_colour if block == root else other_colour
+        fillcolor = origin_colour if block in highlighted else other_colour
         label = await render_template(
             "graph_node_label.html.j2",
             len=len,
@@ -76,87 +100,3 @@ async def create_dot(root: Block, depth: int) -> str:
         diagram.add_edge(source, sink, dir="forward", tooltip=tooltip)
 
     return diagram.to_string()
-
-
-def quote_if_necessary(p: Stringable) -> str:
-    """
-    If `p` is not wrapped in `'`, `"`, or `<<>>`, escape double quotes and new line characters
-    and wrap `p` in double quotes.
-    """
-
-    def is_wrapped(p: str, s: str, e: str | None = None) -> bool:
-        return p.startswith(s) and p.endswith(s) if not e else p.startswith(s) and p.endswith(e)
-
-    if isinstance(p, str):
-        if is_wrapped(p, "<<", ">>") or is_wrapped(p, '"') or is_wrapped(p, "'"):
-            return p
-
-        else:
-            replace = {
-                '"': r"\"",
-                "\n": r"\n",
-                "\r": r"\r",
-            }
-
-            for a, b in replace.items():
-                p = p.replace(a, b)
-
-    return f'"{p}"'
-
-
-class DotChild:
-    """Represents a child of a DOT graph, ie. node/edge."""
-
-    def __init__(self, name: str, **attrs: Stringable) -> None:
-        self.name = name
-        self.attributes = dict(attrs)
-
-    def to_string(self) -> str:
-        output = str(self.name)
-
-        if self.attributes:
-            output += "[" + ", ".join([f"{k}={quote_if_necessary(v)}" for k, v in self.attributes.items()]) + "]"
-
-        return output + ";"
-
-
-class DotGraph:
-    """Represents a DOT graph and children."""
-
-    INDENT = " " * 4
-
-    def __init__(
-        self,
-        name: str = "diagram",
-        *,
-        graph_type: str = "graph",
-        strict: bool = False,
-        **attrs: Stringable,
-    ) -> None:
-        self.name = name
-        self.graph_type = graph_type
-        self.strict = strict
-        self.attributes = dict(attrs)
-        self.nodes = []
-        self.edges = []
-
-    def add_node(self, name: str, **attrs: Stringable) -> None:
-        self.nodes.append(DotChild(name, **attrs))
-
-    def add_edge(self, src: str, dst: str, **attrs: Stringable) -> None:
-        self.edges.append(DotChild(f"{src} -- {dst}", **attrs))
-
-    def to_string(self) -> str:
-        output = [f'{"strict " if self.strict else ""}{self.graph_type} "{self.name}" ' + "{"]
-
-        for k, v in sorted(self.attributes.items()):
-            output.append(f"{DotGraph.INDENT}{k}={quote_if_necessary(v)};")
-
-        output.append("")
-        output.extend(
-            [f"{DotGraph.INDENT}{node.to_string().replace('\n', '\n' + DotGraph.INDENT)}\n" for node in self.nodes],
-        )
-        output.extend([f"{DotGraph.INDENT}{edge.to_string()}" for edge in self.edges])
-        output.append("}\n")
-
-        return "\n".join(output)
@@ -1,9 +1,9 @@
 from foxdata.models import Block
-from foxemu.blocks.calc import Calc
 from quart import Blueprint, Quart, make_response, render_template
 from werkzeug.exceptions import NotFound
 
 from app.extensions.foxdata import get_block_from_name
+from app.extensions.foxemu import get_calc_dot, get_calc_findings
 from app.extensions.htmx import Response
 
 bp = Blueprint("calc", __name__, template_folder="templates", static_folder="static", url_prefix="/calc")
@@ -32,11 +32,11 @@ async def serve_plain_text(content: str) -> Response:
 @bp.route("/<compound>/<block>/diagram")
 async def view_diagram(compound: str, block: str) -> str:
     """."""
-    return await render_template("view_logic_flow.html.j2", obj=get_obj(compound, block))
+    obj = get_obj(compound, block)
+    return await render_template("view_logic_flow.html.j2", obj=obj, findings=get_calc_findings(obj))
 
 
 @bp.route("/<compound>/<block>/dot")
 async def dot(compound: str, block: str) -> Response:
     """Construct diagram in DOT format and serve as plain text."""
-    calc = Calc.from_block(get_obj(compound, block))
-    return await serve_plain_text(calc.generate_dot())
+    return await serve_plain_text(get_calc_dot(get_obj(compound, block)))
@@ -4,7 +4,7 @@ from functools import lru_cache
 from pathlib import Path
 
 from foxdata import initialise_data
-from foxdata.models import Block, Data, Parameter, ParameterReference
+from foxdata.models import Block, Connectivity, Data, Parameter, ParameterReference
 from quart import Quart, current_app
 from utils import filter_map
 
@@ -67,6 +67,17 @@ def get_block_from_hash(block_hash: int) -> Block | None:
     return get_data().get_block_from_hash(block_hash)
 
 
+def get_connectivity() -> Connectivity:
+    """Fetch precomputed connectivity analytics from the global current app."""
+    return get_data().connectivity
+
+
+def get_related_blocks(distances: dict[int, int]) -> list[tuple[Block, int]]:
+    """Resolve block hashes to blocks, sorted by distance then name."""
+    related = ((get_block_from_hash(block_hash), distance) for block_hash, distance in distances.items())
+    return sorted(((b, d) for b, d in related if b is not None), key=lambda item: (item[1], repr(item[0])))
+
+
 @lru_cache
 def query_blocks(query: tuple[tuple[str, str], ...]) -> list[dict[str, str]]:
     """Return list of block data dicts that match query."""
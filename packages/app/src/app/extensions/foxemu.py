@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from foxemu.blocks.calc.analysis import analyse_steps
+from foxemu.blocks.calc.graphing import generate_dot_from_model
+from foxemu.blocks.calc.precompute import PrecomputedGraphs, initialise_graphs
+from foxemu.blocks.calc.program import parse_block_program
+from quart import Quart, current_app
+
+if TYPE_CHECKING:
+    from foxdata.models import Block
+
+    from .foxdata import FoxData
+
+
+class FoxEmu:
+    """
+    Quart extension to integrate emulation functionality for the application.
+
+    CALC logic flow graphs are precomputed and pickled when the optional
+    `FOXEMU_GRAPHS_PICKLE_PATH` configuration value is set, otherwise graphs
+    are generated upon request.
+    """
+
+    graphs: PrecomputedGraphs | None
+
+    def __init__(self, app: Quart | None = None) -> None:
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Quart) -> None:
+        """
+        Initialise the extension for a given Quart instance.
+
+        * Registers the extension with the app
+        * Initialises precomputed graphs if configured, logging any graphing errors
+        """
+        app.extensions["foxemu"] = self
+        self.graphs = None
+
+        if (path := app.config.get("FOXEMU_GRAPHS_PICKLE_PATH")) is None:
+            return
+
+        foxdata: FoxData | None = app.extensions.get("foxdata")
+
+        if foxdata is None:
+            description = "FoxData extension must be initialised before FoxEmu"
+            raise RuntimeError(description)
+
+        self.graphs = initialise_graphs(Path(path), foxdata.data)
+
+        if self.graphs.errors:
+            app.logger.warning(
+                "%d of %d CALC blocks failed graphing, e.g. %r: %s",
+                len(self.graphs.errors),
+                len(self.graphs),
+                foxdata.data.get_block_from_hash(next(iter(self.graphs.errors))),
+                next(iter(self.graphs.errors.values())),
+            )
+
+
+def get_calc_dot(block: Block) -> str:
+    """Get CALC logic flow graph in DOT format, using precomputed graphs if available."""
+    graphs: PrecomputedGraphs | None = current_app.extensions["foxemu"].graphs
+
+    if graphs is not None and (dot := graphs.get_dot(block)) is not None:
+        return dot
+    else:
+        return generate_dot_from_model(block)
+
+
+def get_calc_findings(block: Block) -> list[tuple[int, str]]:
+    """Get findings of static analysis of a CALC program, as step numbers and descriptions."""
+    program = parse_block_program(block)
+
+    # Programs with syntax errors don't execute, so there's nothing to analyse
+    if program.errors:
+        return []
+
+    return [(step, finding.description) for step, finding in analyse_steps(program.steps).findings]
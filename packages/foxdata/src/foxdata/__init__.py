@@ -9,13 +9,16 @@ from .parsing import generate_data
 
 
 def initialise_data(data_pickle_path: Path, dump_file_glob: Iterator[Path]) -> Data:
-    """Load pickled data if it exists otherwise generate and pickle data."""
+    """Load pickled data if it exists and is current, otherwise generate and pickle data."""
     with gc_disabled():
+        data = None
+
         if data_pickle_path.is_file():
             with data_pickle_path.open(mode="rb") as file:
                 data = pickle.load(file)  # noqa: S301
 
-        else:
+        # Data pickled before connectivity analysis was added is regenerated
+        if not isinstance(data, Data) or not hasattr(data, "connectivity"):
             data = generate_data(dump_file_glob)
             data_pickle_path.parent.resolve().mkdir(parents=True, exist_ok=True)
 
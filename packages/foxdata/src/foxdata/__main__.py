@@ -0,0 +1,75 @@
+from argparse import ArgumentParser, ArgumentTypeError
+from pathlib import Path
+
+from foxdata.synthetic import DEFAULT_TYPE_MIX, PREFIXES, PlantSpec, write_dumps
+
+
+def type_weight(value: str) -> tuple[str, float]:
+    """Parse a `TYPE=WEIGHT` pair of a type mix."""
+    block_type, _, weight = value.partition("=")
+    block_type = block_type.strip().upper()
+
+    if block_type not in PREFIXES:
+        description = f"unsupported block type '{block_type}', expected one of {', '.join(PREFIXES)}"
+        raise ArgumentTypeError(description)
+
+    try:
+        return block_type, float(weight)
+    except ValueError:
+        description = f"expected TYPE=WEIGHT, got '{value}'"
+        raise ArgumentTypeError(description) from None
+
+
+def generate_synthetic(output: Path, spec: PlantSpec, processes: int | None) -> None:
+    """Write synthetic ICC dumps and report their size."""
+    paths = write_dumps(output, spec, processes)
+    size = sum(path.stat().st_size for path in paths)
+    print(f"{spec.blocks} blocks in {spec.compounds} compounds written to {len(paths)} dumps, {size / 1e6:.1f} MB")  # noqa: T201
+
+
+def cli() -> None:
+    parser = ArgumentParser(prog="foxdata")
+    subparsers = parser.add_subparsers(dest="command")
+
+    synthetic_parser = subparsers.add_parser("synthetic", help="generate synthetic ICC dumps")
+    synthetic_parser.add_argument("--output", type=Path, required=True, help="directory to write ICC dumps to")
+    synthetic_parser.add_argument("--blocks", type=int, required=True, help="number of blocks to generate")
+    synthetic_parser.add_argument("--blocks-per-compound", type=int, default=40, help="blocks in each compound")
+    synthetic_parser.add_argument("--compounds-per-cp", type=int, default=100, help="compounds hosted by each CP")
+    synthetic_parser.add_argument(
+        "--mix",
+        type=type_weight,
+        nargs="+",
+        default=DEFAULT_TYPE_MIX,
+        metavar="TYPE=WEIGHT",
+        help="proportion of each block type",
+    )
+    synthetic_parser.add_argument(
+        "--connection-density", type=float, default=0.8, help="proportion of block inputs that are connected"
+    )
+    synthetic_parser.add_argument(
+        "--cross-compound", type=float, default=0.1, help="proportion of connections to other compounds"
+    )
+    synthetic_parser.add_argument("--seed", type=int, default=0, help="seed of the random generator")
+    synthetic_parser.add_argument("--processes", type=int, help="number of processes to write dumps with")
+
+    args = parser.parse_args()
+
+    match args.command:
+        case "synthetic":
+            spec = PlantSpec(
+                blocks=args.blocks,
+                blocks_per_compound=args.blocks_per_compound,
+                compounds_per_cp=args.compounds_per_cp,
+                type_mix=tuple(args.mix),
+                connection_density=args.connection_density,
+                cross_compound=args.cross_compound,
+                seed=args.seed,
+            )
+            generate_synthetic(args.output, spec, args.processes)
+        case _:
+            parser.print_help()
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,49 @@
+from utils import connected_components, strongly_connected_components
+
+from .models import Block, Connectivity
+
+
+def analyse_connectivity(blocks: tuple[Block, ...]) -> Connectivity:
+    """
+    Analyse the block connection graph once connections have been parsed.
+
+    Results are also stored in each block's metadata so that they can be queried like any other parameter.
+    """
+    hashes = [hash(block) for block in blocks]
+    sources: dict[int, set[int]] = {block_hash: set() for block_hash in hashes}
+    sinks: dict[int, set[int]] = {block_hash: set() for block_hash in hashes}
+
+    # Build block level adjacency from parameter level connections, each connection
+    # is held by both the source and sink block so only consider it from the sink
+    for block, block_hash in zip(blocks, hashes, strict=True):
+        for connection in block.connections:
+            if connection.sink.matches_block(block) and (source := connection.source.block_hash) in sinks:
+                sources[block_hash].add(source)
+                sinks[source].add(block_hash)
+
+    neighbours = {block_hash: sources[block_hash] | sinks[block_hash] for block_hash in hashes}
+    components = connected_components(hashes, neighbours)
+
+    # Only strongly connected components with feedback are loops, ie. more than one block or a self connection
+    loops = [scc for scc in strongly_connected_components(hashes, sinks) if len(scc) > 1 or scc[0] in sinks[scc[0]]]
+
+    connectivity = Connectivity(
+        sources={block_hash: tuple(sorted(s)) for block_hash, s in sources.items()},
+        sinks={block_hash: tuple(sorted(s)) for block_hash, s in sinks.items()},
+        components={block_hash: i for i, members in enumerate(components) for block_hash in members},
+        component_members={i: tuple(members) for i, members in enumerate(components)},
+        loops={block_hash: i for i, members in enumerate(loops) for block_hash in members},
+        loop_members={i: tuple(members) for i, members in enumerate(loops)},
+    )
+
+    for block, block_hash in zip(blocks, hashes, strict=True):
+        block.meta["fan_in"] = str(connectivity.fan_in(block_hash))
+        block.meta["fan_out"] = str(connectivity.fan_out(block_hash))
+        block.meta["component"] = str(component := connectivity.components[block_hash])
+        block.meta["component_size"] = str(len(connectivity.component_members[component]))
+
+        if (loop := connectivity.loops.get(block_hash)) is not None:
+            block.meta["loop"] = str(loop)
+            block.meta["loop_size"] = str(len(connectivity.loop_members[loop]))
+
+    return connectivity
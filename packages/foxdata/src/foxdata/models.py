@@ -1,9 +1,76 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from enum import IntFlag
 
 from fastmurmur3 import murmur3
+from utils import shortest_paths
+
+
+@dataclass(frozen=True)
+class Connectivity:
+    """
+    Precomputed connectivity of the block connection graph, with blocks referred to by hash.
+
+    Components are groups of blocks connected in either direction, loops are groups of blocks
+    that feed back into each other (strongly connected components with feedback).
+    """
+
+    sources: dict[int, tuple[int, ...]] = field(default_factory=dict)
+    sinks: dict[int, tuple[int, ...]] = field(default_factory=dict)
+    components: dict[int, int] = field(default_factory=dict)
+    component_members: dict[int, tuple[int, ...]] = field(default_factory=dict)
+    loops: dict[int, int] = field(default_factory=dict)
+    loop_members: dict[int, tuple[int, ...]] = field(default_factory=dict)
+
+    def fan_in(self, block_hash: int) -> int:
+        """Count blocks directly sourcing connections into the block."""
+        return sum(1 for source in self.sources.get(block_hash, ()) if source != block_hash)
+
+    def fan_out(self, block_hash: int) -> int:
+        """Count blocks directly sinking connections from the block."""
+        return sum(1 for sink in self.sinks.get(block_hash, ()) if sink != block_hash)
+
+    def component(self, block_hash: int) -> tuple[int, ...]:
+        """Get all blocks within the same component as the block."""
+        return self.component_members.get(self.components.get(block_hash, -1), (block_hash,))
+
+    def loop(self, block_hash: int) -> tuple[int, ...]:
+        """Get all blocks within the same feedback loop as the block, empty if the block is not in a loop."""
+        return self.loop_members.get(self.loops.get(block_hash, -1), ())
+
+    def upstream(self, block_hash: int, depth: int | None = None) -> dict[int, int]:
+        """Find all blocks that transitively feed the block, mapped to their distance in hops."""
+        return Connectivity._traverse(self.sources, block_hash, depth)
+
+    def downstream(self, block_hash: int, depth: int | None = None) -> dict[int, int]:
+        """Find all blocks that are transitively fed by the block, mapped to their distance in hops."""
+        return Connectivity._traverse(self.sinks, block_hash, depth)
+
+    def paths(self, source_hash: int, sink_hash: int, max_hops: int | None = None) -> dict[int, int]:
+        """Find all blocks on the shortest paths from source to sink, mapped to their position along the paths."""
+        return shortest_paths(source_hash, sink_hash, self.sinks, self.sources, max_hops)
+
+    @staticmethod
+    def _traverse(edges: dict[int, tuple[int, ...]], root: int, depth: int | None) -> dict[int, int]:
+        distances = {root: 0}
+        queue = deque((root,))
+
+        while queue:
+            node = queue.popleft()
+            distance = distances[node] + 1
+
+            if depth is not None and distance > depth:
+                continue
+
+            for neighbour in edges.get(node, ()):
+                if neighbour not in distances:
+                    distances[neighbour] = distance
+                    queue.append(neighbour)
+
+        del distances[root]
+        return distances
 
 
 @dataclass(frozen=True)
@@ -13,6 +80,7 @@ class Data:
     blocks: tuple[Block, ...]
     index: dict[int, Block]
     parameters: dict[str, Parameter]
+    connectivity: Connectivity = field(default_factory=Connectivity)
 
     def get_block_from_name(self, compound: str, name: str) -> Block | None:
         """Search index for given compound and block name."""
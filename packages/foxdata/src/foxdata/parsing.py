@@ -1,11 +1,13 @@
 import importlib.resources
 import re
 from collections.abc import Iterator
+from dataclasses import replace
 from pathlib import Path
 
 import yaml
 from billiard import Pool  # type: ignore[attr-defined]
 
+from .analysis import analyse_connectivity
 from .models import Block, Connection, Data, Parameter, ParameterReference
 
 # Regex pattern to match "<compound>:<block>.<parameter>" within config files
@@ -49,7 +51,7 @@ def generate_data(dump_file_glob: Iterator[Path]) -> Data:
             source_block.connections.add(conn)
             sink_block.connections.add(conn)
 
-    return data
+    return replace(data, connectivity=analyse_connectivity(data.blocks))
 
 
 def parse_dump_file(path: Path) -> tuple[Block, ...]:
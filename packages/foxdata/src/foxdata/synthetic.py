@@ -0,0 +1,251 @@
+"""
+Synthetic ICC dumps for load and scale testing, in the format consumed by `parsing.parse_dump_file`.
+
+Plants are made up of compounds of control blocks spread across CPs, with a dump file for each CP at
+`<output>/<cp>/<cp>.d`. Blocks are generated independently for each compound from a seed, so any number of blocks
+can be written by a pool of processes without holding the plant in memory.
+"""
+
+import random
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from math import ceil
+from pathlib import Path
+
+from billiard import Pool  # type: ignore[attr-defined]
+
+DEFAULT_TYPE_MIX = (("AIN", 0.3), ("AOUT", 0.1), ("PIDA", 0.1), ("CIN", 0.2), ("COUT", 0.1), ("CALC", 0.2))
+"""Default proportions of each block type, see `PlantSpec.type_mix`."""
+
+PREFIXES = {"AIN": "AI", "AOUT": "AO", "PIDA": "PIC", "CIN": "DI", "COUT": "DO", "CALC": "CALC"}
+"""Prefix of the names of blocks of each supported type."""
+
+ANALOG_SOURCES = (("AIN", "PNT"), ("PIDA", "OUT"), ("CALC", "RO01"))
+DIGITAL_SOURCES = (("CIN", "CIN"), ("CALC", "BO01"))
+
+CALC_PROGRAMS = (
+    # High alarm on the difference between two measurements, with a delay
+    ("IN RI01", "SUB RI02", "SUB M01", "BIN 7", "IN 1", "GTO 8", "IN 0", "DON 5", "OUT BO01", "END"),
+    # Totaliser of a flow, reset by a digital input
+    ("IN RI01", "MUL M01", "ADD M02", "STM M02", "OUT RO01", "IN BI01", "BIZ 9", "CLM M02", "END"),
+    # Median select of redundant transmitters, with a deviation alarm
+    (
+        *("IN RI01 ;transmitter A", "IN RI02 ;transmitter B", "IN RI03 ;transmitter C", "MEDN", "OUT RO01"),
+        *("IN RI01", "SUB RI02", "ABS", "SUB M01", "BIP 13", "IN 0", "GTO 14", "IN 1", "OUT BO01", "END"),
+    ),
+    # Interlock logic, held for a time after tripping
+    ("IN BI01", "AND BI02", "OR ~BI03", "DOFF 10", "OUT BO01", "IN BI01", "NOT", "OUT BO02", "END"),
+    # Scaled and clamped output
+    ("IN RI01", "MUL M01", "ADD M02", "IN M03", "MIN 2", "IN 0", "MAX 2", "OUT RO01", "END"),
+)
+"""CALC programs that blocks are given, with inputs connected to other blocks."""
+
+PROGRAM_LENGTH = 50
+PERIODS = ("1", "1", "1", "2", "4")
+
+
+@dataclass(frozen=True)
+class PlantSpec:
+    """
+    Shape of a synthetic plant.
+
+    `blocks` counts control blocks, each compound is also a block of its own. `type_mix` gives the proportion of
+    each block type, `connection_density` the proportion of connectable inputs that are connected, and
+    `cross_compound` the proportion of connections that refer to a block in another compound.
+    """
+
+    blocks: int
+    blocks_per_compound: int = 40
+    compounds_per_cp: int = 100
+    type_mix: tuple[tuple[str, float], ...] = DEFAULT_TYPE_MIX
+    connection_density: float = 0.8
+    cross_compound: float = 0.1
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if unsupported := [block_type for block_type, _ in self.type_mix if block_type not in PREFIXES]:
+            description = f"unsupported block types: {', '.join(unsupported)}"
+            raise RuntimeError(description)
+
+        if not any(weight > 0 for _, weight in self.type_mix):
+            description = "type mix must include at least one block type"
+            raise RuntimeError(description)
+
+    @property
+    def compounds(self) -> int:
+        return ceil(self.blocks / self.blocks_per_compound)
+
+    @property
+    def cps(self) -> int:
+        return ceil(self.compounds / self.compounds_per_cp)
+
+
+def compound_name(index: int) -> str:
+    return f"UNIT{index:06d}"
+
+
+def cp_name(index: int) -> str:
+    return f"CP{index + 1:04d}"
+
+
+@lru_cache(maxsize=1024)
+def plan_compound(spec: PlantSpec, index: int) -> tuple[tuple[str, str], ...]:
+    """Choose the name and type of each block in a compound, cached as connections often refer to the same ones."""
+    rng = random.Random(f"{spec.seed}:{index}:plan")  # noqa: S311
+    size = min(spec.blocks_per_compound, spec.blocks - index * spec.blocks_per_compound)
+    types, weights = zip(*spec.type_mix, strict=True)
+    counts = dict.fromkeys(types, 0)
+    blocks = []
+
+    for block_type in rng.choices(types, weights, k=size):
+        counts[block_type] += 1
+        blocks.append((f"{PREFIXES[block_type]}{counts[block_type]:03d}", block_type))
+
+    return tuple(blocks)
+
+
+class CompoundGenerator:
+    """Generates the configuration of a compound and its blocks, see `generate_compound`."""
+
+    spec: PlantSpec
+    index: int
+    compound: str
+    rng: random.Random
+
+    def __init__(self, spec: PlantSpec, index: int) -> None:
+        self.spec = spec
+        self.index = index
+        self.compound = compound_name(index)
+        self.rng = random.Random(f"{spec.seed}:{index}:config")  # noqa: S311
+
+    def generate(self) -> list[dict[str, str]]:
+        configs = [{"NAME": self.compound, "TYPE": "COMPND", "DESCRP": f"Synthetic unit {self.index}", "ON": "1"}]
+        builders: dict[str, Callable[[], dict[str, str]]] = {
+            "AIN": self.ain,
+            "AOUT": self.aout,
+            "PIDA": self.pida,
+            "CIN": self.cin,
+            "COUT": self.cout,
+            "CALC": self.calc,
+        }
+
+        for i, (name, block_type) in enumerate(plan_compound(self.spec, self.index), start=1):
+            config = {
+                "NAME": f"{self.compound}:{name}",
+                "TYPE": block_type,
+                "DESCRP": f"{block_type} {name}",
+                "PERIOD": self.rng.choice(PERIODS),
+                "PHASE": "0",
+                "LOOPID": f"{self.compound}-{i:03d}",
+            }
+            config.update(builders[block_type]())
+            configs.append(config)
+
+        return configs
+
+    def source(self, candidates: tuple[tuple[str, str], ...]) -> str | None:
+        """Choose an output of a block of one of the candidate types to connect to, or `None` if not connected."""
+        if self.rng.random() >= self.spec.connection_density:
+            return None
+
+        index = self.index
+
+        if self.spec.compounds > 1 and self.rng.random() < self.spec.cross_compound:
+            index = (index + self.rng.randrange(1, self.spec.compounds)) % self.spec.compounds
+
+        parameters = dict(candidates)
+        blocks = [
+            (name, block_type) for name, block_type in plan_compound(self.spec, index) if block_type in parameters
+        ]
+
+        if not blocks:
+            return None
+
+        name, block_type = self.rng.choice(blocks)
+        return f"{compound_name(index)}:{name}.{parameters[block_type]}"
+
+    def io(self) -> dict[str, str]:
+        return {"IOM_ID": f"FBM{self.rng.randrange(1, 121):03d}", "PNT_NO": str(self.rng.randrange(1, 17))}
+
+    def scale(self) -> dict[str, str]:
+        high = self.rng.choice((100.0, 250.0, 1000.0, 16.0))
+        return {"HSCO1": f"{high:.1f}", "LSCO1": "0.0", "EO1": self.rng.choice(("%", "kPa", "m3/h", "degC"))}
+
+    def ain(self) -> dict[str, str]:
+        return {**self.io(), "SCI": "1", **self.scale(), "HHALIM": "95.0", "LOALIM": "5.0", "INHOPT": "0"}
+
+    def aout(self) -> dict[str, str]:
+        return {"MEAS": self.source((("PIDA", "OUT"), ("CALC", "RO01"))) or "0.0", **self.io(), **self.scale()}
+
+    def pida(self) -> dict[str, str]:
+        return {
+            "MEAS": self.source((("AIN", "PNT"),)) or "0.0",
+            "SPT": f"{self.rng.uniform(10, 90):.1f}",
+            "RSP": self.source((("CALC", "RO01"),)) or "0.0",
+            "BCALCI": self.source((("AOUT", "BCALCO"),)) or "0.0",
+            "PBAND": f"{self.rng.choice((50, 100, 150, 200)):.1f}",
+            "INT": f"{self.rng.uniform(0.1, 5):.2f}",
+            "DERIV": "0.0",
+            "MA": "1",
+            "INITMA": "1",
+            "LOCSP": "1",
+            "REMSW": "0",
+            **self.scale(),
+        }
+
+    def cin(self) -> dict[str, str]:
+        return {**self.io(), "INVCIN": "0"}
+
+    def cout(self) -> dict[str, str]:
+        return {"IN": self.source(DIGITAL_SOURCES) or "0", **self.io()}
+
+    def calc(self) -> dict[str, str]:
+        program = self.rng.choice(CALC_PROGRAMS)
+        config = {f"STEP{i:02d}": program[i - 1] if i <= len(program) else "" for i in range(1, PROGRAM_LENGTH + 1)}
+
+        for i in range(1, 4):
+            config[f"RI{i:02d}"] = self.source(ANALOG_SOURCES) or "0.0"
+            config[f"BI{i:02d}"] = self.source(DIGITAL_SOURCES) or "0"
+
+        for i, value in enumerate((self.rng.uniform(0.5, 2), self.rng.uniform(0, 10), 100.0), start=1):
+            config[f"M{i:02d}"] = f"{value:.2f}"
+
+        return {**config, "HSCI1": "100.0", "LSCI1": "0.0", "MA": "1", "INITMA": "1"}
+
+
+def generate_compound(spec: PlantSpec, index: int) -> list[dict[str, str]]:
+    """Generate the configuration of a compound followed by each of its blocks."""
+    return CompoundGenerator(spec, index).generate()
+
+
+def format_block(config: dict[str, str]) -> str:
+    """Format a block's configuration as it appears in a dump, one `PARAMETER = VALUE` line per parameter."""
+    return "\n".join(f"{key:<8} = {value}" for key, value in config.items())
+
+
+def generate_dump(spec: PlantSpec, cp: int) -> Iterator[str]:
+    """Generate the configuration of each compound and block hosted by a CP, formatted as they appear in a dump."""
+    for index in range(cp * spec.compounds_per_cp, min((cp + 1) * spec.compounds_per_cp, spec.compounds)):
+        yield from (format_block(config) for config in generate_compound(spec, index))
+
+
+def write_dump(output: Path, spec: PlantSpec, cp: int) -> Path:
+    """Write the dump file of a CP, returning its path."""
+    path = output / cp_name(cp) / f"{cp_name(cp)}.d"
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with path.open("w", encoding="utf-8") as file:
+        for block in generate_dump(spec, cp):
+            file.write(f"{block}\nEND\n")
+
+    return path
+
+
+def write_dumps(output: Path, spec: PlantSpec, processes: int | None = None) -> list[Path]:
+    """Write a dump file for each CP of a synthetic plant, using a process pool unless `processes` is 1."""
+    if processes == 1:
+        return [write_dump(output, spec, cp) for cp in range(spec.cps)]
+
+    with Pool(processes) as pool:
+        return pool.map(partial(write_dump, output, spec), range(spec.cps))
@@ -0,0 +1,131 @@
+"""
+Benchmark CALC program execution, comparing the interpreter against compiled programs.
+
+Run from `packages/foxemu`, using sample programs or every CALC block in a directory of ICC dumps:
+
+    uv run -m benchmarks.execution
+    uv run -m benchmarks.execution --dumps ../../icc_dumps --pickle /tmp/data.pickle
+"""
+
+import time
+from argparse import ArgumentParser
+from collections.abc import Callable
+from pathlib import Path
+
+from foxdata.models import Block
+from foxemu.blocks.calc import Calc
+from foxemu.blocks.calc.parameters import CalcParameters
+from foxemu.signaling import UnparsedConnection
+
+from .graphing import load_data
+
+SAMPLE_PROGRAMS = {
+    "arithmetic": ("IN RI01", "ADD RI02", "MUL M01", "SUB M02", "DIV M03", "CHS", "ABS", "OUT RO01", "STM M04", "END"),
+    "branching": ("IN RI01", "BIN 5", "IN 1", "GTO 6", "IN 0", "OUT BO01", "IN M01", "BIZ 10", "STM M02", "END"),
+    "polyadic": ("IN RI01", "IN RI02", "IN RI03", "MAX 3", "OUT RO01", "IN M01", "IN M02", "MEDN", "OUT RO02"),
+}
+
+
+def sample_calcs() -> list[Calc]:
+    """Create blocks running each of the sample programs."""
+    calcs = []
+
+    for name, text in SAMPLE_PROGRAMS.items():
+        parameters = CalcParameters()
+        parameters.NAME.get_value().set(name.upper())
+
+        for i, step in enumerate(text, start=1):
+            parameters.get_step(i).get_value().set(step)
+
+        for i in range(1, 5):
+            getattr(parameters, f"RI{i:02d}").get_value().set(i * 12.5)
+            getattr(parameters, f"M{i:02d}").get_value().set(i + 0.5)
+
+        calcs.append(Calc("BENCH", name.upper(), parameters))
+
+    return calcs
+
+
+def count_steps(calc: Calc) -> int:
+    """Count steps executed in one cycle of the interpreter, the block should be a spare copy as it is executed."""
+    count = 0
+
+    def counted(operation: Callable[[], None]) -> Callable[[], None]:
+        def wrapper() -> None:
+            nonlocal count
+            count += 1
+            operation()
+
+        return wrapper
+
+    calc.program = [counted(operation) if operation else None for operation in calc.program]
+    calc.execute()
+    return count
+
+
+def time_execution(calcs: list[Calc], cycles: int, repeat: int) -> float:
+    """Time executing each block for a number of cycles, returning the best of `repeat` runs."""
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+
+        for _ in range(cycles):
+            for calc in calcs:
+                calc.execute()
+
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dumps", type=Path, help="directory containing ICC dumps (*/*.d), uses samples if omitted")
+    parser.add_argument("--pickle", type=Path, help="path to load/store a data pickle")
+    parser.add_argument("--cycles", type=int, default=1000, help="number of times each block is executed per run")
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs, best is reported")
+    args = parser.parse_args()
+
+    if args.dumps is None:
+        create_calcs = sample_calcs
+    else:
+        data = load_data(args.dumps, args.pickle)
+        blocks = [block for block in data.blocks if block.config.get("TYPE") == "CALC"]
+
+        def create_calcs() -> list[Calc]:
+            return [Calc(block.compound, block.name, disconnected_parameters(block)) for block in blocks]
+
+    # Productions are bound to their block, so each mode gets its own blocks rather than copies
+    calcs, compiled, spare = ([calc for calc in create_calcs() if not calc.syntax_error] for _ in range(3))
+    start = time.perf_counter()
+
+    for calc in compiled:
+        calc.compile()
+
+    compile_s = time.perf_counter() - start
+    steps = sum(count_steps(calc) for calc in spare) * args.cycles
+    interpreted_s = time_execution(calcs, args.cycles, max(1, args.repeat))
+    compiled_s = time_execution(compiled, args.cycles, max(1, args.repeat))
+
+    print(f"CALC blocks:  {len(calcs)}")  # noqa: T201
+    print(f"compile:      {compile_s:.3f} s ({compile_s / max(1, len(calcs)) * 1e6:.1f} us/block)")  # noqa: T201
+    print(f"interpreted:  {interpreted_s:.3f} s ({steps / interpreted_s:,.0f} ops/s)")  # noqa: T201
+    print(f"compiled:     {compiled_s:.3f} s ({steps / compiled_s:,.0f} ops/s)")  # noqa: T201
+    print(f"speedup:      {interpreted_s / compiled_s:.2f}x")  # noqa: T201
+
+
+def disconnected_parameters(block: Block) -> CalcParameters:
+    """Get parameters for a block, with connections replaced by defaults as they are only resolved by an emulator."""
+    parameters = CalcParameters.from_block(block)
+    defaults = CalcParameters()
+
+    for name, parameter in vars(parameters).items():
+        if isinstance(parameter.inner, UnparsedConnection):
+            setattr(parameters, name, getattr(defaults, name))
+
+    return parameters
+
+
+if __name__ == "__main__":
+    main()
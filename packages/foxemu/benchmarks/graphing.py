@@ -0,0 +1,94 @@
+"""
+Benchmark CALC logic flow graphing over every CALC block in a plant.
+
+Run from `packages/foxemu` with a directory of ICC dumps, optionally caching the parsed data:
+
+    uv run -m benchmarks.graphing --dumps ../../icc_dumps
+    uv run -m benchmarks.graphing --dumps ../../icc_dumps --pickle /tmp/data.pickle
+"""
+
+import time
+from argparse import ArgumentParser
+from contextlib import suppress
+from pathlib import Path
+
+from foxdata import initialise_data
+from foxdata.models import Block, Data
+from foxdata.parsing import generate_data
+from foxemu.blocks.calc import Calc
+from foxemu.blocks.calc.graphing import generate_dot_from_model
+from foxemu.blocks.calc.program import parse_program
+
+
+def load_data(dumps: Path, data_pickle: Path | None) -> Data:
+    """Parse the ICC dumps, going through a data pickle if a path is given."""
+    if data_pickle is not None:
+        return initialise_data(data_pickle, dumps.glob("*/*.d"))
+    else:
+        return generate_data(dumps.glob("*/*.d"))
+
+
+def benchmark(blocks: list[Block], repeat: int) -> dict[str, float | int]:
+    """
+    Time block instantiation and DOT generation separately, returning the best of `repeat` runs.
+
+    DOT generation directly from block models is also timed, with the program cache cleared beforehand.
+    """
+    best_create = best_graph = best_model = float("inf")
+    failures = 0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calcs = [Calc.from_block(block) for block in blocks]
+        created = time.perf_counter()
+        failures = 0
+
+        for calc in calcs:
+            try:
+                calc.generate_dot()
+            except RuntimeError:
+                failures += 1
+
+        finished = time.perf_counter()
+        parse_program.cache_clear()
+
+        for block in blocks:
+            with suppress(RuntimeError):
+                generate_dot_from_model(block)
+
+        best_create = min(best_create, created - start)
+        best_graph = min(best_graph, finished - created)
+        best_model = min(best_model, time.perf_counter() - finished)
+
+    return {
+        "blocks": len(blocks),
+        "failures": failures,
+        "create_s": best_create,
+        "graph_s": best_graph,
+        "model_s": best_model,
+        "unique_programs": parse_program.cache_info().currsize,
+    }
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dumps", type=Path, required=True, help="directory containing ICC dumps (*/*.d)")
+    parser.add_argument("--pickle", type=Path, help="path to load/store a data pickle")
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs, best is reported")
+    args = parser.parse_args()
+
+    data = load_data(args.dumps, args.pickle)
+    blocks = [block for block in data.blocks if block.config.get("TYPE") == "CALC"]
+    results = benchmark(blocks, max(1, args.repeat))
+    n = max(1, results["blocks"])
+
+    print(f"CALC blocks:      {results['blocks']}")  # noqa: T201
+    print(f"graphing errors:  {results['failures']}")  # noqa: T201
+    print(f"Calc.from_block:  {results['create_s']:.3f} s ({results['create_s'] / n * 1e6:.1f} us/block)")  # noqa: T201
+    print(f"generate_dot:     {results['graph_s']:.3f} s ({results['graph_s'] / n * 1e6:.1f} us/block)")  # noqa: T201
+    print(f"from block model: {results['model_s']:.3f} s ({results['model_s'] / n * 1e6:.1f} us/block)")  # noqa: T201
+    print(f"unique programs:  {results['unique_programs']}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Benchmark suite covering CALC operations, programs and whole-plant emulation, with stored baselines.
+
+Run from `packages/foxemu`, optionally selecting benchmarks by name and saving or comparing against a baseline:
+
+    uv run -m benchmarks.suite
+    uv run -m benchmarks.suite --filter plant --sizes 1000 10000 100000
+    uv run -m benchmarks.suite --save baseline.json
+    uv run -m benchmarks.suite --baseline baseline.json --threshold 0.2
+
+Comparing against a baseline exits with status 1 if any benchmark is slower than the baseline by more than the
+threshold, so baselines should be saved on the same machine that they are compared on.
+"""
+
+import json
+import platform
+import random
+import sys
+import timeit
+from argparse import ArgumentParser
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import cache, partial
+from pathlib import Path
+
+from foxdata.models import Block, Data
+from foxemu.blocks.calc import Calc
+from foxemu.blocks.calc.parameters import CalcParameters
+from foxemu.blocks.calc.stack import Stack
+from foxemu.emulator import Emulator
+from foxemu.signaling import Precision, RealValue
+
+from .execution import count_steps
+
+OPCODE_FAMILIES = {
+    "arithmetic": ("IN RI01", "ADD RI02", "MUL M01", "SUB M02", "DIV M03", "CHS", "IN M04", "IDIV M05", "STM M06"),
+    "statistics": (
+        *("IN RI01", "IN RI02", "IN RI03", "MAX 3", "IN RI01", "IN RI02", "MIN 3"),
+        *("IN RI03", "IN M01", "AVE 3", "IN RI01", "MEDN", "STM M05"),
+    ),
+    "exponential": ("IN RI01", "SQRT", "LN", "ALN", "IN RI02", "ALOG", "LOG", "ADD", "IN 2", "EXP", "STM M05"),
+    "trigonometry": ("IN RI01", "SIN", "IN RI02", "COS", "ADD", "ATAN", "IN RI03", "TAN", "ADD", "STM M05"),
+    "logic": ("IN BI01", "AND BI02", "IN BI03", "OR ~BI04", "XOR", "NOT", "IN BI01", "NAND BI02", "OUT BO01"),
+    "packed": ("IN II01", "IN II02", "ANDX 2", "IN II02", "ORX 2", "IN II01", "XORX 2", "NOTX", "OUT IO01"),
+    "stack": ("IN RI01", "DUP", "IN RI02", "SWP", "POP", "DUP", "ADD", "LAC M01", "SAC M05", "CST", "IN RI03"),
+    "memory": ("INC M01", "DEC M02", "IN M01", "ADD M02", "STM M03", "CLM M04", "RCL M03", "STM M05"),
+    "branching": ("IN RI01", "BIN 5", "IN 1", "GTO 6", "IN 0", "BIZ 8", "SSZ M01", "NOP", "IN BI01", "BIT 11"),
+    "timing": ("IN BI01", "DON -2", "OUT BO01", "IN BI02", "DOFF 5", "OUT BO02", "IN BI03", "OSP M01", "TIM"),
+    "io": ("IN RI01", "OUT RO01", "IN RI02", "OUT RO02", "IN BI01", "OUT BO01", "IN II01", "OUT IO01", "OUT LO01"),
+}
+"""Programs exercising each family of opcodes, see `foxemu.blocks.calc.operations`."""
+
+PLANT_TEMPLATES = (
+    # Scaled measurement with a high alarm
+    ("IN RI01", "MUL M01", "ADD M02", "OUT RO01", "SUB M03", "BIP 8", "IN 0", "GTO 9", "IN 1", "OUT BO01"),
+    # Counter with a reset input
+    ("IN M01", "IN 1", "ADD", "STM M01", "IN BI01", "BIZ 7", "CLM M01", "IN M01", "OUT RO01", "IN ~BI02", "OUT BO01"),
+    # Median selection of redundant measurements
+    ("IN RI01", "IN RI02", "IN RI03", "MEDN", "OUT RO01", "IN RI01", "IN RI02", "MAX 2", "SUB RO01", "OUT RO02"),
+    # Interlock with a delay
+    ("IN BI01", "AND ~BI02", "OR BI03", "DON -3", "OUT BO01", "IN RI01", "SUB M01", "BIN 10", "IN 1", "OUT BO02"),
+)
+"""Programs that synthetic plants are generated from, each reading inputs connected to other blocks."""
+
+DEFAULT_SIZES = (1000, 10000)
+"""Default numbers of blocks in synthetic plants, larger plants can be given with `--sizes`."""
+
+BLOCKS_PER_COMPOUND = 50
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """Named function to time, created by `setup` so that preparing its inputs isn't timed."""
+
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    count: int = 1
+    unit: str = "call"
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """Best time of a benchmark, in seconds per call."""
+
+    benchmark: Benchmark
+    seconds: float
+
+    @property
+    def per_unit(self) -> float:
+        return self.seconds / max(1, self.benchmark.count)
+
+
+def create_calc(name: str, text: Iterable[str]) -> Calc:
+    """Create a block running a program, with inputs and memory set to values that every program can use."""
+    parameters = CalcParameters()
+    parameters.NAME.get_value().set(name.upper())
+
+    for i, step in enumerate(text, start=1):
+        parameters.get_step(i).get_value().set(step)
+
+    for i in range(1, 5):
+        getattr(parameters, f"RI{i:02d}").get_value().set(i * 0.25)
+        getattr(parameters, f"BI{i:02d}").get_value().set(i % 2 == 1)
+        getattr(parameters, f"M{i:02d}").get_value().set(i + 0.5)
+
+    parameters.II01.get_value().set(1234)
+    parameters.II02.get_value().set(4321)
+
+    return Calc("BENCH", name.upper(), parameters)
+
+
+def program(name: str, text: Iterable[str], *, compiled: bool) -> Callable[[], None]:
+    """Create a block running a program, compiling it if `compiled` is set, and return its `execute` method."""
+    calc = create_calc(name, text)
+
+    if compiled:
+        calc.compile()
+
+    return calc.execute
+
+
+def operation_benchmarks() -> list[Benchmark]:
+    """Benchmark executing a program for each family of opcodes, interpreted and compiled."""
+    benchmarks = []
+
+    for family, text in OPCODE_FAMILIES.items():
+        steps = count_steps(create_calc(family, text))
+
+        for compiled in (False, True):
+            mode = "compiled" if compiled else "interpreted"
+            setup = partial(program, family, text, compiled=compiled)
+            benchmarks.append(Benchmark(f"ops.{family}.{mode}", setup, steps, "step"))
+
+    return benchmarks
+
+
+def primitive_benchmarks() -> list[Benchmark]:
+    """Benchmark the stack and real values that every operation is built from."""
+
+    def stack() -> Callable[[], None]:
+        stack = Stack()
+
+        def push_pop() -> None:
+            stack.push(1.5, 1)
+            stack.push(2.5, 2)
+            stack.pop()
+            stack.pop()
+
+        return push_pop
+
+    def calc() -> Callable[[], None]:
+        calc = create_calc("push", ())
+
+        def push_pop() -> None:
+            calc.push(1.5)
+            calc.push(calc.pop() + calc.pop())
+            calc.pop()
+
+        return push_pop
+
+    def real(precision: Precision) -> Callable[[], Callable[[], None]]:
+        def setup() -> Callable[[], None]:
+            a, b = RealValue(1.5, precision), RealValue(2.25, precision)
+
+            def arithmetic() -> None:
+                (a + b) * b - a / b
+
+            return arithmetic
+
+        return setup
+
+    return [
+        Benchmark("primitives.stack.push_pop", stack, 4, "op"),
+        Benchmark("primitives.calc.push_pop", calc, 5, "op"),
+        Benchmark("primitives.real.controller", real(Precision.CONTROLLER), 4, "op"),
+        Benchmark("primitives.real.fast", real(Precision.FAST), 4, "op"),
+    ]
+
+
+@cache
+def generate_plant(n_blocks: int, seed: int = 0) -> Data:
+    """
+    Generate a plant of CALC blocks from `PLANT_TEMPLATES`, grouped into compounds of `BLOCKS_PER_COMPOUND` blocks.
+
+    Inputs are connected to outputs of blocks generated shortly before, so that most connections are within a
+    compound but some reach into the compound before. Blocks have a mix of periods for `Emulator.advance`. Plants
+    are cached so that each size is only generated once.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    names = [(f"PLANT{i // BLOCKS_PER_COMPOUND:05d}", f"CALC{i % BLOCKS_PER_COMPOUND:03d}") for i in range(n_blocks)]
+    blocks = []
+
+    for i, (compound, name) in enumerate(names):
+        text = PLANT_TEMPLATES[i % len(PLANT_TEMPLATES)]
+        config = {"TYPE": "CALC", "PERIOD": str(rng.choice((1, 2, 4))), "M01": "1.5", "M02": "0.5", "M03": "50"}
+        config.update((f"STEP{j:02d}", step) for j, step in enumerate(text, start=1))
+
+        if i > 0:
+            for parameter, output in (("RI01", "RO01"), ("RI02", "RO01"), ("RI03", "RO02"), ("BI01", "BO01")):
+                source_compound, source_name = names[rng.randrange(max(0, i - BLOCKS_PER_COMPOUND), i)]
+                config[parameter] = f"{source_compound}:{source_name}.{output}"
+
+        blocks.append(Block(config, {"compound": compound, "name": name, "cp": f"CP{i // 5000:02d}"}, set()))
+
+    return Data(tuple(blocks), {hash(block): block for block in blocks}, {})
+
+
+def plant_benchmarks(sizes: Iterable[int]) -> list[Benchmark]:
+    """Benchmark creating emulators of synthetic plants of each size, executing a cycle and advancing 4 ticks."""
+    benchmarks = []
+
+    for size in sizes:
+        benchmarks.extend(
+            (
+                Benchmark(f"plant.{size}.create", partial(create_plant, size), size, "block"),
+                Benchmark(f"plant.{size}.execute", partial(execute_plant, size, compiled=False), size, "block"),
+                Benchmark(f"plant.{size}.execute_compiled", partial(execute_plant, size, compiled=True), size, "block"),
+                Benchmark(f"plant.{size}.advance", partial(advance_plant, size, 4), size, "block"),
+            )
+        )
+
+    return benchmarks
+
+
+def create_plant(size: int) -> Callable[[], Emulator]:
+    """Generate a plant and return a function creating an emulator of it."""
+    return partial(Emulator.from_data, generate_plant(size), processes=1)
+
+
+def execute_plant(size: int, *, compiled: bool) -> Callable[[], None]:
+    """Create an emulator of a plant, compiling CALC programs if `compiled` is set, and return its `execute` method."""
+    emulator = Emulator.from_data(generate_plant(size), processes=1, compiled=compiled)
+    emulator.get_schedule()
+    return emulator.execute
+
+
+def advance_plant(size: int, ticks: int) -> Callable[[], None]:
+    """Create an emulator of a plant and return a function advancing it by a number of ticks."""
+    emulator = Emulator.from_data(generate_plant(size), processes=1)
+    emulator.get_tick_schedule()
+    return partial(emulator.advance, ticks)
+
+
+def measure(benchmark: Benchmark, repeat: int) -> Measurement:
+    """Time a benchmark, calling it enough times per run to take at least 0.2s and returning the best run."""
+    timer = timeit.Timer(benchmark.setup())
+    number, _ = timer.autorange()
+    return Measurement(benchmark, min(timer.repeat(repeat, number)) / number)
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def load_baseline(path: Path) -> dict[str, float]:
+    """Load the seconds per call of each benchmark from a baseline saved by `save_baseline`."""
+    return json.loads(path.read_text())["seconds"]
+
+
+def save_baseline(path: Path, measurements: list[Measurement]) -> None:
+    """Save the seconds per call of each benchmark, along with the machine it was measured on."""
+    baseline = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "seconds": {measurement.benchmark.name: measurement.seconds for measurement in measurements},
+    }
+    path.write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filter", default="", help="only run benchmarks with names containing this text")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="numbers of blocks in plants")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs, best is reported")
+    parser.add_argument("--save", type=Path, help="path to save results to as a baseline")
+    parser.add_argument("--baseline", type=Path, help="path of a baseline to compare results against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="fraction slower than baseline that regresses")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline) if args.baseline is not None else {}
+    benchmarks = [*primitive_benchmarks(), *operation_benchmarks(), *plant_benchmarks(args.sizes)]
+    measurements = []
+    regressions = []
+
+    for benchmark in benchmarks:
+        if args.filter not in benchmark.name:
+            continue
+
+        measurement = measure(benchmark, max(1, args.repeat))
+        measurements.append(measurement)
+        line = (
+            f"{benchmark.name:<40} {format_seconds(measurement.seconds):>10}/call"
+            f" {format_seconds(measurement.per_unit):>10}/{benchmark.unit}"
+        )
+
+        if (previous := baseline.get(benchmark.name)) is not None:
+            ratio = measurement.seconds / previous
+            line += f"  {ratio:.2f}x baseline"
+
+            if ratio > 1 + args.threshold:
+                line += "  REGRESSION"
+                regressions.append(benchmark.name)
+
+        print(line, flush=True)  # noqa: T201
+
+    if args.save is not None:
+        save_baseline(args.save, measurements)
+
+    if regressions:
+        print(f"{len(regressions)} regressions beyond {args.threshold:.0%} of baseline")  # noqa: T201
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
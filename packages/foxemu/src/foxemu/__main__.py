@@ -0,0 +1,39 @@
+from argparse import ArgumentParser
+from pathlib import Path
+
+from foxdata import initialise_data
+
+from foxemu.blocks.calc.precompute import initialise_graphs
+
+
+def precompute_graphs(dumps: Path, data_pickle: Path, graphs_pickle: Path) -> None:
+    """Precompute CALC logic flow graphs for the data set and report any graphing errors."""
+    data = initialise_data(data_pickle, dumps.glob("*/*.d"))
+    graphs = initialise_graphs(graphs_pickle, data)
+
+    for block_hash, error in sorted(graphs.errors.items(), key=lambda item: repr(data.get_block_from_hash(item[0]))):
+        print(f"{data.get_block_from_hash(block_hash)!r}: {error}")  # noqa: T201
+
+    print(f"{len(graphs.dots)} CALC graphs generated, {len(graphs.errors)} errors")  # noqa: T201
+
+
+def cli() -> None:
+    parser = ArgumentParser(prog="foxemu")
+    subparsers = parser.add_subparsers(dest="command")
+
+    graphs_parser = subparsers.add_parser("graphs", help="precompute CALC logic flow graphs")
+    graphs_parser.add_argument("--dumps", type=Path, required=True, help="directory containing ICC dumps")
+    graphs_parser.add_argument("--data", type=Path, required=True, help="path to load/store the data pickle")
+    graphs_parser.add_argument("--output", type=Path, required=True, help="path to store the graphs pickle")
+
+    args = parser.parse_args()
+
+    match args.command:
+        case "graphs":
+            precompute_graphs(args.dumps, args.data, args.output)
+        case _:
+            parser.print_help()
+
+
+if __name__ == "__main__":
+    cli()
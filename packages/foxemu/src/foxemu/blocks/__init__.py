@@ -2,8 +2,11 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from foxemu.scheduling import Clock
+from foxemu.signaling import Output, Precision
+
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Generator, Sequence
 
     from foxemu.signaling import Parameter
 
@@ -13,10 +16,14 @@ class EmulatedBlock:
 
     compound: str
     name: str
+    precision: Precision
+    clock: Clock
 
     def __init__(self, compound: str, name: str) -> None:
         self.compound = compound
         self.name = name
+        self.precision = Precision.CONTROLLER
+        self.clock = Clock()
 
     def __repr__(self) -> str:
         return f"{self.__qualname__}({self.compound}:{self.name})"
@@ -28,6 +35,32 @@ class EmulatedBlock:
         """Iterate over block parameters."""
         raise GeneratorExit
 
+    @property
+    def period(self) -> int:
+        """PERIOD code of the block, see `foxemu.scheduling.PERIODS`."""
+        return 1
+
+    @property
+    def phase(self) -> int:
+        """PHASE of the block, the tick within its period that it executes on."""
+        return 0
+
+    def state_iter(self) -> Generator[Parameter]:
+        """Iterate over parameters holding state that changes as the block executes, ie. outputs."""
+        return (attr for attr in self.parameters_iter() if isinstance(attr, Output))
+
+    def get_memory(self) -> tuple[float, ...]:
+        """Get internal state that persists between executions, other than parameters. Its length must not change."""
+        return ()
+
+    def set_memory(self, memory: Sequence[float]) -> None:
+        """Set internal state from values returned by `get_memory`."""
+        pass
+
+    def get_fingerprint(self) -> tuple[float, ...]:
+        """Get internal state that is compared between cycles to detect a fixed point, see `Emulator.run`."""
+        return self.get_memory()
+
     def get_parameter(self, _key: str) -> Parameter | None:
         """Get block parameter by name."""
         raise RuntimeError
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum, auto
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from .constants import (
+    BREAKING_INSTRUCTIONS,
+    CONDITIONAL_BRANCHES,
+    MAX_STACK_LENGTH,
+    PROGRAM_CACHE_SIZE,
+    PROGRAM_LENGTH,
+    SKIP_INSTRUCTIONS,
+    TERMINATION_INSTRUCTIONS,
+    UNCONDITIONAL_BRANCHES,
+)
+from .program import Step
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+EXACT_LIMIT = 2048
+"""Largest integer magnitude that every precision represents exactly, ie. the limit of IEEE 754 half precision."""
+
+
+class Finding(Enum):
+    UNREACHABLE = auto()
+    NO_OP = auto()
+    CONSTANT = auto()
+
+    def __str__(self) -> str:
+        return f"{self.description}"
+
+    @property
+    def description(self) -> str:
+        return FINDING_DESCRIPTIONS[self]
+
+
+FINDING_DESCRIPTIONS = {
+    Finding.UNREACHABLE: "unreachable step, can never execute",
+    Finding.NO_OP: "step has no effect",
+    Finding.CONSTANT: "constant expression, folded into a single value",
+}
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Run of steps computing a constant from constants alone, which can be replaced by pushing its result."""
+
+    start: int
+    end: int
+    value: int
+    depth: int
+
+
+@dataclass(frozen=True)
+class Analysis:
+    """
+    Findings of static analysis of a CALC program, independent of any block instance.
+
+    Instances are shared between blocks with identical programs so must not be mutated.
+    """
+
+    findings: tuple[tuple[int, Finding], ...]
+    unreachable: frozenset[int]
+    folds: tuple[Fold, ...]
+
+    @property
+    def removable(self) -> frozenset[int]:
+        """Step numbers that can be skipped without changing the result of executing the program."""
+        return self.unreachable | {i for i, finding in self.findings if finding is Finding.NO_OP}
+
+
+def analyse_steps(steps: Mapping[int, Step]) -> Analysis:
+    """Analyse parsed program steps for steps that can never execute or have no effect, and constant expressions."""
+    return analyse_program(tuple(sorted(steps.items())))
+
+
+@lru_cache(maxsize=PROGRAM_CACHE_SIZE)
+def analyse_program(items: tuple[tuple[int, Step], ...]) -> Analysis:
+    """Analyse a program given as pairs of step number and step, cached so identical programs are only analysed once."""
+    steps = dict(items)
+
+    # Indirect branches could go to any step, in which case nothing is known to be unreachable or safe to fold
+    if (targets := branch_targets(steps)) is None:
+        unreachable: frozenset[int] = frozenset()
+        folds: tuple[Fold, ...] = ()
+    else:
+        unreachable = frozenset(steps.keys() - reachable_steps(steps))
+        folds = tuple(fold_constants(steps, unreachable, targets))
+
+    findings = [(i, Finding.UNREACHABLE) for i in unreachable]
+    findings.extend((i, Finding.NO_OP) for i, step in steps.items() if step.opcode == "NOP" and i not in unreachable)
+    findings.extend((fold.start, Finding.CONSTANT) for fold in folds)
+    return Analysis(tuple(sorted(findings, key=lambda finding: finding[0])), unreachable, folds)
+
+
+def successors(i: int, step: Step | None) -> tuple[int, ...] | None:  # noqa: PLR0911
+    """Get the step numbers that can execute after a step, or `None` if they can't be determined statically."""
+    match step:
+        case None:
+            return (i + 1,)
+        case Step(opcode) if opcode in BREAKING_INSTRUCTIONS:
+            return None
+        case Step(opcode) if opcode in TERMINATION_INSTRUCTIONS:
+            return ()
+        case Step(opcode, (int() as target,)) if opcode in UNCONDITIONAL_BRANCHES or opcode in CONDITIONAL_BRANCHES:
+            # Branches to a step past the end of the program fail and continue with the next step
+            if target < 1:
+                return None
+            elif target > PROGRAM_LENGTH:
+                return (i + 1,)
+            elif opcode in UNCONDITIONAL_BRANCHES:
+                return (target,)
+            else:
+                return (target, i + 1)
+        case Step(opcode) if opcode in SKIP_INSTRUCTIONS:
+            return (i + 1, i + 2)
+        case _:
+            return (i + 1,)
+
+
+def branch_targets(steps: Mapping[int, Step]) -> set[int] | None:
+    """Get every step that can execute other than after the step before it, or `None` if that can't be determined."""
+    targets = set()
+
+    for i, step in steps.items():
+        if (following := successors(i, step)) is None:
+            return None
+
+        targets.update(j for j in following if j != i + 1)
+
+    return targets
+
+
+def reachable_steps(steps: Mapping[int, Step]) -> set[int]:
+    """Walk the program from the first step, following every branch, to find the steps that can execute."""
+    reachable = set()
+    pending = [1]
+
+    while pending:
+        if (i := pending.pop()) in reachable or not 1 <= i <= PROGRAM_LENGTH:
+            continue
+
+        reachable.add(i)
+        pending.extend(successors(i, steps.get(i)) or ())
+
+    return reachable
+
+
+def fold_constants(steps: Mapping[int, Step], unreachable: frozenset[int], targets: set[int]) -> list[Fold]:
+    """Find runs of steps that only operate on constants they push, and always compute the same single value."""
+    folds = []
+    i = 1
+
+    while i <= PROGRAM_LENGTH:
+        if i in steps and steps[i].opcode == "IN" and i not in unreachable and (fold := fold_from(steps, i, targets)):
+            folds.append(fold)
+            i = fold.end + 1
+        else:
+            i += 1
+
+    return folds
+
+
+def fold_from(steps: Mapping[int, Step], start: int, targets: set[int]) -> Fold | None:  # noqa: C901
+    """Find the longest foldable run of steps from a step, see `fold_constants`."""
+    stack: list[int] = []
+    depth = 0
+    folded = False
+    fold = None
+
+    # A run can't continue into a step that can be reached other than from the step before it
+    for i in range(start, PROGRAM_LENGTH + 1):
+        if i != start and i in targets:
+            break
+
+        match steps.get(i):
+            case None:
+                continue
+            case Step("NOP", ()):
+                continue
+            case Step("IN", ()):
+                stack.append(0)
+            case Step("IN", (int() as constant,)):
+                stack.append(constant)
+            case Step("ADD" | "MUL" | "SUB" as opcode, ()) if len(stack) >= 2:  # noqa: PLR2004
+                b, a = stack.pop(), stack.pop()
+                stack.append(a + b if opcode == "ADD" else a * b if opcode == "MUL" else a - b)
+                folded = True
+            case Step("ADD", (int() as n,)) if 2 <= n <= len(stack):  # noqa: PLR2004
+                stack[-n:] = [sum(stack[-n:])]
+                folded = True
+            case Step("CHS", ()) if stack:
+                stack[-1] = -stack[-1]
+                folded = True
+            case _:
+                break
+
+        # Only values every precision represents exactly are folded, so that the result doesn't depend on rounding
+        if abs(stack[-1]) > EXACT_LIMIT:
+            break
+
+        depth = max(depth, len(stack))
+
+        if len(stack) == 1 and folded:
+            fold = Fold(start, i, stack[0], depth)
+
+    # Pushing many constants could overflow the stack, so folding is only worthwhile below that limit
+    return fold if fold is not None and fold.depth < MAX_STACK_LENGTH else None
@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+import operator
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import reduce
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from foxemu.signaling import BoolValue, IntegerValue, LongValue, RealValue, ShortValue, UnparsedConnection
+
+from .constants import END_STEP_NUMBER, MAX_STACK_LENGTH, PROGRAM_LENGTH
+from .errors import CalcError
+from .operands import NamedOperand
+from .operations import OPERATIONS
+from .parameters import CalcParameters
+from .timers import Timer
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from numpy.typing import ArrayLike
+
+    from .block import Calc
+    from .program import Step
+
+Kernel = Callable[[np.ndarray], "np.ndarray | int | None"]
+"""Vectorised step, executed for an array of rows and returning their next step numbers, or `None` to increment."""
+
+DEFAULTS = CalcParameters()
+INTEGER_LIMITS = {"I": (-32768, 32767), "L": (-2147483648, 2147483647)}
+CONDITIONS: dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "BIF": lambda x: x == 0,
+    "BIN": lambda x: x < 0,
+    "BIP": lambda x: x >= 0,
+    "BIT": lambda x: x != 0,
+    "BIZ": lambda x: x == 0,
+}
+REDUCTIONS: dict[str, Callable[[list[np.ndarray]], np.ndarray]] = {
+    "ADD": sum,  # type: ignore[dict-item]
+    "MUL": lambda values: reduce(operator.mul, values),
+    "AVE": lambda values: sum(values) / len(values),  # type: ignore[dict-item]
+    "MAX": lambda values: reduce(lambda a, b: np.where(b > a, b, a), values),
+    "MIN": lambda values: reduce(lambda a, b: np.where(b < a, b, a), values),
+    "AND": lambda values: np.logical_and.reduce([np.abs(value) >= 1 for value in values]).astype(np.float64),
+    "OR": lambda values: np.logical_or.reduce([np.abs(value) >= 1 for value in values]).astype(np.float64),
+}
+
+
+def clamp_array(values: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """Clamp values between low and high with the same semantics as `utils.clamp`."""
+    return np.fmax(low, np.fmin(high, values))
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Parameter values after executing a batch, with one element per row of inputs."""
+
+    values: dict[str, np.ndarray]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.values[name]
+
+    @property
+    def perror(self) -> np.ndarray:
+        return self.values["PERROR"].astype(np.int64)
+
+    @property
+    def sterr(self) -> np.ndarray:
+        return self.values["STERR"].astype(np.int64)
+
+
+class BatchExecution:
+    """
+    Executes a CALC program once for each row of input values, in lockstep using NumPy.
+
+    Every row has its own copy of the block's parameters, memory, stack and program pointer. Rows at the same step are
+    executed together, so rows that take different branches are grouped by the path they follow and rejoin
+    wherever the paths meet. Steps without a vectorised form are executed row by row with the block's operations.
+
+    Parameters that are not given as inputs take their current value from the block, the block itself is not changed.
+    """
+
+    calc: Calc
+    rows: int
+    values: dict[str, np.ndarray]
+    stack: np.ndarray
+    bottom: np.ndarray
+    length: np.ndarray
+    memory: np.ndarray
+    kernels: list[Kernel | None]
+    scratch: Calc | None
+
+    def __init__(self, calc: Calc, inputs: Mapping[str, ArrayLike]) -> None:
+        self.calc = calc
+        arrays = {name: np.asarray(values, dtype=np.float64) for name, values in inputs.items()}
+
+        if len(lengths := {array.shape[0] for array in arrays.values() if array.ndim}) > 1:
+            description = "input arrays must all have the same length"
+            raise RuntimeError(description)
+
+        self.rows = lengths.pop() if lengths else 1
+        self.values = self.load_values(arrays)
+
+        for step in calc.steps.values():
+            for operand in step.operands:
+                if isinstance(operand, NamedOperand) and operand.name not in self.values:
+                    description = f"unparsed connection: '{operand.name}'"
+                    raise RuntimeError(description)
+
+        self.stack = np.zeros((self.rows, MAX_STACK_LENGTH))
+        self.bottom = np.zeros(self.rows, dtype=np.int64)
+        self.length = np.zeros(self.rows, dtype=np.int64)
+        self.memory = np.tile(np.array(calc.get_memory(), dtype=np.float64), (self.rows, 1))
+        self.scratch = None
+        self.kernels = [self.kernel(i, calc.steps.get(i)) for i in range(1, PROGRAM_LENGTH + 1)]
+
+    def load_values(self, arrays: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        """Load a column of values for each numeric parameter, from the inputs or otherwise the block."""
+        columns = {}
+
+        for name in CalcParameters.__dataclass_fields__:
+            parameter = getattr(self.calc.parameters, name)
+
+            if name in arrays:
+                values = np.broadcast_to(arrays.pop(name), (self.rows,))
+            elif isinstance(parameter.inner, UnparsedConnection):
+                continue
+            elif isinstance(value := parameter.get_value(), RealValue | IntegerValue | BoolValue):
+                values = np.full(self.rows, float(value.get()))
+            else:
+                continue
+
+            if (column := self.store(name, values)) is None:
+                description = f"input is not a numeric parameter: '{name}'"
+                raise RuntimeError(description)
+
+            columns[name] = column
+
+        if arrays:
+            description = f"inputs are not CALC parameters: {', '.join(sorted(arrays))}"
+            raise RuntimeError(description)
+
+        return columns
+
+    def store(self, name: str, values: np.ndarray) -> np.ndarray | None:
+        """Convert values to how they are stored by a parameter, or `None` if the parameter isn't numeric."""
+        match getattr(DEFAULTS, name).get_value():
+            case RealValue():
+                return self.calc.precision.round_array(values)
+            case ShortValue():
+                return np.trunc(clamp_array(values, -128, 127))  # type: ignore[arg-type]
+            case LongValue():
+                return np.trunc(clamp_array(values, *INTEGER_LIMITS["L"]))  # type: ignore[arg-type]
+            case IntegerValue():
+                return np.trunc(clamp_array(values, *INTEGER_LIMITS["I"]))  # type: ignore[arg-type]
+            case BoolValue():
+                return (values != 0).astype(np.float64)
+            case _:
+                return None
+
+    def run(self) -> BatchResult:
+        """Execute the program for a full cycle on every row."""
+        pointer = np.ones(self.rows, dtype=np.int64)
+
+        # Shouldn't execute if there is a syntax error
+        if self.calc.syntax_error:
+            pointer[:] = END_STEP_NUMBER
+
+        # Always execute the earliest step that any row is waiting on, so rows that branch apart rejoin later
+        with np.errstate(all="ignore"):
+            while (running := np.flatnonzero(pointer <= PROGRAM_LENGTH)).size:
+                step_number = int(pointer[running].min())
+                rows = running[pointer[running] == step_number]
+
+                if (kernel := self.kernels[step_number - 1]) is None or (jumps := kernel(rows)) is None:
+                    pointer[rows] = step_number + 1
+                else:
+                    pointer[rows] = jumps
+
+        return BatchResult({name: column.copy() for name, column in self.values.items()})
+
+    def kernel(self, i: int, step: Step | None) -> Kernel | None:  # noqa: C901, PLR0911, PLR0912
+        """Create a vectorised kernel for a step, falling back to executing rows individually."""
+        if step is None:
+            return None
+
+        match step.opcode, step.operands:
+            case ("NOP", ()):
+                return None
+            case ("IN", ()):
+                return self.pushes(i, lambda _: 0.0)
+            case ("IN", (int() as constant,)):
+                return self.pushes(i, lambda _: float(constant))
+            case ("IN", (NamedOperand() as operand,)):
+                return self.pushes(i, lambda rows: self.read(operand, rows))
+            case ("OUT" | "STM", (NamedOperand() as operand,)):
+                return lambda rows: self.write(operand, rows, self.top(rows))
+            case ("ADD" | "MUL" | "AVE", ()):
+                return self.pushes(i, lambda rows: REDUCTIONS[step.opcode]([self.pop(rows, i), self.pop(rows, i)]))
+            case (opcode, (int() as count,)) if opcode in REDUCTIONS and count >= 1:
+                return self.pushes(i, lambda rows: REDUCTIONS[opcode]([self.pop(rows, i) for _ in range(count)]))
+            case (opcode, (NamedOperand() as operand,)) if opcode in REDUCTIONS:
+                return self.pushes(i, lambda rows: REDUCTIONS[opcode]([self.pop(rows, i), self.read(operand, rows)]))
+            case ("SUB", ()):
+                return self.pushes(i, lambda rows: -self.pop(rows, i) + self.pop(rows, i))
+            case ("SUB", (NamedOperand() as operand,)):
+                return self.pushes(i, lambda rows: self.pop(rows, i) - self.read(operand, rows))
+            case ("DIV", ()):
+                return lambda rows: self.divide(rows, i, self.pop(rows, i))
+            case ("DIV", (NamedOperand() as operand,)):
+                return lambda rows: self.divide(rows, i, self.read(operand, rows))
+            case ("CHS", ()):
+                return self.pushes(i, lambda rows: -self.pop(rows, i))
+            case ("ABS", ()):
+                return self.pushes(i, lambda rows: np.abs(self.pop(rows, i)))
+            case ("POP", ()):
+                return lambda rows: self.discard(rows, i)
+            case ("CST", ()):
+                return self.clear
+            case ("END" | "EXIT", ()):
+                return lambda _: END_STEP_NUMBER
+            case ("GTO", (int() as target,)) if 1 <= target <= PROGRAM_LENGTH:
+                return lambda _: target
+            case (opcode, (int() as target,)) if opcode in CONDITIONS and 1 <= target <= PROGRAM_LENGTH:
+                return lambda rows: np.where(CONDITIONS[opcode](self.top(rows)), target, i + 1)
+            case _:
+                return self.fallback(i, step)
+
+    def pushes(self, i: int, value: Callable[[np.ndarray], np.ndarray | float]) -> Kernel:
+        """Create a kernel pushing the result of a vectorised expression."""
+
+        def kernel(rows: np.ndarray) -> None:
+            self.push(rows, value(rows), i)
+
+        return kernel
+
+    def fallback(self, i: int, step: Step) -> Kernel:
+        """Create a kernel executing the step's operation on each row in turn, using a scratch block."""
+        operation = OPERATIONS[step.opcode].operation
+        names = [name for name in self.accessed(step) if name in self.values]
+
+        def kernel(rows: np.ndarray) -> np.ndarray:
+            scratch = self.get_scratch()
+            jumps = np.empty(rows.size, dtype=np.int64)
+
+            for k, row in enumerate(rows.tolist()):
+                self.load_row(scratch, row, names)
+                scratch.pointer = i
+                operation(scratch, *step.operands)
+                self.store_row(scratch, row, names)
+
+                if scratch.should_terminate:
+                    jumps[k] = END_STEP_NUMBER
+                elif scratch.should_increment:
+                    jumps[k] = scratch.pointer + 1
+                else:
+                    jumps[k] = scratch.pointer
+
+            return jumps
+
+        return kernel
+
+    @staticmethod
+    def accessed(step: Step) -> set[str]:
+        """Find parameters that a step's operation can access, ie. its operands, their scale limits and error state."""
+        names = {"MA", "PERROR", "STERR"}
+
+        for operand in step.operands:
+            if isinstance(operand, NamedOperand):
+                names.add(operand.name)
+
+                if operand.prefix[0] == "R" and len(operand.prefix) > 1 and len(operand.suffix) > 1:
+                    names.update(f"{limit}{operand.prefix[1]}{operand.suffix[1]}" for limit in ("LSC", "HSC"))
+
+        # Clearing all memory registers is the only operation accessing parameters other than its operands
+        if step.opcode == "CLA":
+            names.update(f"M{x:02d}" for x in range(1, 25))
+
+        return names
+
+    def get_scratch(self) -> Calc:
+        """Get a block without a program, used to hold the state of a single row."""
+        if self.scratch is None:
+            from .block import Calc  # noqa: PLC0415
+
+            self.scratch = Calc(self.calc.compound, self.calc.name, CalcParameters())
+            self.scratch.precision = self.calc.precision
+            self.scratch.clock = self.calc.clock
+            self.scratch.timers = {i: Timer() for i in self.calc.timers}
+
+            for name in self.values:
+                if isinstance(value := getattr(self.scratch.parameters, name).get_value(), RealValue):
+                    value.precision = self.calc.precision
+
+        return self.scratch
+
+    def load_row(self, scratch: Calc, row: int, names: list[str]) -> None:
+        """Load the state of a row into the scratch block."""
+        for name in names:
+            getattr(scratch.parameters, name).get_value().set(self.values[name][row].item())
+
+        scratch.stack.clear()
+
+        for j in range(self.length[row]):
+            scratch.stack.push(self.stack[row, (self.bottom[row] + j) % MAX_STACK_LENGTH].item(), 0)
+
+        scratch.set_memory(self.memory[row].tolist())
+        scratch.errors = []
+        scratch.should_increment = True
+        scratch.should_terminate = False
+
+    def store_row(self, scratch: Calc, row: int, names: list[str]) -> None:
+        """Store the state of the scratch block back into a row."""
+        for name in names:
+            self.values[name][row] = float(getattr(scratch.parameters, name).get_value().get())
+
+        values = [value for value, _ in scratch.stack]
+        self.stack[row, : len(values)] = values
+        self.bottom[row] = 0
+        self.length[row] = len(values)
+        self.memory[row] = scratch.get_memory()
+
+    def error(self, rows: np.ndarray, i: int, error: CalcError) -> None:
+        """Set error parameters for rows."""
+        self.values["PERROR"][rows] = error.value
+        self.values["STERR"][rows] = i
+
+    def push(self, rows: np.ndarray, values: np.ndarray | float, i: int) -> None:
+        """Push values to the top of each row's stack, discarding the bottom value of full stacks."""
+        values = self.calc.precision.round_array(np.broadcast_to(values, rows.shape))
+        full = self.length[rows] == MAX_STACK_LENGTH
+        self.stack[rows, (self.bottom[rows] + self.length[rows]) % MAX_STACK_LENGTH] = values
+        self.length[rows[~full]] += 1
+
+        if full.any():
+            overflowed = rows[full]
+            self.bottom[overflowed] = (self.bottom[overflowed] + 1) % MAX_STACK_LENGTH
+            self.error(overflowed, i, CalcError.STACK_OVERFLOW)
+
+    def pop(self, rows: np.ndarray, i: int) -> np.ndarray:
+        """Pop values from the top of each row's stack, popping zero from empty stacks."""
+        empty = self.length[rows] == 0
+        self.length[rows[~empty]] -= 1
+        values = self.stack[rows, (self.bottom[rows] + self.length[rows]) % MAX_STACK_LENGTH]
+
+        if empty.any():
+            values[empty] = 0
+            self.error(rows[empty], i, CalcError.STACK_UNDERFLOW)
+
+        return values
+
+    def top(self, rows: np.ndarray) -> np.ndarray:
+        """Get the value at the top of each row's stack, raising `IndexError` if any stack is empty."""
+        if (self.length[rows] == 0).any():
+            description = "top of empty stack"
+            raise IndexError(description)
+
+        return self.stack[rows, (self.bottom[rows] + self.length[rows] - 1) % MAX_STACK_LENGTH]
+
+    def discard(self, rows: np.ndarray, i: int) -> None:
+        """Pop values from each row's stack without using them."""
+        self.pop(rows, i)
+
+    def clear(self, rows: np.ndarray) -> None:
+        """Clear all values from each row's stack."""
+        self.bottom[rows] = 0
+        self.length[rows] = 0
+
+    def divide(self, rows: np.ndarray, i: int, denominator: np.ndarray) -> None:
+        """Pop the numerator and push the quotient, pushing zero and raising an error when dividing by zero."""
+        numerator = self.pop(rows, i)
+        zero = denominator == 0
+
+        if zero.any():
+            self.error(rows[zero], i, CalcError.DIV)
+
+        self.push(rows, np.where(zero, 0, numerator / np.where(zero, 1, denominator)), i)
+
+    def read(self, operand: NamedOperand, rows: np.ndarray) -> np.ndarray:
+        """Read the value of a named operand for each row."""
+        values = self.values[operand.name][rows]
+
+        if operand.inverted:
+            return (values == 0).astype(np.float64)
+        elif operand.prefix[0] == "R":
+            return clamp_array(values, *self.limits(operand, rows))
+        else:
+            return values
+
+    def write(self, operand: NamedOperand, rows: np.ndarray, values: np.ndarray) -> None:
+        """Write values to a named operand for each row, outputs are only written in auto mode."""
+        column = self.values[operand.name]
+
+        if operand.prefix.startswith("M"):
+            column[rows] = self.calc.precision.round_array(values)
+            return
+
+        enabled = self.values["MA"][rows] != 0
+        rows, values = rows[enabled], values[enabled]
+
+        match operand.prefix[0]:
+            case "R":
+                column[rows] = self.calc.precision.round_array(clamp_array(values, *self.limits(operand, rows)))
+            case "I" | "L" as prefix:
+                column[rows] = np.trunc(clamp_array(values, *INTEGER_LIMITS[prefix]))  # type: ignore[arg-type]
+            case "B":
+                column[rows] = values != 0
+
+    def limits(self, operand: NamedOperand, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Read the scale limits of a real operand for each row."""
+        low = self.read(NamedOperand("LSC" + operand.prefix[1], operand.suffix[1], inverted=False), rows)
+        high = self.read(NamedOperand("HSC" + operand.prefix[1], operand.suffix[1], inverted=False), rows)
+        return low, high
+
+
+def execute_batch(calc: Calc, inputs: Mapping[str, ArrayLike]) -> BatchResult:
+    """Execute a block's program once for each row of input values, see `BatchExecution`."""
+    return BatchExecution(calc, inputs).run()
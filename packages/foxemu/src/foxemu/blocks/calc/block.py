@@ -1,35 +1,30 @@
 from __future__ import annotations
 
-import re
-from dataclasses import dataclass
+from functools import partial
 from typing import TYPE_CHECKING
 
 from utils import clamp
 
 from foxemu.blocks import EmulatedBlock
-from foxemu.signaling import BoolValue, IntegerValue, LongValue, Parameter, RealValue
+from foxemu.signaling import BoolValue, IntegerValue, LongValue, Parameter, RealValue, UnparsedConnection
 
-from .constants import INITIAL_SEED, MAX_STACK_LENGTH
+from .constants import INITIAL_SEED, MAX_STACK_LENGTH, PROGRAM_LENGTH, TIMER_INSTRUCTIONS
 from .errors import CalcError
-from .operands import NamedOperand, Operands, parse_operand
+from .operands import NamedOperand
 from .parameters import CalcParameters
+from .program import Step, parse_program
+from .stack import Stack
+from .timers import TIMER_SIZE, Timer
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Generator
+    from collections.abc import Callable, Generator, Mapping, Sequence
 
     from foxdata.models import Block
+    from numpy.typing import ArrayLike
 
-
-@dataclass
-class StackElement:
-    value: RealValue
-    step: int
-
-
-@dataclass
-class Step:
-    opcode: str
-    operands: Operands
+    from .analysis import Analysis, Fold
+    from .batch import BatchResult
+    from .compiler import BasicBlock
 
 
 class Calc(EmulatedBlock):
@@ -37,46 +32,58 @@ class Calc(EmulatedBlock):
 
     parameters: CalcParameters
     errors: list[tuple[int, CalcError]]
-    stack: list[StackElement]
+    stack: Stack
     program: list[Callable[[], None] | None]
+    compiled: dict[int, BasicBlock] | None
     steps: dict[int, Step]
+    analysis: Analysis | None
     pointer: int
     should_increment: bool
     should_terminate: bool
     syntax_error: bool
     seed: int
+    executions: int
+    timers: dict[int, Timer]
 
     def __init__(self, compound: str, name: str, parameters: CalcParameters) -> None:
         # Initialise parameters and persistent internal state
         super().__init__(compound, name)
         self.seed = INITIAL_SEED
+        self.executions = 0
         self.parameters = parameters
-        self.parameters.MA.get_value().set(self.parameters.INITMA.get_value().get() != 0)
+
+        # A connected MA follows its source rather than being initialised
+        if not isinstance(self.parameters.MA.inner, UnparsedConnection):
+            self.parameters.MA.get_value().set(self.parameters.INITMA.get_value().get() != 0)
 
         # Initialise internal state that is reset upon execution
         self.errors = []
-        self.stack = []
+        self.stack = Stack()
         self.pointer = 1
         self.should_increment = True
         self.should_terminate = False
         self.syntax_error = False
 
-        # Parse steps into program, ie. list of productions to execute
-        self.program = []
-        self.steps = {}
+        # Parse steps into program, ie. list of productions to execute, steps are shared between identical programs
+        program = parse_program(self.parameters.step_text())
+        self.program = [None] * PROGRAM_LENGTH
+        self.compiled = None
+        self.steps = program.steps
+
+        for i, operation, operands in program.operations:
+            self.program[i - 1] = partial(operation, self, *operands)
 
-        for i in range(1, 51):
-            parameter = self.parameters.get_step(i)
+        # Each timing instruction has its own timer, keyed by step number
+        self.timers = {i: Timer() for i, step in self.steps.items() if step.opcode in TIMER_INSTRUCTIONS}
 
-            match self.parse_step(parameter.get_value().get()):
-                case None:
-                    self.program.append(None)
-                case CalcError() as error:
-                    self.program.append(None)
-                    self.error(i, error)
-                case (production, opcode, operands):
-                    self.program.append(production)
-                    self.steps[i] = Step(opcode, operands)
+        for i, error in program.errors:
+            self.error(i, error)
+
+        # Skip steps that can't affect the result and fold constant expressions, unless the program can't execute
+        self.analysis = None if self.syntax_error else program.analysis
+
+        if self.analysis is not None:
+            self.optimise(self.analysis)
 
     @staticmethod
     def from_block(block: Block) -> Calc:
@@ -85,14 +92,41 @@ class Calc(EmulatedBlock):
 
     def parameters_iter(self) -> Generator[Parameter]:
         """Iterate over block parameters."""
+        return self.parameters.parameters_iter()
+
+    @property
+    def period(self) -> int:
+        return self.parameters.PERIOD.get_value().get()
+
+    @property
+    def phase(self) -> int:
+        return self.parameters.PHASE.get_value().get()
+
+    def state_iter(self) -> Generator[Parameter]:
+        """Iterate over parameters holding state that changes as the block executes, ie. outputs and memory."""
+        yield from super().state_iter()
+        yield from (getattr(self.parameters, f"M{x:02d}") for x in range(1, 25))
+
+    def get_memory(self) -> tuple[float, ...]:
+        return (self.seed, self.executions, *(value for timer in self.timers.values() for value in timer.get_memory()))
+
+    def get_fingerprint(self) -> tuple[float, ...]:
+        # The execution count changes every cycle, so it's left out for blocks to reach a fixed point, but timers still
+        # timing a delay in cycles aren't at a fixed point as their outputs change once the delay elapses
+        timers = self.timers.values()
         return (
-            attr
-            for attr in filter(
-                lambda attr: isinstance(attr, Parameter),
-                self.parameters.__dict__.values(),
-            )
+            self.seed,
+            *(value for timer in timers for value in timer.get_memory()),
+            *(timer.remaining(self) for timer in timers),
         )
 
+    def set_memory(self, memory: Sequence[float]) -> None:
+        self.seed = int(memory[0])
+        self.executions = int(memory[1])
+
+        for i, timer in enumerate(self.timers.values()):
+            timer.set_memory(memory[2 + i * TIMER_SIZE : 2 + (i + 1) * TIMER_SIZE])
+
     def get_parameter(self, key: str) -> Parameter | None:
         """Get block parameter by name."""
         return getattr(self.parameters, key, None)
@@ -129,13 +163,15 @@ class Calc(EmulatedBlock):
             self.error(self.pointer, CalcError.INVALID_OPERAND)
             return
         elif operand.prefix.startswith("M"):
-            p.assign_value(RealValue(value))
-        elif self.parameters.MA.get_value():
+            p.assign_value(RealValue(value, self.precision))
+        elif self.parameters.MA.get_value().get():
             match operand.prefix[0]:
                 case "R":
                     high = NamedOperand("HSC" + operand.prefix[1], operand.suffix[1], operand.inverted)
                     low = NamedOperand("LSC" + operand.prefix[1], operand.suffix[1], operand.inverted)
-                    p.assign_value(RealValue(clamp(value, self.get_operand(low), self.get_operand(high))))
+                    p.assign_value(
+                        RealValue(clamp(value, self.get_operand(low), self.get_operand(high)), self.precision)
+                    )
                 case "I":
                     p.assign_value(IntegerValue(value))
                 case "L":
@@ -143,42 +179,34 @@ class Calc(EmulatedBlock):
                 case "B":
                     p.assign_value(BoolValue(bool(value)))
 
-    def parse_step(self, step: str) -> tuple[Callable[[], None], str, Operands] | None | CalcError:
-        """Parse a string into a production with metadata."""
-        # Empty string returns a no-op
-        if len(step) == 0:
-            return None
-
-        from . import operations  # noqa: PLC0415
-
-        # Strip comments and split into tokens
-        tokens = re.sub(";.*", "", step).strip().split()
-
-        match len(tokens):
-            case 0:
-                # No tokens, return no-op
-                return None
-            case 1:
-                # Opcode without any operands
-                opcode = tokens[0]
-                operands = ()
-            case _:
-                # Opcode with operands, parse operands into a tuple
-                opcode = tokens[0]
-                operands = tuple(operand for s in tokens[1:] if (operand := parse_operand(s)) is not None)
-
-        # Attempt to get producer from operations module
-        producer: operations.Producer | None = getattr(operations, opcode, None)
-
-        if producer is None:
-            # Producer not found, opcode must be invalid
-            return CalcError.INVALID_OPCODE
-        elif production := producer(self, operands):
-            # Producer found and operands verified, return production
-            return (production, opcode, operands)
-        else:
-            # Producer found but operands failed verification
-            return CalcError.INVALID_OPERAND
+    def optimise(self, analysis: Analysis) -> None:
+        """Replace productions in the program according to static analysis, see `analysis.analyse_steps`."""
+        for i in analysis.removable:
+            self.program[i - 1] = None
+
+        for fold in analysis.folds:
+            productions = self.program[fold.start - 1 : fold.end]
+            self.program[fold.start - 1 : fold.end] = [None] * len(productions)
+            self.program[fold.start - 1] = self.fold(fold, productions)
+
+    def fold(self, fold: Fold, productions: list[Callable[[], None] | None]) -> Callable[[], None]:
+        """Create a production pushing the result of a constant expression in place of the steps computing it."""
+        value = fold.value
+        end = fold.end
+
+        def production() -> None:
+            # Overflow is reported at the step where it happens, so execute the steps as written if it would happen
+            if self.stack.length + fold.depth > MAX_STACK_LENGTH:
+                for pointer, step in enumerate(productions, start=fold.start):
+                    self.pointer = pointer
+
+                    if step:
+                        step()
+            else:
+                self.stack.push(self.precision.round(value), end)
+                self.pointer = end
+
+        return production
 
     def error(self, step_number: int, error: CalcError) -> None:
         """Set error parameters and append to errors list."""
@@ -192,10 +220,7 @@ class Calc(EmulatedBlock):
 
     def push(self, value: float) -> None:
         """Push value to the top of the stack."""
-        self.stack.append(StackElement(value=RealValue(value), step=self.pointer))
-
-        if len(self.stack) > MAX_STACK_LENGTH:
-            self.stack.pop(0)
+        if self.stack.push(self.precision.round(value), self.pointer):
             self.error(self.pointer, CalcError.STACK_OVERFLOW)
 
     def pop(self) -> float:
@@ -204,7 +229,7 @@ class Calc(EmulatedBlock):
             self.error(self.pointer, CalcError.STACK_UNDERFLOW)
             return 0
 
-        return self.stack.pop().value.get()
+        return self.stack.pop()
 
     def pop_many(self, n: int) -> list[float]:
         """Pop multiple values from the top of the stack."""
@@ -213,9 +238,7 @@ class Calc(EmulatedBlock):
 
     def pop_all(self) -> list[float]:
         """Pop all values from the stack."""
-        values = [element.value.get() for element in self.stack]
-        self.clear()
-        return values
+        return self.stack.pop_all()
 
     def clear(self) -> None:
         """Clear all values from the stack."""
@@ -223,7 +246,7 @@ class Calc(EmulatedBlock):
 
     def acc(self) -> float:
         """Return accumulator value (top of stack)."""
-        return self.stack[-1].value.get()
+        return self.stack.top()
 
     def jump(self, x: int) -> None:
         """Jump to step 'x'."""
@@ -239,7 +262,7 @@ class Calc(EmulatedBlock):
     def rng(self) -> float:
         """Generate pseudo-random real value of uniform distrubtion in range [0,1]."""
         self.seed = self.seed * 125 % 2796203
-        return RealValue(self.seed / 2796203).get()
+        return self.precision.round(self.seed / 2796203)
 
     def execute(self) -> None:
         """Execute the block once."""
@@ -249,11 +272,15 @@ class Calc(EmulatedBlock):
 
         # Reset internal state
         self.errors = []
-        self.stack = []
+        self.stack.clear()
         self.pointer = 1
         self.should_increment = True
         self.should_terminate = False
 
+        # Execute compiled program if available, the interpreter picks up from wherever it leaves off
+        if self.compiled is not None:
+            self.pointer = self.execute_compiled(self.compiled)
+
         # Execute program for a full cycle
         while not self.should_terminate and self.pointer <= len(self.program):
             if operation := self.program[self.pointer - 1]:
@@ -264,6 +291,39 @@ class Calc(EmulatedBlock):
             else:
                 self.should_increment = True
 
+        # Count executions for timers measuring delays in cycles
+        self.executions += 1
+
+    def execute_compiled(self, compiled: dict[int, BasicBlock]) -> int:
+        """Execute compiled basic blocks until reaching a step that doesn't start one, returning that step."""
+        stack = self.stack
+        pointer = 1
+
+        while (basic_block := compiled.get(pointer)) is not None:
+            pointer = basic_block(stack)
+
+        return pointer
+
+    def execute_batch(self, inputs: Mapping[str, ArrayLike]) -> BatchResult:
+        """Execute the program once for each row of input values without changing the block, see `BatchExecution`."""
+        from .batch import execute_batch  # noqa: PLC0415
+
+        return execute_batch(self, inputs)
+
+    def compile(self) -> None:
+        """Compile the program into Python functions to be executed in place of the interpreter."""
+        if self.syntax_error:
+            return
+
+        from .compiler import compile_program  # noqa: PLC0415
+
+        steps = self.steps
+
+        if self.analysis is not None and (removable := self.analysis.removable):
+            steps = {i: step for i, step in steps.items() if i not in removable}
+
+        self.compiled = compile_program(steps).link(self)
+
     def generate_dot(self) -> str:
         from .graphing import generate_dot  # noqa: PLC0415
 
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from utils import clamp
+
+from foxemu.signaling import BoolValue, IntegerValue, LongValue, RealValue
+
+from .constants import (
+    BRANCH_INSTRUCTIONS,
+    END_STEP_NUMBER,
+    PROGRAM_CACHE_SIZE,
+    PROGRAM_LENGTH,
+    SKIP_INSTRUCTIONS,
+    TERMINATION_INSTRUCTIONS,
+)
+from .errors import CalcError
+from .operands import NamedOperand
+from .operations import OPERATIONS
+from .parameters import CalcParameters
+
+if TYPE_CHECKING:
+    from foxemu.signaling import Parameter
+
+    from .block import Calc
+    from .program import Step
+    from .stack import Stack
+
+BasicBlock = Callable[["Stack"], int]
+"""Compiled run of steps, executed with the block's stack and returning the number of the next step to execute."""
+
+CONDITIONS = {
+    "BIF": "== 0",
+    "BIN": "< 0",
+    "BIP": ">= 0",
+    "BIT": "!= 0",
+    "BIZ": "== 0",
+}
+ACC = "stack.top()"
+
+
+def underflow(block: Calc, step_number: int) -> float:
+    """Raise stack underflow error for an empty stack, used in place of a popped value."""
+    block.error(step_number, CalcError.STACK_UNDERFLOW)
+    return 0
+
+
+NAMESPACE = {
+    "BoolValue": BoolValue,
+    "CalcError": CalcError,
+    "IntegerValue": IntegerValue,
+    "LongValue": LongValue,
+    "RealValue": RealValue,
+    "clamp": clamp,
+    "underflow": underflow,
+}
+
+
+@dataclass(frozen=True)
+class CompiledProgram:
+    """
+    CALC program compiled into Python source, independent of any block instance.
+
+    Steps are grouped into basic blocks starting at each branch target, each compiled into a function that
+    executes its steps in sequence and returns the number of the next step. Named operands are resolved to
+    parameter slots when the program is linked to a block.
+    """
+
+    source: str
+    slots: tuple[str, ...]
+    factory: Callable[..., dict[int, BasicBlock]]
+
+    def link(self, block: Calc) -> dict[int, BasicBlock]:
+        """Bind the compiled program to a block, returning basic blocks keyed by the step number they start at."""
+        parameters: list[Parameter] = [getattr(block.parameters, name) for name in self.slots]
+        return self.factory(block, *parameters)
+
+
+class ProgramCompiler:
+    """Generates Python source for a CALC program, falling back to calling operations for steps not inlined."""
+
+    steps: dict[int, Step]
+    slots: dict[str, str]
+    namespace: dict[str, object]
+
+    def __init__(self, steps: dict[int, Step]) -> None:
+        self.steps = steps
+        self.slots = {}
+        self.namespace = dict(NAMESPACE)
+
+    def compile(self) -> CompiledProgram:
+        """Compile the program into basic blocks and execute the generated factory function."""
+        leaders = self.leaders()
+        lines = []
+
+        for start, end in zip(leaders, (*leaders[1:], END_STEP_NUMBER), strict=True):
+            lines.append(f"    def step_{start}(stack):")
+            lines.append("        precision = block.precision")
+            lines.extend(f"        {line}" for line in self.basic_block(start, end))
+            lines.append("")
+
+        lines.append(f"    return {{{', '.join(f'{start}: step_{start}' for start in leaders)}}}")
+        source = "\n".join((f"def link({', '.join(('block', *self.slots.values()))}):", *lines, ""))
+
+        exec(compile(source, "<calc program>", "exec"), self.namespace)  # noqa: S102
+        return CompiledProgram(source, tuple(self.slots), self.namespace["link"])  # type: ignore[arg-type]
+
+    def leaders(self) -> list[int]:
+        """Find step numbers that start a basic block, ie. the first step, branch targets and skip targets."""
+        leaders = {1}
+
+        for i, step in self.steps.items():
+            match step.opcode, step.operands:
+                case (opcode, (int() as target,)) if opcode in BRANCH_INSTRUCTIONS and 1 <= target <= PROGRAM_LENGTH:
+                    leaders.add(target)
+                case (opcode, _) if opcode in SKIP_INSTRUCTIONS and i + 2 <= PROGRAM_LENGTH:
+                    leaders.add(i + 2)
+
+        return sorted(leaders)
+
+    def basic_block(self, start: int, end: int) -> list[str]:
+        """Generate the body of a basic block covering steps from `start` until `end`."""
+        lines = []
+
+        for i in range(start, end):
+            if (step := self.steps.get(i)) is None:
+                continue
+
+            lines.extend(self.step(i, step))
+
+            # Anything after an unconditional return is unreachable
+            if lines and lines[-1].startswith("return"):
+                return lines
+
+        lines.append(f"return {end}")
+        return lines
+
+    def step(self, i: int, step: Step) -> list[str]:  # noqa: C901, PLR0911, PLR0912
+        """Generate the statements for a single step, inlining common operations."""
+        match step.opcode, step.operands:
+            case ("IN", ()):
+                return self.push(i, "0")
+            case ("IN", (int() as constant,)):
+                return self.push(i, repr(constant))
+            case ("IN", (NamedOperand() as operand,)) if (value := self.read(operand)) is not None:
+                return self.push(i, value)
+            case ("OUT" | "STM", (NamedOperand() as operand,)) if (lines := self.write(operand, ACC)) is not None:
+                return lines
+            case ("ADD" | "MUL" as opcode, ()):
+                symbol = "+" if opcode == "ADD" else "*"
+                return self.push(i, f"{self.pop(i)} {symbol} {self.pop(i)}")
+            case ("ADD" | "SUB" | "MUL" as opcode, (NamedOperand() as operand,)) if (
+                value := self.read(operand)
+            ) is not None:
+                symbol = {"ADD": "+", "SUB": "-", "MUL": "*"}[opcode]
+                return self.push(i, f"{self.pop(i)} {symbol} {value}")
+            case ("SUB", ()):
+                return self.push(i, f"-{self.pop(i)} + {self.pop(i)}")
+            case ("DIV", ()):
+                return self.divide(i, self.pop(i))
+            case ("DIV", (NamedOperand() as operand,)) if (value := self.read(operand)) is not None:
+                return self.divide(i, value)
+            case ("CHS", ()):
+                return self.push(i, f"-{self.pop(i)}")
+            case ("ABS", ()):
+                return self.push(i, f"abs({self.pop(i)})")
+            case ("POP", ()):
+                return [self.pop(i)]
+            case ("CST", ()):
+                return ["stack.clear()"]
+            case ("NOP", ()):
+                return []
+            case (opcode, ()) if opcode in TERMINATION_INSTRUCTIONS:
+                return [f"return {END_STEP_NUMBER}"]
+            case ("GTO", (int() as target,)) if target <= PROGRAM_LENGTH:
+                return [f"return {target}"]
+            case (opcode, (int() as target,)) if opcode in CONDITIONS and target <= PROGRAM_LENGTH:
+                return [f"if {ACC} {CONDITIONS[opcode]}:", f"    return {target}"]
+            case _:
+                return self.call(i, step)
+
+    def call(self, i: int, step: Step) -> list[str]:
+        """Generate a call to the operation for a step, returning early if it changed the flow of the program."""
+        self.namespace[f"operation_{i}"] = OPERATIONS[step.opcode].operation
+        self.namespace[f"operands_{i}"] = step.operands
+
+        return [
+            f"block.pointer = {i}",
+            f"operation_{i}(block, *operands_{i})",
+            "if block.should_terminate:",
+            f"    return {END_STEP_NUMBER}",
+            "if not block.should_increment:",
+            "    block.should_increment = True",
+            "    return block.pointer",
+            f"if block.pointer != {i}:",
+            "    return block.pointer + 1",
+        ]
+
+    def slot(self, name: str) -> str:
+        """Get the local name bound to a parameter slot, registering the slot if necessary."""
+        return self.slots.setdefault(name, name)
+
+    def read(self, operand: NamedOperand) -> str | None:
+        """Generate an expression reading a named operand, or `None` if it can't be resolved at compile time."""
+        if operand.name not in CalcParameters.__dataclass_fields__:
+            return None
+
+        value = f"{self.slot(operand.name)}.get_value().get()"
+
+        if operand.inverted:
+            return f"(1 if {value} == 0 else 0)"
+        elif operand.prefix[0] == "R":
+            if (limits := self.limits(operand)) is None:
+                return None
+
+            return f"float(clamp({value}, {limits[0]}, {limits[1]}))"
+        else:
+            return f"float({value})"
+
+    def write(self, operand: NamedOperand, value: str) -> list[str] | None:
+        """Generate statements writing to a named operand, or `None` if it can't be resolved at compile time."""
+        if operand.name not in CalcParameters.__dataclass_fields__:
+            return None
+
+        parameter = self.slot(operand.name)
+
+        if operand.prefix.startswith("M"):
+            return [f"{parameter}.assign_value(RealValue({value}, precision))"]
+
+        match operand.prefix[0]:
+            case "R":
+                if (limits := self.limits(operand)) is None:
+                    return None
+
+                assignment = f"RealValue(clamp(value, {limits[0]}, {limits[1]}), precision)"
+            case "I":
+                assignment = "IntegerValue(value)"
+            case "L":
+                assignment = "LongValue(value)"
+            case "B":
+                assignment = "BoolValue(bool(value))"
+            case _:
+                assignment = None
+
+        lines = [f"value = {value}", f"if {self.slot('MA')}.get_value().get():"]
+        return [*lines, f"    {parameter}.assign_value({assignment})"] if assignment else [*lines, "    pass"]
+
+    def limits(self, operand: NamedOperand) -> tuple[str, str] | None:
+        """Generate expressions reading the scale limits of a real operand."""
+        if len(operand.prefix) < 2 or len(operand.suffix) < 2:  # noqa: PLR2004
+            return None
+
+        low = self.read(NamedOperand("LSC" + operand.prefix[1], operand.suffix[1], operand.inverted))
+        high = self.read(NamedOperand("HSC" + operand.prefix[1], operand.suffix[1], operand.inverted))
+        return None if low is None or high is None else (low, high)
+
+    @staticmethod
+    def pop(i: int) -> str:
+        return f"(stack.pop() if stack.length else underflow(block, {i}))"
+
+    @staticmethod
+    def push(i: int, value: str) -> list[str]:
+        return [
+            f"if stack.push(precision.round({value}), {i}):",
+            f"    block.error({i}, CalcError.STACK_OVERFLOW)",
+        ]
+
+    @staticmethod
+    def divide(i: int, denominator: str) -> list[str]:
+        return [
+            f"denominator = {denominator}",
+            f"numerator = {ProgramCompiler.pop(i)}",
+            "if denominator == 0:",
+            f"    block.error({i}, CalcError.DIV)",
+            *(f"    {line}" for line in ProgramCompiler.push(i, "0")),
+            "else:",
+            *(f"    {line}" for line in ProgramCompiler.push(i, "numerator / denominator")),
+        ]
+
+
+def compile_program(steps: dict[int, Step]) -> CompiledProgram:
+    """Compile parsed program steps into Python source, see `CompiledProgram`."""
+    return compile_steps(tuple(steps.items()))
+
+
+@lru_cache(maxsize=PROGRAM_CACHE_SIZE)
+def compile_steps(items: tuple[tuple[int, Step], ...]) -> CompiledProgram:
+    """Compile pairs of step number and step, cached so that identical programs are only compiled once."""
+    return ProgramCompiler(dict(items)).compile()
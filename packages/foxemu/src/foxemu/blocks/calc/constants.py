@@ -1,10 +1,14 @@
 INITIAL_SEED = 100001
 MAX_STACK_LENGTH = 16
+PROGRAM_LENGTH = 50
+PROGRAM_CACHE_SIZE = 4096
 
 CONDITIONAL_BRANCHES = ("BIF", "BII", "BIN", "BIP", "BIT", "BIZ")
 UNCONDITIONAL_BRANCHES = ("GTO",)
 TERMINATION_INSTRUCTIONS = ("END", "EXIT")
 BREAKING_INSTRUCTIONS = ("GTI",)
+SKIP_INSTRUCTIONS = ("SSF", "SSI", "SSN", "SSP", "SST", "SSZ")
+TIMER_INSTRUCTIONS = ("DOFF", "DON", "OSP")
 
 BRANCH_INSTRUCTIONS = (
     *CONDITIONAL_BRANCHES,
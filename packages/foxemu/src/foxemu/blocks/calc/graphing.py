@@ -5,7 +5,7 @@ from enum import Enum, auto
 from itertools import pairwise
 from typing import TYPE_CHECKING
 
-from pydot import Dot, Edge, Node
+from utils import DotGraph, quote_if_necessary
 
 from .constants import (
     BRANCH_INSTRUCTIONS,
@@ -16,9 +16,13 @@ from .constants import (
     TERMINATION_INSTRUCTIONS,
 )
 from .errors import GraphingError
+from .program import parse_block_program
 
 if TYPE_CHECKING:
-    from .block import Calc, Step
+    from foxdata.models import Block
+
+    from .block import Calc
+    from .program import Step
 
 
 @dataclass
@@ -26,13 +30,13 @@ class Group:
     group_id: int
     steps: list[Step]
 
-    def to_node(self) -> Node:
+    def add_node(self, dot: DotGraph) -> None:
         node_style = "rounded" if self.steps[0].opcode in ("START", *TERMINATION_INSTRUCTIONS) else ""
         node_label = "\n".join(
             " ".join([step.opcode] + [str(operand) for operand in step.operands]) for step in self.steps
         )
-        return Node(
-            name=f"Step {self.group_id}",
+        dot.add_node(
+            quote_if_necessary(f"Step {self.group_id}"),
             label=node_label,
             shape="box",
             style=node_style,
@@ -90,7 +94,7 @@ class Conditional:
         else:
             return variant
 
-    def to_node(self) -> Node:
+    def add_node(self, dot: DotGraph) -> None:
         match self.variant:
             case ConditionalVariant.BIF | ConditionalVariant.BIZ:
                 node_label = "== 0?"
@@ -103,8 +107,8 @@ class Conditional:
             case ConditionalVariant.BIT:
                 node_label = "!= 0?"
 
-        return Node(
-            name=f"Step {self.group_id}",
+        dot.add_node(
+            quote_if_necessary(f"Step {self.group_id}"),
             label=node_label,
             shape="diamond",
             regular="true",
@@ -117,9 +121,9 @@ class Conditional:
 
 @dataclass
 class Start:
-    def to_node(self) -> Node:
-        return Node(
-            name="Start",
+    def add_node(self, dot: DotGraph) -> None:
+        dot.add_node(
+            "Start",
             label="START",
             shape="box",
             style="rounded",
@@ -130,9 +134,9 @@ class Start:
 
 @dataclass
 class End:
-    def to_node(self) -> Node:
-        return Node(
-            name="End",
+    def add_node(self, dot: DotGraph) -> None:
+        dot.add_node(
+            "End",
             label="END",
             shape="box",
             style="rounded",
@@ -162,10 +166,10 @@ class GraphEdge:
     dst: int
     label: str = ""
 
-    def to_edge(self) -> Edge:
-        return Edge(
-            src=f"Step {self.src}" if self.src != 0 else "Start",
-            dst=f"Step {self.dst}" if self.dst != END_STEP_NUMBER else "End",
+    def add_edge(self, dot: DotGraph) -> None:
+        dot.add_edge(
+            quote_if_necessary(f"Step {self.src}") if self.src != 0 else "Start",
+            quote_if_necessary(f"Step {self.dst}") if self.dst != END_STEP_NUMBER else "End",
             label=self.label,
             dir="forward",
             fontname="Arial",
@@ -177,13 +181,13 @@ class Graph:
     nodes: list[GraphElement]
     edges: list[GraphEdge]
 
-    def __init__(self, block: Calc) -> None:
-        self.name = f"{block.compound}__{block.name}__calc"
+    def __init__(self, name: str) -> None:
+        self.name = name
         self.nodes = [Start(), End()]
         self.edges = []
 
-    def to_dot(self) -> Dot:
-        dot = Dot(
+    def to_dot(self) -> DotGraph:
+        dot = DotGraph(
             self.name,
             graph_type="graph",
             rankdir="LR",
@@ -191,18 +195,27 @@ class Graph:
         )
 
         for node in self.nodes:
-            dot.add_node(node.to_node())
+            node.add_node(dot)
 
         for edge in self.edges:
-            dot.add_edge(edge.to_edge())
+            edge.add_edge(dot)
 
         return dot
 
     @staticmethod
     def from_block(block: Calc) -> Graph | GraphingError:
         """Parse Calc block into a logic flow graph of steps grouped by sequential execution."""
-        graph = Graph(block)
-        steps = block.steps.copy()
+        return Graph.from_steps(f"{block.compound}__{block.name}__calc", block.steps)
+
+    @staticmethod
+    def from_model(block: Block) -> Graph | GraphingError:
+        """Parse the program of a block model into a logic flow graph, without creating an emulated block."""
+        return Graph.from_steps(f"{block.compound}__{block.name}__calc", parse_block_program(block).steps)
+
+    @staticmethod
+    def from_steps(name: str, steps: dict[int, Step]) -> Graph | GraphingError:
+        """Parse steps into a logic flow graph of steps grouped by sequential execution."""
+        graph = Graph(name)
 
         # Sort steps into groups, each set of steps that will always be executed
         # sequentially (ie. steps between branch origins and branch destinations)
@@ -271,7 +284,7 @@ def parse_steps(steps: dict[int, Step]) -> dict[int, GraphElement | Goto] | Grap
 
             # Reroute branch destinations that would terminate to the merged end step
             if steps[branch.operand].opcode in TERMINATION_INSTRUCTIONS:
-                step.operands = (END_STEP_NUMBER,)
+                branch.operand = END_STEP_NUMBER
 
             # Put branch destination into its own group
             elif branch.operand not in groups:
@@ -298,8 +311,18 @@ def parse_steps(steps: dict[int, Step]) -> dict[int, GraphElement | Goto] | Grap
 
 def generate_dot(block: Calc) -> str:
     """Return DOT format graph as a str from a block."""
-    match Graph.from_block(block):
-        case Graph() as graph:
+    return graph_to_string(Graph.from_block(block))
+
+
+def generate_dot_from_model(block: Block) -> str:
+    """Return DOT format graph as a str from a block model."""
+    return graph_to_string(Graph.from_model(block))
+
+
+def graph_to_string(graph: Graph | GraphingError) -> str:
+    """Return DOT format graph as a str, raising an error if graphing failed."""
+    match graph:
+        case Graph():
             return graph.to_dot().to_string()
         case GraphingError() as error:
             msg = f"GraphingError: {error.description}"
@@ -49,6 +49,23 @@ Verifier = Callable[[Operands], bool]
 Production = Callable[[], None]
 
 
+@dataclass(frozen=True)
+class Instruction:
+    """Operation executing an opcode, called with the block and operands, and the rules for operands it accepts."""
+
+    opcode: str
+    operation: Operation
+    verifier: Verifier
+
+    def verify_operands(self, operands: Operands) -> bool:
+        """Verify that operands are acceptable, including that named operands exist."""
+        return all(
+            operand.name in CalcParameters.__dataclass_fields__
+            for operand in operands
+            if isinstance(operand, NamedOperand)
+        ) and self.verifier(operands)
+
+
 def parse_operand(s: str) -> Operand | None:
     """Parse a string into an operand."""
     try:
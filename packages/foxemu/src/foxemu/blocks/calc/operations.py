@@ -1,19 +1,19 @@
 # ruff: noqa: FIX002, N802, D401, D415
 
+from __future__ import annotations
+
 import math
-from collections.abc import Callable
 from functools import reduce
+from typing import TYPE_CHECKING
 
 from foxemu.signaling import IntegerValue, Parameter
 
-from .block import Calc
 from .constants import INITIAL_SEED
 from .errors import CalcError
 from .operands import (
+    Instruction,
     NamedOperand,
-    Operands,
     Operation,
-    Production,
     Verifier,
     all_of,
     any_of,
@@ -29,14 +29,23 @@ from .operands import (
     real,
 )
 
-Producer = Callable[[Calc, Operands], Production | None]
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .block import Calc
+    from .timers import Timer
+
+OPERATIONS: dict[str, Instruction] = {}
+"""Registry of every supported opcode, populated as operations are defined."""
+
+PACKED_MASK = 0xFFFF
+"""Bits of a packed boolean value."""
 
 
-def verify(func: Verifier) -> Callable[[Operation], Producer]:
+def verify(func: Verifier) -> Callable[[Operation], Operation]:
     """
-    Decorate Operations to transform them into Producers.
+    Decorate Operations to register them as the instruction for the opcode of the same name.
 
-    Transforms the function to verify operands and return another function to produce the executable step.
     Use a combination of verification functions to apply rules for what operands an operation can accept.
 
     e.g.
@@ -46,20 +55,47 @@ def verify(func: Verifier) -> Callable[[Operation], Producer]:
     `@verify(all_of(real, not_inverted))` - operand is required, must be a real, and must not be inverted.
     """
 
-    def decorator(operation: Operation) -> Producer:
-        def producer(block: Calc, operands: Operands) -> Production | None:
-            named_operands_exist = all(
-                hasattr(block.parameters, operand.name) for operand in operands if isinstance(operand, NamedOperand)
-            )
+    def decorator(operation: Operation) -> Operation:
+        return alias(operation.__name__, operation, func)
 
-            if named_operands_exist and func(operands):
-                return lambda: operation(block, *operands)
-            else:
-                return None
+    return decorator
 
-        return producer
 
-    return decorator
+def alias(opcode: str, operation: Operation, func: Verifier | None = None) -> Operation:
+    """Register an operation as the instruction for an opcode, verifying operands as its own opcode does."""
+    verifier = func or OPERATIONS[operation.__name__].verifier
+    OPERATIONS[opcode] = Instruction(opcode, operation, verifier)
+    return operation
+
+
+def packed(block: Calc, operand: int | None, combine: Callable[[int, int], int], initial: int) -> int:
+    """Combine packed boolean values popped from the stack bitwise, popping all values if no operand is given."""
+    values = block.pop_all() if operand is None else block.pop_many(operand)
+    return reduce(combine, (int(value) & PACKED_MASK for value in values), initial)
+
+
+def logical(block: Calc, operand: NamedOperand | int | None) -> list[bool]:
+    """Get logical values popped from the stack, and from a named operand if given, for diadic or polyadic logic."""
+    if operand is None:
+        return [int(value) != 0 for value in block.pop_all()]
+    elif isinstance(operand, int):
+        return [int(value) != 0 for value in block.pop_many(operand)]
+    else:
+        return [int(block.pop()) != 0, int(block.get_operand(operand)) != 0]
+
+
+def timing(block: Calc, operand: NamedOperand | int | None) -> tuple[Timer, float, bool]:
+    """Get the timer of the current step, its delay from the operand or popped from the stack, and its popped input."""
+    if operand is None:
+        delay = block.pop()
+    elif isinstance(operand, int):
+        delay = operand
+    else:
+        delay = block.get_operand(operand)
+
+    timer = block.timers[block.pointer]
+    timer.delay = delay
+    return timer, delay, block.pop() != 0
 
 
 @verify(no_operand)
@@ -120,8 +156,7 @@ def AND(block: Calc, operand: NamedOperand | int | None = None) -> None:
 @verify(any_of(no_operand, const_operand))
 def ANDX(block: Calc, operand: int | None = None) -> None:
     """Packed Logical And (Polyadic)"""
-    # TODO: implement and test ANDX
-    pass
+    block.push(packed(block, operand, lambda a, b: a & b, PACKED_MASK))
 
 
 @verify(no_operand)
@@ -189,7 +224,7 @@ def BIZ(block: Calc, operand: int) -> None:
         block.jump(operand)
 
 
-BIF = BIZ
+BIF = alias("BIF", BIZ)
 """Branch If False (Conditional Branch)"""
 
 
@@ -318,24 +353,33 @@ def DIV(block: Calc, operand: NamedOperand | None = None) -> None:
 
 
 @verify(any_of(no_operand, const_operand, all_of(memory, not_inverted)))
-def DOFF(block: Calc, operand: NamedOperand) -> None:
+def DOFF(block: Calc, operand: NamedOperand | int | None = None) -> None:
     """Delayed OFF Timing"""
-    # TODO: implement and test DOFF
-    pass
+    timer, delay, value = timing(block, operand)
+
+    if timer.edge(value) is False:
+        timer.start(block)
+
+    block.push(1 if value or timer.running(block, delay) else 0)
 
 
 @verify(any_of(no_operand, const_operand, all_of(memory, not_inverted)))
-def DON(block: Calc, operand: NamedOperand) -> None:
+def DON(block: Calc, operand: NamedOperand | int | None = None) -> None:
     """Delayed ON Timing"""
-    # TODO: implement and test DON
-    pass
+    timer, delay, value = timing(block, operand)
+
+    if timer.edge(value):
+        timer.start(block)
+
+    block.push(1 if value and not timer.running(block, delay) else 0)
 
 
 @verify(no_operand)
 def DUP(block: Calc) -> None:
     """Duplicate (Stack)"""
-    # TODO: implement and test DUP
-    pass
+    value = block.pop()
+    block.push(value)
+    block.push(value)
 
 
 @verify(no_operand)
@@ -390,8 +434,11 @@ def FF(block: Calc) -> None:
 @verify(all_of(any_of(real, integer, memory), not_inverted))
 def GTI(block: Calc, operand: NamedOperand) -> None:
     """Go To Indirect (Unconditional Branch)"""
-    # TODO: implement and test GTI
-    pass
+    # Step number is truncated from the value of the operand, invalid step numbers fail like GTO
+    if (step_number := int(block.get_operand(operand))) < 1:
+        block.error(block.pointer, CalcError.INVALID_GOTO)
+    else:
+        block.jump(step_number)
 
 
 @verify(const_operand)
@@ -409,6 +456,7 @@ def IDIV(block: Calc, operand: NamedOperand | None = None) -> None:
     if denominator == 0:
         block.error(block.pointer, CalcError.DIV)
         block.push(0)
+        return
 
     quotient = numerator // denominator
     remainder = numerator - quotient * denominator
@@ -428,6 +476,7 @@ def IMOD(block: Calc) -> None:
     if denominator == 0:
         block.error(block.pointer, CalcError.DIV)
         block.push(0)
+        return
 
     block.push(numerator % denominator)
 
@@ -538,7 +587,7 @@ def MAX(block: Calc, operand: NamedOperand | int | None = None) -> None:
         block.push(max(block.pop(), block.get_operand(operand)))
 
 
-MAXO = MAX
+MAXO = alias("MAXO", MAX)
 """Identical to MAX"""
 
 
@@ -599,15 +648,13 @@ def MUL(block: Calc, operand: NamedOperand | int | None = None) -> None:
 @verify(any_of(no_operand, const_operand, real, integer, boolean))
 def NAND(block: Calc, operand: NamedOperand | int | None = None) -> None:
     """Logical Not And (Diadic or Polyadic)"""
-    # TODO: implement and test NAND
-    pass
+    block.push(0 if all(logical(block, operand)) else 1)
 
 
 @verify(any_of(no_operand, const_operand))
 def NANX(block: Calc, operand: int | None = None) -> None:
     """Packed Logical NAND (Polyadic)"""
-    # TODO: implement and test NANX
-    pass
+    block.push(~packed(block, operand, lambda a, b: a & b, PACKED_MASK) & PACKED_MASK)
 
 
 @verify(no_operand)
@@ -620,76 +667,63 @@ def NOP(_: Calc) -> None:
 def NOR(block: Calc, operand: NamedOperand | int | None = None) -> None:
     """Logical Not Or (Diadic or Polyadic)"""
     # TODO: test NOR
-    if operand is None:
-        values = [int(value) != 0 for value in block.pop_all()]
-    elif isinstance(operand, int):
-        values = [int(value) != 0 for value in block.pop_many(operand)]
-    else:
-        values = [int(block.pop()) != 0, int(block.get_operand(operand)) != 0]
-
+    values = logical(block, operand)
     block.push(0 if any(values) else 1)
 
 
 @verify(any_of(no_operand, const_operand))
 def NORX(block: Calc, operand: int | None = None) -> None:
     """Packed Logical Nor Or (Polyadic. Packed Boolean)"""
-    # TODO: implement and test NORX
-    pass
+    block.push(~packed(block, operand, lambda a, b: a | b, 0) & PACKED_MASK)
 
 
 @verify(no_operand)
 def NOT(block: Calc) -> None:
     """Not (Unary)"""
-    # TODO: implement and test NOT
-    pass
+    block.push(1 if block.pop() == 0 else 0)
 
 
 @verify(no_operand)
 def NOTX(block: Calc) -> None:
     """Packed Logical Not (Unary, Packed Boolean)"""
-    # TODO: implement and test NOTX
-    pass
+    block.push(~int(block.pop()) & PACKED_MASK)
 
 
 @verify(any_of(no_operand, const_operand, real, integer, boolean))
 def NXOR(block: Calc, operand: NamedOperand | int | None = None) -> None:
     """Logical Not Exclusive Or (Diadic or Polyadic, Packed Boolean)"""
-    # TODO: implement and test NXOR
-    pass
+    block.push(0 if sum(logical(block, operand)) % 2 else 1)
 
 
 @verify(any_of(no_operand, const_operand))
 def NXOX(block: Calc, operand: int | None = None) -> None:
     """Packed Logical Not Exclusive Or (Polyadic, Packed Boolean)"""
-    # TODO: implement and test NXOX
-    pass
+    block.push(~packed(block, operand, lambda a, b: a ^ b, 0) & PACKED_MASK)
 
 
 @verify(any_of(no_operand, const_operand, real, integer, boolean))
 def OR(block: Calc, operand: NamedOperand | int | None = None) -> None:
     """Logical Or (Diadic or Polyadic)"""
-    if operand is None:
-        values = [int(value) != 0 for value in block.pop_all()]
-    elif isinstance(operand, int):
-        values = [int(value) != 0 for value in block.pop_many(operand)]
-    else:
-        values = [int(block.pop()) != 0, int(block.get_operand(operand)) != 0]
-
+    values = logical(block, operand)
     block.push(1 if any(values) else 0)
 
 
 @verify(any_of(no_operand, const_operand))
 def ORX(block: Calc, operand: int | None = None) -> None:
     """Packed Logical Or (Polyadic, Packed Boolean)"""
-    # TODO: implement and test ORX
-    pass
+    block.push(packed(block, operand, lambda a, b: a | b, 0))
 
 
 @verify(all_of(memory, not_inverted))
 def OSP(block: Calc, operand: NamedOperand) -> None:
     """One-Shot Pulse Timing"""
-    # TODO: implement and test OSP
-    pass
+    timer, delay, value = timing(block, operand)
+
+    # Pulses aren't retriggered by rising edges during a pulse
+    if timer.edge(value) and not timer.running(block, delay):
+        timer.start(block)
+
+    block.push(1 if timer.running(block, delay) else 0)
 
 
 @verify(any_of(all_of(output_parameter, not_inverted), all_of(boolean, output_parameter), memory))
@@ -947,7 +981,7 @@ def SSZ(block: Calc, operand: NamedOperand) -> None:
         block.pointer += 1
 
 
-SSF = SSZ
+SSF = alias("SSF", SSZ)
 """Set Boolean and Skip if Accumulator False (Program Control)"""
 
 
@@ -1005,8 +1039,7 @@ def TAN(block: Calc) -> None:
 @verify(no_operand)
 def TIM(block: Calc) -> None:
     """Time Since Midnight Time Reporting"""
-    # TODO: implement and test TIM
-    pass
+    block.push(block.clock.time_of_day)
 
 
 @verify(no_operand)
@@ -1026,12 +1059,10 @@ def TSTB(block: Calc, operand: int | None = None) -> None:
 @verify(any_of(no_operand, const_operand, any_of(boolean, integer, memory)))
 def XOR(block: Calc, operand: NamedOperand | int | None = None) -> None:
     """Logical Exclusive Or (Diadic or Polyadic)"""
-    # TODO: implement and test XOR
-    pass
+    block.push(1 if sum(logical(block, operand)) % 2 else 0)
 
 
 @verify(any_of(no_operand, const_operand))
 def XORX(block: Calc, operand: int | None = None) -> None:
     """Packed Logical Exclusive Or (Polyadic, Packed Boolean)"""
-    # TODO: implement and test XORX
-    pass
+    block.push(packed(block, operand, lambda a, b: a ^ b, 0))
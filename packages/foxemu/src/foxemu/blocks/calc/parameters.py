@@ -18,10 +18,17 @@ from foxemu.signaling import (
     StringValue,
     UnparsedConnection,
 )
+from foxemu.storage import ParametersView
+
+from .constants import PROGRAM_LENGTH
 
 if TYPE_CHECKING:
+    from collections.abc import Generator
+
     from foxdata.models import Block
 
+STEP_NAMES = tuple(f"STEP{i:02d}" for i in range(1, PROGRAM_LENGTH + 1))
+
 
 @dataclass
 class CalcParameters:
@@ -245,3 +252,23 @@ class CalcParameters:
 
     def get_step(self, step_number: int) -> Input[StringValue]:
         return getattr(self, f"STEP{step_number:02d}")
+
+    def step_text(self) -> tuple[str, ...]:
+        """Get the text of every step."""
+        return tuple(getattr(self, name).get_value().get() for name in STEP_NAMES)
+
+    def parameters_iter(self) -> Generator[Parameter]:
+        """Iterate over parameters."""
+        return (attr for attr in self.__dict__.values() if isinstance(attr, Parameter))
+
+
+class CalcParametersView(ParametersView, CalcParameters):
+    """CALC block parameters held in `ParameterStorage`, see `ParametersView`."""
+
+    def step_text(self) -> tuple[str, ...]:
+        """Get the text of every step, reading storage directly for steps that haven't been accessed."""
+        columns = self.storage.columns
+        return tuple(
+            parameter.get_value().get() if (parameter := self.__dict__.get(name)) else columns[name][self.row]
+            for name in STEP_NAMES
+        )
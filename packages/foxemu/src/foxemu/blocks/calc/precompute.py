@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import pickle
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from billiard import Pool  # type: ignore[attr-defined]
+from fastmurmur3 import murmur3
+from foxdata.models import Block
+from utils import gc_disabled
+
+from .graphing import generate_dot_from_model
+from .program import program_text
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    from foxdata.models import Data
+
+
+@dataclass(frozen=True)
+class PrecomputedGraphs:
+    """
+    Container for logic flow graphs of CALC blocks, keyed by block hash.
+
+    The hash of each block's program is kept alongside, as the block hash only covers its compound and name, so that
+    graphs of blocks whose programs have since changed aren't served.
+    """
+
+    dots: dict[int, str]
+    errors: dict[int, str]
+    programs: dict[int, int]
+
+    def __len__(self) -> int:
+        return len(self.dots) + len(self.errors)
+
+    def __contains__(self, block: object) -> bool:
+        return isinstance(block, Block) and self.programs.get(hash(block)) == program_hash(block)
+
+    def get_dot(self, block: Block) -> str | None:
+        """
+        Get the precomputed DOT graph for a block, or `None` if the block was not precomputed with its current program.
+
+        Raises `RuntimeError` if graphing the block failed when it was precomputed.
+        """
+        block_hash = hash(block)
+
+        if self.programs.get(block_hash) != program_hash(block):
+            return None
+        elif block_hash in self.dots:
+            return self.dots[block_hash]
+        elif block_hash in self.errors:
+            raise RuntimeError(self.errors[block_hash])
+        else:
+            return None
+
+    def covers(self, data: Data) -> bool:
+        """Check that exactly the CALC blocks within data have been precomputed, with their current programs."""
+        return {hash(block): program_hash(block) for block in calc_blocks(data.blocks)} == self.programs
+
+
+def program_hash(block: Block) -> int:
+    """Hash the program of a block, consistently between processes so that it can be pickled."""
+    return murmur3("\n".join(program_text(block.config)).encode())
+
+
+def calc_blocks(blocks: Iterable[Block]) -> list[Block]:
+    """Filter CALC blocks, stripping connections to keep them cheap to send to worker processes."""
+    return [Block(block.config, block.meta, set()) for block in blocks if block.config.get("TYPE") == "CALC"]
+
+
+def graph_block(block: Block) -> tuple[int, int, str, bool]:
+    """
+    Generate the DOT graph for a block, returning the block and program hashes, DOT or error message, and success.
+
+    Only errors in the block's program are recorded, anything else raised while graphing is a bug and isn't cached.
+    """
+    try:
+        return (hash(block), program_hash(block), generate_dot_from_model(block), True)
+    except RuntimeError as e:
+        return (hash(block), program_hash(block), str(e), False)
+
+
+def generate_graphs(blocks: Iterable[Block], processes: int | None = None) -> PrecomputedGraphs:
+    """Generate logic flow graphs for all CALC blocks, using a process pool unless `processes` is 1."""
+    blocks = calc_blocks(blocks)
+
+    if processes == 1:
+        results = [graph_block(block) for block in blocks]
+    else:
+        with Pool(processes) as pool:
+            results = pool.map(graph_block, blocks, chunksize=max(1, len(blocks) // 256))
+
+    dots = {block_hash: output for block_hash, _, output, ok in results if ok}
+    errors = {block_hash: output for block_hash, _, output, ok in results if not ok}
+    programs = {block_hash: program for block_hash, program, _, _ in results}
+    return PrecomputedGraphs(dots, errors, programs)
+
+
+def initialise_graphs(graphs_pickle_path: Path, data: Data) -> PrecomputedGraphs:
+    """Load pickled graphs if they exist and match the data, otherwise generate and pickle graphs."""
+    with gc_disabled():
+        if graphs_pickle_path.is_file():
+            with graphs_pickle_path.open(mode="rb") as file:
+                graphs = pickle.load(file)  # noqa: S301
+
+            if isinstance(graphs, PrecomputedGraphs) and graphs.covers(data):
+                return graphs
+
+        graphs = generate_graphs(data.blocks)
+        graphs_pickle_path.parent.resolve().mkdir(parents=True, exist_ok=True)
+
+        with graphs_pickle_path.open(mode="wb") as file:
+            pickle.dump(graphs, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return graphs
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING
+
+from .constants import PROGRAM_CACHE_SIZE, PROGRAM_LENGTH
+from .errors import CalcError
+from .operands import Operands, Operation, parse_operand
+from .operations import OPERATIONS
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from foxdata.models import Block
+
+    from .analysis import Analysis
+
+COMMENT_RE = re.compile(";.*")
+
+
+@dataclass(frozen=True)
+class Step:
+    opcode: str
+    operands: Operands
+
+
+@dataclass(frozen=True)
+class Program:
+    """
+    CALC program parsed from step text, independent of any block instance.
+
+    Instances are shared between blocks with identical programs so must not be mutated.
+    """
+
+    steps: dict[int, Step]
+    errors: tuple[tuple[int, CalcError], ...]
+
+    @cached_property
+    def operations(self) -> tuple[tuple[int, Operation, Operands], ...]:
+        """Operation executing each step along with its operands, ready to be bound to a block."""
+        return tuple((i, OPERATIONS[step.opcode].operation, step.operands) for i, step in self.steps.items())
+
+    @cached_property
+    def analysis(self) -> Analysis:
+        """Static analysis of the program's steps, see `analysis.analyse_steps`."""
+        from .analysis import analyse_steps  # noqa: PLC0415
+
+        return analyse_steps(self.steps)
+
+
+def tokenize_step(step: str) -> Step | None:
+    """Strip comments and split step text into an opcode and operands, returning `None` for empty steps."""
+    tokens = COMMENT_RE.sub("", step).strip().split()
+
+    match len(tokens):
+        case 0:
+            # No tokens, no-op
+            return None
+        case 1:
+            # Opcode without any operands
+            return Step(tokens[0], ())
+        case _:
+            # Opcode with operands, parse operands into a tuple
+            return Step(tokens[0], tuple(operand for s in tokens[1:] if (operand := parse_operand(s)) is not None))
+
+
+def parse_step(step: str) -> Step | CalcError | None:
+    """Parse and verify step text without binding it to a block."""
+    if (tokenized := tokenize_step(step)) is None:
+        return None
+
+    if (instruction := OPERATIONS.get(tokenized.opcode)) is None:
+        return CalcError.INVALID_OPCODE
+    elif instruction.verify_operands(tokenized.operands):
+        return tokenized
+    else:
+        return CalcError.INVALID_OPERAND
+
+
+@lru_cache(maxsize=PROGRAM_CACHE_SIZE)
+def parse_program(step_text: tuple[str, ...]) -> Program:
+    """Parse a tuple of step text into a program, cached so that identical programs are only parsed once."""
+    steps = {}
+    errors = []
+
+    for i, text in enumerate(step_text, start=1):
+        match parse_step(text):
+            case None:
+                pass
+            case CalcError() as error:
+                errors.append((i, error))
+            case Step() as step:
+                steps[i] = step
+
+    return Program(steps, tuple(errors))
+
+
+def program_text(config: Mapping[str, str]) -> tuple[str, ...]:
+    """Get the text of each step from a block config."""
+    return tuple(config.get(f"STEP{i:02d}", "") for i in range(1, PROGRAM_LENGTH + 1))
+
+
+def parse_block_program(block: Block) -> Program:
+    """Parse the program of a block model without creating an emulated block."""
+    return parse_program(program_text(block.config))
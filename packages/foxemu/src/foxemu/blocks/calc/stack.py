@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .constants import MAX_STACK_LENGTH
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class Stack:
+    """
+    Fixed length CALC operand stack, backed by a ring buffer of values and the step numbers that pushed them.
+
+    Pushing to a full stack discards the value at the bottom of the stack, reporting overflow is left to the caller.
+    """
+
+    __slots__ = ("bottom", "length", "steps", "values")
+
+    values: list[float]
+    steps: list[int]
+    bottom: int
+    length: int
+
+    def __init__(self) -> None:
+        self.values = [0.0] * MAX_STACK_LENGTH
+        self.steps = [0] * MAX_STACK_LENGTH
+        self.bottom = 0
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[tuple[float, int]]:
+        """Iterate over values and the step numbers that pushed them, from the bottom of the stack."""
+        for i in range(self.length):
+            j = (self.bottom + i) % MAX_STACK_LENGTH
+            yield (self.values[j], self.steps[j])
+
+    def __repr__(self) -> str:
+        return f"Stack({[value for value, _ in self]})"
+
+    def push(self, value: float, step: int) -> bool:
+        """Push a value to the top of the stack, returning `True` if the bottom value was discarded."""
+        if self.length < MAX_STACK_LENGTH:
+            i = (self.bottom + self.length) % MAX_STACK_LENGTH
+            self.length += 1
+            overflow = False
+        else:
+            i = self.bottom
+            self.bottom = (i + 1) % MAX_STACK_LENGTH
+            overflow = True
+
+        self.values[i] = value
+        self.steps[i] = step
+        return overflow
+
+    def pop(self) -> float:
+        """Pop the value from the top of the stack, raising `IndexError` if the stack is empty."""
+        if not self.length:
+            description = "pop from empty stack"
+            raise IndexError(description)
+
+        self.length -= 1
+        return self.values[(self.bottom + self.length) % MAX_STACK_LENGTH]
+
+    def top(self) -> float:
+        """Get the value at the top of the stack, raising `IndexError` if the stack is empty."""
+        if not self.length:
+            description = "top of empty stack"
+            raise IndexError(description)
+
+        return self.values[(self.bottom + self.length - 1) % MAX_STACK_LENGTH]
+
+    def pop_all(self) -> list[float]:
+        """Pop all values from the stack, ordered from the bottom of the stack."""
+        values = [value for value, _ in self]
+        self.clear()
+        return values
+
+    def clear(self) -> None:
+        """Clear all values from the stack."""
+        self.bottom = 0
+        self.length = 0
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from .block import Calc
+
+TIMER_SIZE = 4
+"""Number of values of block memory holding the state of each timer, see `Timer.get_memory`."""
+
+NOT_STARTED = -math.inf
+"""Start of a timer that hasn't started, so that its delay has always elapsed."""
+
+
+class Timer:
+    """
+    State of a timing instruction (DON, DOFF, OSP) that persists between executions of its block.
+
+    A timer starts by recording the simulated time and the block's execution count, so that its delay can be measured
+    in either seconds or cycles. The delay it was last executed with is kept to tell how much of it remains, see
+    `Calc.get_fingerprint`. Its state, including the delay, is part of the block's memory, see `Calc.get_memory`.
+    """
+
+    __slots__ = ("cycle", "delay", "input", "time")
+
+    input: bool
+    time: float
+    cycle: float
+    delay: float
+
+    def __init__(self) -> None:
+        self.input = False
+        self.time = NOT_STARTED
+        self.cycle = NOT_STARTED
+        self.delay = 0
+
+    def edge(self, value: bool) -> bool | None:  # noqa: FBT001
+        """Update the input, returning `True` on a rising edge, `False` on a falling edge and `None` otherwise."""
+        previous, self.input = self.input, value
+        return None if previous == value else value
+
+    def start(self, block: Calc) -> None:
+        """Start measuring the delay from the current execution of a block."""
+        self.time = block.clock.time
+        self.cycle = block.executions
+
+    def running(self, block: Calc, delay: float) -> bool:
+        """Check whether the delay hasn't elapsed yet, given in seconds if positive or in cycles if negative."""
+        if delay < 0:
+            return block.executions - self.cycle < -delay
+        else:
+            return block.clock.time - self.time < delay
+
+    def remaining(self, block: Calc) -> float:
+        """Get how much of the last delay remains since the timer started, in the same units as the delay."""
+        if self.delay < 0:
+            return max(0, -self.delay - (block.executions - self.cycle))
+        else:
+            return max(0, self.delay - (block.clock.time - self.time))
+
+    def get_memory(self) -> tuple[float, ...]:
+        return (float(self.input), self.time, self.cycle, self.delay)
+
+    def set_memory(self, memory: Sequence[float]) -> None:
+        self.input = memory[0] != 0
+        self.time = float(memory[1])
+        self.cycle = float(memory[2])
+        self.delay = float(memory[3])
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from foxdata.parsing import CONNECTION_RE
+from utils import maybe_float
+
+from foxemu.blocks import EmulatedBlock
+from foxemu.signaling import Parameter, RealValue, StringValue, UnparsedConnection
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from foxdata.models import Block
+
+
+class PassThrough(EmulatedBlock):
+    """
+    Stand-in for a block type that isn't emulated, so that connections to it can still be resolved.
+
+    The block doesn't execute, its parameters hold their configured values or pass through the values of
+    connected parameters. Parameters that aren't configured are created as real values of zero when first used.
+    """
+
+    parameters: dict[str, Parameter]
+
+    def __init__(self, compound: str, name: str, parameters: dict[str, Parameter] | None = None) -> None:
+        super().__init__(compound, name)
+        self.parameters = parameters or {}
+
+    @staticmethod
+    def from_block(block: Block, *, connect: bool = True) -> PassThrough:
+        """Create a stand-in block from a block model, optionally keeping connections to other blocks."""
+        parameters: dict[str, Parameter] = {}
+
+        for key, value in block.config.items():
+            if connect and "." in value and ":" in value and (match := CONNECTION_RE.match(value)):
+                parameters[key] = Parameter(
+                    UnparsedConnection(
+                        compound=match.group("compound") or block.compound,
+                        block=match.group("block"),
+                        parameter=match.group("parameter"),
+                    ),
+                )
+            else:
+                match maybe_float(value):
+                    case float() as number:
+                        parameters[key] = Parameter(RealValue(number))
+                    case text:
+                        parameters[key] = Parameter(StringValue(text))
+
+        return PassThrough(block.compound, block.name, parameters)
+
+    def parameters_iter(self) -> Generator[Parameter]:
+        """Iterate over block parameters."""
+        return (parameter for parameter in self.parameters.values())
+
+    def get_parameter(self, key: str) -> Parameter:
+        """Get block parameter by name, creating it if it doesn't exist."""
+        if (parameter := self.parameters.get(key)) is None:
+            parameter = self.parameters[key] = Parameter(RealValue(0))
+
+        return parameter
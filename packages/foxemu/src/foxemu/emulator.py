@@ -1,30 +1,227 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import TYPE_CHECKING
+
+from billiard import Pool  # type: ignore[attr-defined]
 from foxdata.models import Block
+from utils import strongly_connected_components
 
 from foxemu.blocks import EmulatedBlock
 from foxemu.blocks.calc.block import Calc
-from foxemu.signaling import UnparsedConnection
+from foxemu.blocks.calc.parameters import CalcParameters, CalcParametersView
+from foxemu.blocks.passthrough import PassThrough
+from foxemu.scheduling import DEFAULT_BPC, Clock, TickSchedule
+from foxemu.signaling import Connection, Precision, UnparsedConnection
+from foxemu.snapshot import Snapshot, StateLayout
+from foxemu.storage import ParameterStorage
+from foxemu.trace import DEFAULT_CAPACITY, Recorder
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from foxdata.models import Data
+
+BlockType = EmulatedBlock | Calc | PassThrough
+
+
+class Stop(Enum):
+    """Reason that a run of the emulator stopped."""
+
+    CYCLES = auto()
+    CONVERGED = auto()
+    UNTIL = auto()
+
+
+@dataclass(frozen=True)
+class RunResult:
+    """Outcome of running the emulator for multiple cycles."""
+
+    cycles: int
+    stop: Stop
 
-BlockType = EmulatedBlock | Calc
+    @property
+    def converged(self) -> bool:
+        return self.stop is Stop.CONVERGED
 
 
 class Emulator:
     compounds: dict[str, dict[str, BlockType]]
     connections_parsed: bool
+    precision: Precision
+    schedule: list[BlockType] | None
+    tick_schedule: TickSchedule | None
+    state_layout: StateLayout | None
+    recorders: list[Recorder]
+    clock: Clock
+    storage: ParameterStorage[CalcParameters] | None
 
-    def __init__(self) -> None:
+    def __init__(self, precision: Precision = Precision.CONTROLLER, bpc: float = DEFAULT_BPC) -> None:
         self.compounds = {}
         self.connections_parsed = False
+        self.precision = precision
+        self.schedule = None
+        self.tick_schedule = None
+        self.state_layout = None
+        self.recorders = []
+        self.clock = Clock(bpc)
+        self.storage = None
+
+    @staticmethod
+    def from_data(  # noqa: PLR0913
+        data: Data,
+        cp: str | None = None,
+        compounds: Iterable[str] | None = None,
+        *,
+        processes: int | None = None,
+        compiled: bool = False,
+        stored: bool = False,
+        precision: Precision = Precision.CONTROLLER,
+        bpc: float = DEFAULT_BPC,
+    ) -> Emulator:
+        """
+        Create an emulator with every block hosted by a CP and/or within a set of compounds, or all blocks if neither.
+
+        Block parameters are parsed using a process pool unless `processes` is 1, and CALC programs are compiled if
+        `compiled` is set. Unsupported block types are emulated by `PassThrough` blocks, as are blocks outside of the
+        selection that are connected to, which are found in the data's index. If `stored` is set, CALC parameters are
+        held in a `ParameterStorage` shared by every CALC block, see `Emulator.storage`.
+        """
+        blocks = select_blocks(data, cp, compounds)
+        emulator = Emulator(precision, bpc)
+
+        if stored:
+            emulator.storage = ParameterStorage(CalcParameters, len(blocks))
+
+        for block in create_blocks(blocks, processes, emulator.storage):
+            if compiled and isinstance(block, Calc):
+                block.compile()
+
+            emulator.add_block(block)
+
+        # Connections can only be parsed once every block they refer to exists
+        for compound, name in emulator.unresolved_blocks():
+            if (model := data.get_block_from_name(compound, name)) is not None:
+                emulator.add_block(PassThrough.from_block(model, connect=False))
+            else:
+                emulator.add_block(PassThrough(compound, name))
+
+        return emulator
+
+    @property
+    def bpc(self) -> float:
+        """Length of a tick in seconds, see `Clock`."""
+        return self.clock.bpc
+
+    @property
+    def tick(self) -> int:
+        """Number of ticks that the emulator has advanced by."""
+        return self.clock.tick
+
+    @tick.setter
+    def tick(self, tick: int) -> None:
+        self.clock.tick = tick
+
+    @property
+    def time(self) -> float:
+        """Simulated time in seconds that the emulator has advanced by."""
+        return self.clock.time
 
     def execute(self) -> None:
-        """Execute each block once."""
-        if not self.connections_parsed:
-            self.parse_connections()
-            self.connections_parsed = True
+        """Execute each block once, in dependency order."""
+        for block in self.get_schedule():
+            block.execute()
 
-        for compound in self.compounds.values():
-            for block in compound.values():
+        for recorder in self.recorders:
+            recorder.record(self.tick)
+
+    def run(self, cycles: int, until: Callable[[Emulator], bool] | None = None, *, converge: bool = True) -> RunResult:
+        """
+        Execute each block once per cycle for up to a number of cycles, stopping early if `until` returns `True`.
+
+        If `converge` is set, also stop once a fixed point is reached, ie. a whole cycle executes without changing
+        the state of any block. State is compared between cycles by hashing the values of each block's state
+        parameters along with its internal state, see `EmulatedBlock.get_fingerprint`.
+        """
+        schedule = self.get_schedule()
+        executes = [block.execute for block in schedule]
+        state = [parameter for block in schedule for parameter in block.state_iter()] if converge else []
+        fingerprints = [block.get_fingerprint for block in schedule] if converge else []
+
+        def fingerprint() -> int:
+            values = tuple(parameter.get_value().get() for parameter in state)
+            return hash((values, tuple(get_fingerprint() for get_fingerprint in fingerprints)))
+
+        previous = fingerprint()
+        recorders = self.recorders
+
+        for cycle in range(1, cycles + 1):
+            for execute in executes:
+                execute()
+
+            for recorder in recorders:
+                recorder.record(self.tick)
+
+            if until is not None and until(self):
+                return RunResult(cycle, Stop.UNTIL)
+
+            if converge:
+                if (current := fingerprint()) == previous:
+                    return RunResult(cycle, Stop.CONVERGED)
+
+                previous = current
+
+        return RunResult(cycles, Stop.CYCLES)
+
+    def advance(self, n_ticks: int = 1) -> None:
+        """
+        Advance simulated time by a number of ticks (BPCs), only executing blocks when due by PERIOD and PHASE.
+
+        Blocks see the time of the tick they execute on through the emulator's clock, so timing instructions follow
+        simulated time rather than wall-clock time.
+        """
+        tick_schedule = self.get_tick_schedule()
+        recorders = self.recorders
+        clock = self.clock
+        end = clock.tick + n_ticks
+
+        for tick in range(clock.tick, end):
+            clock.tick = tick
+
+            for block in tick_schedule.due(tick):
                 block.execute()
 
+            for recorder in recorders:
+                recorder.record(tick + 1)
+
+        clock.tick = end
+
+    def record(self, names: Iterable[str], capacity: int = DEFAULT_CAPACITY) -> Recorder:
+        """Start recording the values of parameters each cycle, see `Recorder`."""
+        recorder = Recorder(self, names, capacity)
+        self.recorders.append(recorder)
+        return recorder
+
+    def stop_recording(self, recorder: Recorder) -> None:
+        """Stop recording to a recorder, its samples are kept."""
+        self.recorders.remove(recorder)
+
+    def snapshot(self) -> Snapshot:
+        """Capture the state of every block into a buffer, see `StateLayout`."""
+        layout = self.get_state_layout()
+        return Snapshot(layout, self.tick, layout.capture().tobytes())
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Restore the state of every block from a snapshot taken while the emulator had the same blocks."""
+        if snapshot.layout is not self.get_state_layout():
+            description = "snapshot was taken with different blocks"
+            raise RuntimeError(description)
+
+        snapshot.layout.apply(snapshot.state())
+        self.tick = snapshot.tick
+
     def create_block(self, block: Block) -> BlockType:
         """Create an emulated block from a block model."""
         match block.config["TYPE"]:
@@ -39,7 +236,27 @@ class Emulator:
         if block.compound not in self.compounds:
             self.compounds[block.compound] = {}
 
+        block.precision = self.precision
+        block.clock = self.clock
         self.compounds[block.compound][block.name] = block
+        self.connections_parsed = False
+        self.schedule = None
+        self.tick_schedule = None
+        self.state_layout = None
+
+    def remove_block(self, compound: str, name: str) -> BlockType:
+        """Remove an emulated block from the emulator, blocks connected to it must be removed too."""
+        if (block := self.compounds.get(compound, {}).pop(name, None)) is None:
+            description = f"Block not found: '{compound}:{name}'"
+            raise RuntimeError(description)
+
+        if not self.compounds[compound]:
+            del self.compounds[compound]
+
+        self.schedule = None
+        self.tick_schedule = None
+        self.state_layout = None
+        return block
 
     def create_and_add_block(self, block: Block) -> None:
         """Create an emulated block from a block model and add it to the emulator."""
@@ -52,3 +269,135 @@ class Emulator:
                 for attr in block.parameters_iter():
                     if isinstance(attr.inner, UnparsedConnection):
                         attr.inner = attr.inner.parse(self)
+
+    def unresolved_blocks(self) -> set[tuple[str, str]]:
+        """Find blocks that unparsed connections refer to which haven't been added to the emulator."""
+        return {
+            (attr.inner.compound, attr.inner.block)
+            for compound in self.compounds.values()
+            for block in compound.values()
+            for attr in block.parameters_iter()
+            if isinstance(attr.inner, UnparsedConnection)
+            and attr.inner.block not in self.compounds.get(attr.inner.compound, {})
+        }
+
+    def get_schedule(self) -> list[BlockType]:
+        """Get blocks in execution order, parsing connections and creating the schedule if blocks have changed."""
+        if not self.connections_parsed:
+            self.parse_connections()
+            self.connections_parsed = True
+
+        if self.schedule is None:
+            self.schedule = self.create_schedule()
+
+        return self.schedule
+
+    def get_tick_schedule(self) -> TickSchedule:
+        """Get blocks bucketed by period and phase, created from the dependency ordered schedule if necessary."""
+        if self.tick_schedule is None:
+            self.tick_schedule = TickSchedule(self.get_schedule(), self.bpc)
+
+        return self.tick_schedule
+
+    def get_state_layout(self) -> StateLayout:
+        """Get the order that block state is captured in, created from the schedule if blocks have changed."""
+        if self.state_layout is None:
+            self.state_layout = StateLayout(self.get_schedule(), self.storage)
+
+        return self.state_layout
+
+    def create_schedule(self) -> list[BlockType]:
+        """
+        Order blocks so that each block executes after the blocks that its inputs are connected to.
+
+        Blocks within a feedback loop can't all execute after each other, so each loop is executed as a group in the
+        order the blocks were added. Otherwise independent blocks also keep the order they were added.
+        """
+        blocks = [block for compound in self.compounds.values() for block in compound.values()]
+        order = {block: i for i, block in enumerate(blocks)}
+        sinks: dict[BlockType, list[BlockType]] = {block: [] for block in blocks}
+
+        for block in blocks:
+            for attr in block.parameters_iter():
+                if isinstance(attr.inner, Connection) and attr.inner.block in sinks and attr.inner.block is not block:
+                    sinks[attr.inner.block].append(block)
+
+        # Collapse loops into single nodes, each identified by its earliest added block
+        groups = [sorted(scc, key=order.__getitem__) for scc in strongly_connected_components(blocks, sinks)]
+        group_of = {block: group[0] for group in groups for block in group}
+        members = {group[0]: group for group in groups}
+        successors = {
+            leader: {group_of[sink] for block in group for sink in sinks[block]} - {leader}
+            for leader, group in members.items()
+        }
+        dependencies = dict.fromkeys(members, 0)
+
+        for targets in successors.values():
+            for target in targets:
+                dependencies[target] += 1
+
+        # Topologically sort loops and blocks, preferring whichever was added first when there is a choice
+        ready = [(order[leader], leader) for leader, count in dependencies.items() if count == 0]
+        heapq.heapify(ready)
+        schedule: list[BlockType] = []
+
+        while ready:
+            _, leader = heapq.heappop(ready)
+            schedule.extend(members[leader])
+
+            for target in successors[leader]:
+                dependencies[target] -= 1
+
+                if dependencies[target] == 0:
+                    heapq.heappush(ready, (order[target], target))
+
+        return schedule
+
+
+def select_blocks(data: Data, cp: str | None = None, compounds: Iterable[str] | None = None) -> list[Block]:
+    """Select every block hosted by a CP and/or within a set of compounds, or all blocks if neither."""
+    selected = set(compounds) if compounds is not None else None
+    return [
+        block
+        for block in data.blocks
+        if (cp is None or block.meta.get("cp") == cp) and (selected is None or block.compound in selected)
+    ]
+
+
+def parse_parameters(block: Block) -> CalcParameters | None:
+    """Parse parameters for a block model, or `None` if the block type is not supported."""
+    match block.config.get("TYPE"):
+        case "CALC":
+            return CalcParameters.from_block(block)
+        case _:
+            return None
+
+
+def create_blocks(
+    blocks: list[Block],
+    processes: int | None = None,
+    storage: ParameterStorage[CalcParameters] | None = None,
+) -> list[BlockType]:
+    """
+    Create emulated blocks from block models, parsing parameters with a process pool unless `processes` is 1.
+
+    CALC parameters are moved into `storage` if given, once they've been returned from the worker processes.
+    """
+    # Connections aren't needed to parse parameters, strip them to keep models cheap to send to worker processes
+    models = [Block(block.config, block.meta, set()) for block in blocks]
+
+    if processes == 1:
+        results = [parse_parameters(model) for model in models]
+    else:
+        with Pool(processes) as pool:
+            results = pool.map(parse_parameters, models, chunksize=max(1, len(models) // 256))
+
+    if storage is not None:
+        results = [
+            None if parameters is None else CalcParametersView.create(storage, parameters) for parameters in results
+        ]
+
+    return [
+        PassThrough.from_block(model) if parameters is None else Calc(model.compound, model.name, parameters)
+        for model, parameters in zip(models, results, strict=True)
+    ]
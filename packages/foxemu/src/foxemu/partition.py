@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import heapq
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Self
+
+import numpy as np
+from billiard import Barrier, Pipe, Process, RawArray  # type: ignore[attr-defined]
+from foxdata.models import Data
+from foxdata.parsing import CONNECTION_RE
+from utils import maybe_float, strongly_connected_components
+
+from foxemu.blocks.calc.parameters import CalcParameters
+from foxemu.emulator import Emulator, select_blocks
+from foxemu.scheduling import DEFAULT_BPC
+from foxemu.signaling import BaseValue, BoolValue, Precision, RealValue, StringValue
+from foxemu.trace import get_parameter
+
+if TYPE_CHECKING:
+    import ctypes
+    from collections.abc import Callable, Generator, Iterable
+    from types import TracebackType
+
+    from billiard import synchronize
+    from billiard.connection import Connection
+    from foxdata.models import Block
+
+    from foxemu.signaling import Parameter
+
+CALC_DEFAULTS = CalcParameters()
+
+Key = tuple[str, str, str]
+"""Compound, block and parameter name of a value exchanged between partitions."""
+
+
+@dataclass(frozen=True)
+class Slot:
+    """Value exchanged between partitions through shared memory once per cycle."""
+
+    key: Key
+    level: int
+    value_type: type[BaseValue]
+
+    def convert(self, value: float) -> float | int | bool:
+        """Convert a value read from shared memory to the type of the source parameter."""
+        if self.value_type is BoolValue:
+            return bool(value)
+        elif self.value_type is RealValue:
+            return value
+        else:
+            return int(value)
+
+
+@dataclass(frozen=True)
+class Partition:
+    """Compounds emulated by a worker process, with the levels they execute at and the data to create them from."""
+
+    data: Data
+    cp: str | None
+    levels: dict[str, int]
+    imports: tuple[int, ...]
+    exports: tuple[int, ...]
+    stages: int
+    compiled: bool
+    precision: Precision
+    bpc: float
+
+
+class PartitionedEmulator:
+    """
+    Emulates blocks across worker processes, with compounds partitioned between them.
+
+    Compounds connected in a loop are kept together, and each group of compounds is assigned a level by the longest
+    chain of connections leading to it from other groups. Each cycle, workers execute the blocks of each level in turn
+    and wait at a barrier after each level. Values connected between workers are written to shared memory by the
+    worker producing them after its level executes, and read by workers that need them before the next level, so every
+    block sees the same values as it would in a single `Emulator`.
+
+    Only whole cycles are emulated, ie. `execute` and `run` without convergence, and values can be read by name.
+    """
+
+    compounds: dict[str, int]
+    slots: list[Slot]
+    levels: int
+    workers: list[tuple[Process, Connection]]
+
+    def __init__(  # noqa: PLR0913
+        self,
+        data: Data,
+        cp: str | None = None,
+        compounds: Iterable[str] | None = None,
+        *,
+        processes: int | None = None,
+        compiled: bool = False,
+        precision: Precision = Precision.CONTROLLER,
+        bpc: float = DEFAULT_BPC,
+    ) -> None:
+        blocks = select_blocks(data, cp, compounds)
+        self.compounds, levels, self.slots, partitions = create_partitions(data, blocks, processes or os.cpu_count())
+        self.levels = max(levels.values(), default=-1) + 1
+        self.workers = []
+
+        values = RawArray("d", max(len(self.slots), 1))
+        barrier = Barrier(len(partitions))
+
+        for i, (worker_data, imports, exports) in enumerate(partitions):
+            owned = {compound: levels[compound] for compound, worker in self.compounds.items() if worker == i}
+            partition = Partition(worker_data, cp, owned, imports, exports, self.levels, compiled, precision, bpc)
+            connection, child = Pipe()
+            process = Process(target=work, args=(partition, self.slots, values, barrier, child))
+            process.daemon = True
+            process.start()
+            self.workers.append((process, connection))
+
+        self.receive(range(len(self.workers)))
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def execute(self) -> None:
+        """Execute each block once, in dependency order."""
+        self.run(1)
+
+    def run(self, cycles: int) -> None:
+        """Execute each block once per cycle for a number of cycles."""
+        for _, connection in self.workers:
+            connection.send(("run", cycles))
+
+        self.receive(range(len(self.workers)))
+
+    def get_value(self, name: str) -> float | int | bool:
+        """Get the value of a parameter by name, in the form `COMPOUND:BLOCK.PARAMETER`."""
+        if (match := CONNECTION_RE.match(name)) is None or (
+            worker := self.compounds.get(match.group("compound"))
+        ) is None:
+            description = f"Compound not found: '{name}'"
+            raise RuntimeError(description)
+
+        connection = self.workers[worker][1]
+        connection.send(("get", name))
+
+        if not isinstance(result := connection.recv(), BaseException):
+            return result
+
+        description = f"Parameter not found: '{name}'"
+        raise RuntimeError(description) from result
+
+    def receive(self, workers: Iterable[int]) -> list[Any]:
+        """Receive a result from each worker, closing the workers and raising the first error any of them report."""
+        results = [self.workers[worker][1].recv() for worker in workers]
+
+        if errors := [result for result in results if isinstance(result, BaseException)]:
+            self.close()
+            description = "emulation failed in a worker process"
+            raise RuntimeError(description) from errors[0]
+
+        return results
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        for process, connection in self.workers:
+            if process.is_alive():
+                connection.send(("stop", None))
+
+            process.join()
+
+        self.workers = []
+
+
+class Worker:
+    """Emulator for a partition, exchanging values with other workers through shared memory."""
+
+    emulator: Emulator
+    shared: np.ndarray
+    imports: list[list[tuple[int, Parameter, Callable[[float], float | int | bool]]]]
+    exports: list[list[tuple[int, Parameter]]]
+    stages: list[list[Callable[[], None]]]
+
+    def __init__(self, partition: Partition, slots: list[Slot], values: ctypes.Array[ctypes.c_double]) -> None:
+        self.emulator = Emulator.from_data(
+            partition.data,
+            partition.cp,
+            partition.levels,
+            processes=1,
+            compiled=partition.compiled,
+            precision=partition.precision,
+            bpc=partition.bpc,
+        )
+        self.shared = np.frombuffer(values, dtype=np.float64)
+
+        # Values from other partitions are held by stand-in blocks, imported once the level producing them has executed
+        self.imports = [[] for _ in range(partition.stages + 1)]
+        self.exports = [[] for _ in range(partition.stages)]
+
+        for i in partition.imports:
+            slot = slots[i]
+            compound, block, name = slot.key
+            parameter = self.emulator.compounds[compound][block].get_parameter(name)
+            precision = self.emulator.precision
+            parameter.inner = RealValue(0, precision) if slot.value_type is RealValue else slot.value_type(0)
+            self.imports[slot.level + 1].append((i, parameter, slot.convert))
+
+        for i in partition.exports:
+            self.exports[slots[i].level].append((i, get_parameter(self.emulator, "{}:{}.{}".format(*slots[i].key))))
+
+        schedule = self.emulator.get_schedule()
+        self.stages = [
+            [block.execute for block in schedule if partition.levels.get(block.compound) == level]
+            for level in range(partition.stages)
+        ]
+
+    def run(self, cycles: int, barrier: synchronize.Barrier) -> None:
+        """Execute each level for a number of cycles, waiting for the other workers after each level."""
+        shared = self.shared
+
+        for _ in range(cycles):
+            for level, executes in enumerate(self.stages):
+                for i, parameter, convert in self.imports[level]:
+                    parameter.get_value().set(convert(shared[i].item()))
+
+                for execute in executes:
+                    execute()
+
+                for i, parameter in self.exports[level]:
+                    shared[i] = parameter.get_value().get()
+
+                barrier.wait()
+
+
+def work(
+    partition: Partition,
+    slots: list[Slot],
+    values: ctypes.Array[ctypes.c_double],
+    barrier: synchronize.Barrier,
+    connection: Connection,
+) -> None:
+    """Emulate a partition in a worker process, executing commands received through a pipe until told to stop."""
+    try:
+        worker = Worker(partition, slots, values)
+        connection.send(None)
+    except Exception as error:  # noqa: BLE001
+        connection.send(error)
+        return
+
+    while True:
+        match connection.recv():
+            case ("run", cycles):
+                try:
+                    worker.run(cycles, barrier)
+                    connection.send(None)
+                except Exception as error:  # noqa: BLE001
+                    barrier.abort()
+                    connection.send(error)
+            case ("get", name):
+                try:
+                    connection.send(get_parameter(worker.emulator, name).get_value().get())
+                except Exception as error:  # noqa: BLE001
+                    connection.send(error)
+            case _:
+                return
+
+
+def create_partitions(
+    data: Data,
+    blocks: list[Block],
+    processes: int | None,
+) -> tuple[dict[str, int], dict[str, int], list[Slot], list[tuple[Data, tuple[int, ...], tuple[int, ...]]]]:
+    """
+    Partition compounds between worker processes, returning the worker and level of each compound, the values
+    exchanged between workers, and the data, imported and exported values of each worker.
+    """
+    models = {(block.compound, block.name): block for block in blocks}
+    sizes = dict.fromkeys((block.compound for block in blocks), 0)
+    sinks: dict[str, set[str]] = {compound: set() for compound in sizes}
+    connections: list[tuple[str, Key]] = []
+
+    for block in blocks:
+        sizes[block.compound] += 1
+
+        for key in connections_iter(block):
+            if (key[0], key[1]) in models and key[0] != block.compound:
+                sinks[key[0]].add(block.compound)
+                connections.append((block.compound, key))
+
+    # Compounds in a loop execute together, levels follow the longest chain of connections between groups
+    groups = strongly_connected_components(sizes, sinks)
+    group_of = {compound: i for i, group in enumerate(groups) for compound in group}
+    levels = dict.fromkeys(range(len(groups)), 0)
+
+    for i in reversed(range(len(groups))):
+        for sink in {group_of[sink] for compound in groups[i] for sink in sinks[compound]} - {i}:
+            levels[sink] = max(levels[sink], levels[i] + 1)
+
+    # Assign the largest groups first, each to the least loaded worker
+    n_workers = max(1, min(processes or 1, len(groups)))
+    load = [(0, worker) for worker in range(n_workers)]
+    workers: dict[str, int] = {}
+
+    for group in sorted(groups, key=lambda group: -sum(sizes[compound] for compound in group)):
+        total, worker = heapq.heappop(load)
+        workers.update(dict.fromkeys(group, worker))
+        heapq.heappush(load, (total + sum(sizes[compound] for compound in group), worker))
+
+    # Values connected between workers are exchanged, strings are configuration and are held by stand-ins instead
+    keys = sorted(
+        {
+            key
+            for sink, key in connections
+            if workers[key[0]] != workers[sink] and value_type(models[key[0], key[1]], key[2]) is not StringValue
+        }
+    )
+    slots = [Slot(key, levels[group_of[key[0]]], value_type(models[key[0], key[1]], key[2])) for key in keys]
+    slot_of = {slot.key: i for i, slot in enumerate(slots)}
+    imports: list[set[int]] = [set() for _ in range(n_workers)]
+    partitions = []
+
+    for sink, key in connections:
+        if (i := slot_of.get(key)) is not None:
+            imports[workers[sink]].add(i)
+
+    for worker in range(n_workers):
+        owned = [block for block in blocks if workers[block.compound] == worker]
+        referenced = {
+            model for block in owned for key in connections_iter(block) if (model := data.get_block_from_name(*key[:2]))
+        }
+        worker_blocks = (*owned, *referenced.difference(owned))
+        exports = tuple(i for i, slot in enumerate(slots) if workers[slot.key[0]] == worker)
+        partitions.append(
+            (
+                Data(worker_blocks, {hash(block): block for block in worker_blocks}, {}),
+                tuple(sorted(imports[worker])),
+                exports,
+            )
+        )
+
+    return workers, {compound: levels[group_of[compound]] for compound in sizes}, slots, partitions
+
+
+def connections_iter(block: Block) -> Generator[Key]:
+    """Iterate over the compound, block and parameter names that a block model's parameters are connected to."""
+    calc = block.config.get("TYPE") == "CALC"
+
+    for key, value in block.config.items():
+        if calc and (key == "TYPE" or key not in CalcParameters.__dataclass_fields__):
+            continue
+
+        if "." in value and ":" in value and (match := CONNECTION_RE.match(value)):
+            yield (match.group("compound") or block.compound, match.group("block"), match.group("parameter"))
+
+
+def value_type(block: Block, parameter: str) -> type[BaseValue]:
+    """Get the value type of a parameter on a block model, without creating the emulated block."""
+    if block.config.get("TYPE") == "CALC" and (default := getattr(CALC_DEFAULTS, parameter, None)) is not None:
+        return type(default.inner)
+    elif isinstance(maybe_float(value := block.config.get(parameter, "0")), str) and not CONNECTION_RE.match(value):
+        return StringValue
+    else:
+        return RealValue
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from foxemu.blocks import EmulatedBlock
+
+PERIODS = {
+    0: 0.1,
+    1: 0.5,
+    2: 1.0,
+    3: 2.0,
+    4: 10.0,
+    5: 30.0,
+    6: 60.0,
+    7: 600.0,
+    8: 3600.0,
+    9: 0.2,
+    10: 5.0,
+    11: 0.6,
+    12: 6.0,
+    13: 0.05,
+}
+"""Block execution periods in seconds, keyed by PERIOD code."""
+
+DEFAULT_BPC = 0.5
+"""Default basic processing cycle of the control processor in seconds, ie. the length of a tick."""
+
+PATTERN_CACHE_SIZE = 1024
+
+SECONDS_PER_DAY = 86400
+
+
+def period_ticks(period: int, bpc: float) -> int:
+    """Convert a PERIOD code into a number of ticks, blocks can't execute more often than every tick."""
+    if (seconds := PERIODS.get(period)) is None:
+        description = f"invalid PERIOD: {period}"
+        raise RuntimeError(description)
+
+    return max(1, round(seconds / bpc))
+
+
+class Clock:
+    """
+    Simulated time of an emulator, shared with its blocks so that timing instructions don't depend on wall-clock time.
+
+    Time is counted in ticks, each a basic processing cycle (BPC) long, starting from midnight at tick 0.
+    """
+
+    __slots__ = ("bpc", "tick")
+
+    bpc: float
+    tick: int
+
+    def __init__(self, bpc: float = DEFAULT_BPC) -> None:
+        self.bpc = bpc
+        self.tick = 0
+
+    @property
+    def time(self) -> float:
+        """Simulated time in seconds since tick 0."""
+        return self.tick * self.bpc
+
+    @property
+    def time_of_day(self) -> float:
+        """Simulated time in seconds since midnight."""
+        return self.time % SECONDS_PER_DAY
+
+
+class TickSchedule:
+    """
+    Blocks bucketed by period and phase, as executed by the control processor every basic processing cycle (BPC).
+
+    A block with a period of `n` ticks executes on ticks where `tick % n == PHASE % n`. Blocks due on the same
+    tick execute in the order of the schedule they were bucketed from.
+    """
+
+    buckets: dict[tuple[int, int], list[tuple[int, EmulatedBlock]]]
+    patterns: dict[tuple[tuple[int, int], ...], list[EmulatedBlock]]
+
+    def __init__(self, schedule: Sequence[EmulatedBlock], bpc: float) -> None:
+        self.buckets = {}
+        self.patterns = {}
+
+        for i, block in enumerate(schedule):
+            ticks = period_ticks(block.period, bpc)
+            self.buckets.setdefault((ticks, block.phase % ticks), []).append((i, block))
+
+    def due(self, tick: int) -> list[EmulatedBlock]:
+        """Get blocks that are due to execute on a tick, in schedule order."""
+        pattern = tuple(key for key in self.buckets if tick % key[0] == key[1])
+
+        if (blocks := self.patterns.get(pattern)) is None:
+            blocks = [block for _, block in heapq.merge(*(self.buckets[key] for key in pattern))]
+
+            # Only a few patterns repeat for typical periods, but many phases of long periods could use a lot of memory
+            if len(self.patterns) < PATTERN_CACHE_SIZE:
+                self.patterns[pattern] = blocks
+
+        return blocks
@@ -1,7 +1,9 @@
 # ruff: noqa: ANN401
 from __future__ import annotations
 
+import struct
 from dataclasses import dataclass
+from enum import Enum
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
@@ -12,6 +14,63 @@ if TYPE_CHECKING:
     from foxemu.emulator import Emulator
 
 
+REAL_LIMIT = 1e38
+HALF_MAX = 65504.0
+
+_half = struct.Struct("e")
+_pack_half = _half.pack
+_unpack_half = _half.unpack
+
+
+def emulate_real_precision(value: float) -> float:
+    """Round a value to the precision of a real value on the controller."""
+    # Round trip through IEEE 754 half precision, equivalent to `np.float16` without creating a NumPy scalar
+    try:
+        rounded = _unpack_half(_pack_half(value))[0]
+    except OverflowError:
+        return REAL_LIMIT if value > 0 else -REAL_LIMIT
+    except struct.error:
+        return emulate_real_precision(float(value))
+
+    if -HALF_MAX <= rounded <= HALF_MAX:
+        return rounded
+
+    # Infinity saturates at the limits of a real value, NaN saturates high
+    return -REAL_LIMIT if rounded < 0 else REAL_LIMIT
+
+
+def emulate_real_precision_array(values: np.ndarray) -> np.ndarray:
+    """Round an array of values to the precision of a real value on the controller."""
+    with np.errstate(over="ignore"):
+        rounded = np.asarray(values).astype(np.float16).astype(np.float64)
+
+    rounded[np.isnan(rounded)] = REAL_LIMIT
+    return np.clip(rounded, -REAL_LIMIT, REAL_LIMIT)
+
+
+class Precision(Enum):
+    """
+    Precision used to emulate real values.
+
+    `CONTROLLER` rounds values as the controller does, `FAST` keeps native float64 values
+    for speed when exact results aren't needed.
+    """
+
+    CONTROLLER = "controller"
+    FAST = "fast"
+
+    def round(self, value: float) -> float:
+        """Round a value to this precision."""
+        return emulate_real_precision(value) if self is Precision.CONTROLLER else float(value)
+
+    def round_array(self, values: np.ndarray) -> np.ndarray:
+        """Round an array of values to this precision in a single vectorised operation."""
+        if self is Precision.CONTROLLER:
+            return emulate_real_precision_array(values)
+
+        return np.asarray(values, dtype=np.float64)
+
+
 class BaseValue[T]:
     """Base object for emulated values."""
 
@@ -34,31 +93,37 @@ class BaseValue[T]:
 
 
 class RealValue(BaseValue[float]):
+    precision: Precision
+
+    def __init__(self, value: float, precision: Precision = Precision.CONTROLLER) -> None:
+        self.precision = precision
+        self.set(value)
+
     def emulate_precision(self, value: float) -> float:
-        return clamp(float(np.float16(value)), -pow(10, 38), pow(10, 38))
+        return self.precision.round(value)
 
     def __abs__(self) -> RealValue:
-        return RealValue(abs(self._value))
+        return RealValue(abs(self._value), self.precision)
 
     def __add__(self, other: Any) -> RealValue:
-        if issubclass(other, RealValue | IntegerValue):
-            return RealValue(self._value + other._value)
-        return RealValue(self._value + other)
+        if isinstance(other, RealValue | IntegerValue):
+            return RealValue(self._value + other._value, self.precision)
+        return RealValue(self._value + other, self.precision)
 
     def __sub__(self, other: Any) -> RealValue:
-        if issubclass(other, RealValue | IntegerValue):
-            return RealValue(self._value - other._value)
-        return RealValue(self._value - other)
+        if isinstance(other, RealValue | IntegerValue):
+            return RealValue(self._value - other._value, self.precision)
+        return RealValue(self._value - other, self.precision)
 
     def __mul__(self, other: Any) -> RealValue:
-        if issubclass(other, RealValue | IntegerValue):
-            return RealValue(self._value * other._value)
-        return RealValue(self._value * other)
+        if isinstance(other, RealValue | IntegerValue):
+            return RealValue(self._value * other._value, self.precision)
+        return RealValue(self._value * other, self.precision)
 
     def __truediv__(self, other: Any) -> RealValue:
-        if issubclass(other, RealValue | IntegerValue):
-            return RealValue(self._value / other._value)
-        return RealValue(self._value / other)
+        if isinstance(other, RealValue | IntegerValue):
+            return RealValue(self._value / other._value, self.precision)
+        return RealValue(self._value / other, self.precision)
 
 
 class IntegerValue(BaseValue[int]):
@@ -75,22 +140,22 @@ class IntegerValue(BaseValue[int]):
         return IntegerValue(abs(self._value))
 
     def __add__(self, other: Any) -> IntegerValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return IntegerValue(self._value + other._value)
         return IntegerValue(self._value + other)
 
     def __sub__(self, other: Any) -> IntegerValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return IntegerValue(self._value - other._value)
         return IntegerValue(self._value - other)
 
     def __mul__(self, other: Any) -> IntegerValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return IntegerValue(self._value * other._value)
         return IntegerValue(self._value * other)
 
     def __truediv__(self, other: Any) -> IntegerValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return IntegerValue(self._value / other._value)
         return IntegerValue(self._value / other)
 
@@ -103,22 +168,22 @@ class ShortValue(IntegerValue):
         return ShortValue(abs(self._value))
 
     def __add__(self, other: Any) -> ShortValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return ShortValue(self._value + other._value)
         return ShortValue(self._value + other)
 
     def __sub__(self, other: Any) -> ShortValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return ShortValue(self._value - other._value)
         return ShortValue(self._value - other)
 
     def __mul__(self, other: Any) -> ShortValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return ShortValue(self._value * other._value)
         return ShortValue(self._value * other)
 
     def __truediv__(self, other: Any) -> ShortValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return ShortValue(self._value / other._value)
         return ShortValue(self._value / other)
 
@@ -131,22 +196,22 @@ class LongValue(IntegerValue):
         return LongValue(abs(self._value))
 
     def __add__(self, other: Any) -> LongValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return LongValue(self._value + other._value)
         return LongValue(self._value + other)
 
     def __sub__(self, other: Any) -> LongValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return LongValue(self._value - other._value)
         return LongValue(self._value - other)
 
     def __mul__(self, other: Any) -> LongValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return LongValue(self._value * other._value)
         return LongValue(self._value * other)
 
     def __truediv__(self, other: Any) -> LongValue:
-        if issubclass(other, RealValue | IntegerValue):
+        if isinstance(other, RealValue | IntegerValue):
             return LongValue(self._value / other._value)
         return LongValue(self._value / other)
 
@@ -160,6 +225,35 @@ class StringValue(BaseValue[str]): ...
 Value = RealValue | IntegerValue | ShortValue | LongValue | BoolValue | StringValue
 
 
+class StoredValue:
+    """
+    Mixin for values held in a column of a NumPy array shared by many blocks, rather than by the value object.
+
+    See `foxemu.storage.ParameterStorage`.
+    """
+
+    columns: dict[str, np.ndarray]
+    name: str
+    row: int
+
+    def __init__(self, columns: dict[str, np.ndarray], name: str, row: int) -> None:
+        self.columns = columns
+        self.name = name
+        self.row = row
+
+    @property
+    def _value(self) -> Any:
+        return self.columns[self.name].item(self.row)
+
+    @_value.setter
+    def _value(self, value: Any) -> None:
+        self.columns[self.name][self.row] = value
+
+    def store(self, value: Any) -> None:
+        """Store a value that has already been emulated, without emulating precision again."""
+        self.columns[self.name][self.row] = value
+
+
 class Status(int):
     """Emulates signal status data as a packed integer."""
 
@@ -279,25 +373,45 @@ class UnparsedConnection[T: Value]:
     parameter: str
 
     def parse(self, emulator: Emulator) -> Connection[T]:
-        return Connection(
-            block=emulator.compounds[self.compound][self.block],
-            parameter=self.parameter,
-        )
+        """Resolve the connection to the parameter holding its source value, following any connected parameters."""
+        block = emulator.compounds[self.compound][self.block]
+        source = block.get_parameter(self.parameter)
+        visited: set[Parameter] = set()
+
+        while source is not None and source not in visited:
+            visited.add(source)
+
+            match source.inner:
+                case UnparsedConnection(compound, name, parameter):
+                    source = emulator.compounds[compound][name].get_parameter(parameter)
+                case Connection():
+                    source = source.inner.source
+                case BaseValue() | Signal():
+                    return Connection(block, self.parameter, source)
+                case _:
+                    description = "connection source must hold a value"
+                    raise RuntimeError(description)
+
+        description = "invalid connection"
+        raise RuntimeError(description)
 
 
 @dataclass
 class Connection[T: Value]:
-    """Represents a parsed connection to a block/parameter."""
+    """
+    Represents a parsed connection to a block/parameter.
+
+    `source` is the parameter holding the value, or a signal of it, resolved when the connection is parsed so that
+    reading the value doesn't need to look up the parameter by name.
+    """
 
     block: EmulatedBlock
     parameter: str
+    source: Parameter[T]
 
     def get_value(self) -> T:
-        if p := self.block.get_parameter(self.parameter):
-            return p.get_value()
-        else:
-            description = "invalid connection"
-            raise RuntimeError(description)
+        value = self.source.inner
+        return value.value if isinstance(value, Signal) else value  # type: ignore[return-value]
 
 
 class Parameter[T: Value]:
@@ -313,11 +427,14 @@ class Parameter[T: Value]:
 
     def get_value(self) -> T:
         match self.inner:
+            case BaseValue():
+                return self.inner  # type: ignore[return-value]
+            case Connection():
+                value = self.inner.source.inner
+                return value.value if isinstance(value, Signal) else value  # type: ignore[return-value]
             case UnparsedConnection():
                 description = "unparsed connection"
                 raise RuntimeError(description)
-            case Connection():
-                return self.inner.get_value()
             case Signal():
                 return self.inner.value
             case T:  # noqa: F841
@@ -333,6 +450,8 @@ class Parameter[T: Value]:
                 raise RuntimeError(description)
             case Signal():
                 self.inner.value = value
+            case StoredValue():
+                self.inner.store(value.get())
             case T:  # noqa: F841
                 self.inner = value
 
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from foxemu.signaling import BoolValue, IntegerValue, RealValue, StoredValue
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from foxemu.blocks import EmulatedBlock
+    from foxemu.emulator import Emulator
+    from foxemu.signaling import Parameter
+    from foxemu.storage import ParameterStorage
+
+DEFAULT_CAPACITY = 1000
+"""Default number of checkpoints kept by `Checkpoints`."""
+
+DEFAULT_INTERVAL = 64
+"""Default number of checkpoints between full snapshots kept by `Checkpoints`."""
+
+
+class StateLayout:
+    """
+    Order in which the state of every block in an emulator is captured into a vector of float64 values.
+
+    State is made up of numeric parameter values and the memory of each block, see `EmulatedBlock.get_memory`. Numeric
+    fields of parameter storage are captured as whole columns, followed by other parameters and then block memory.
+    String parameters are configuration that doesn't change as blocks execute, so they aren't captured, nor are
+    connected parameters, whose values are captured from their source.
+    """
+
+    storage: ParameterStorage | None
+    fields: list[str]
+    parameters: list[Parameter]
+    converters: list[Callable[[float], float | int | bool]]
+    blocks: list[EmulatedBlock]
+    sizes: list[int]
+
+    def __init__(self, blocks: Sequence[EmulatedBlock], storage: ParameterStorage | None = None) -> None:
+        self.storage = storage
+        self.fields = []
+        self.parameters = []
+        self.converters = []
+        self.blocks = []
+        self.sizes = []
+
+        if storage is not None:
+            self.fields = [name for name, (dtype, _) in storage.array.dtype.fields.items() if dtype != np.object_]
+
+        for block in blocks:
+            for parameter in block.parameters_iter():
+                match parameter.inner:
+                    case StoredValue() if storage is not None and parameter.inner.columns is storage.columns:
+                        continue
+                    case BoolValue():
+                        converter = bool
+                    case IntegerValue():
+                        converter = int
+                    case RealValue():
+                        converter = float
+                    case _:
+                        continue
+
+                self.parameters.append(parameter)
+                self.converters.append(converter)
+
+            if size := len(block.get_memory()):
+                self.blocks.append(block)
+                self.sizes.append(size)
+
+    def capture(self) -> np.ndarray:
+        """Capture the state of every block."""
+        columns: list[np.ndarray] = []
+
+        if self.storage is not None:
+            rows = self.storage.rows
+            columns.extend(self.storage.array[name][:rows] for name in self.fields)
+
+        values = [parameter.get_value().get() for parameter in self.parameters]
+        values.extend(value for block in self.blocks for value in block.get_memory())
+        columns.append(np.array(values, dtype=np.float64))
+
+        return np.concatenate(columns, dtype=np.float64)
+
+    def apply(self, state: np.ndarray) -> None:
+        """Set the state of every block from a captured vector."""
+        offset = 0
+
+        if self.storage is not None:
+            rows = self.storage.rows
+
+            for name in self.fields:
+                self.storage.array[name][:rows] = state[offset : offset + rows]
+                offset += rows
+
+        # Reading parameters is cheaper than setting them, so only set those that have changed
+        values = state[offset:].tolist()
+        current = np.array([parameter.get_value().get() for parameter in self.parameters], dtype=np.float64)
+
+        for i in np.flatnonzero(current != state[offset : offset + len(current)]).tolist():
+            self.parameters[i].get_value().set(self.converters[i](values[i]))
+
+        offset = len(self.parameters)
+
+        for block, size in zip(self.blocks, self.sizes, strict=True):
+            block.set_memory(values[offset : offset + size])
+            offset += size
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """State of an emulator at a tick, see `Emulator.snapshot`."""
+
+    layout: StateLayout
+    tick: int
+    values: bytes
+
+    def state(self) -> np.ndarray:
+        """Get the captured vector of values, see `StateLayout`."""
+        return np.frombuffer(self.values, dtype=np.float64)
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """Entry in `Checkpoints`, holding all values for full snapshots, otherwise only those that changed."""
+
+    tick: int
+    values: bytes
+    indices: bytes | None = None
+
+
+class Checkpoints:
+    """
+    Ring of emulator checkpoints for stepping backwards through cycles.
+
+    Most checkpoints only hold the values that changed since the previous checkpoint, with a full snapshot every
+    `interval` checkpoints, so restoring a checkpoint applies at most `interval` sets of changes to a full snapshot.
+    Once `capacity` checkpoints are kept, saving another discards the oldest.
+    """
+
+    emulator: Emulator
+    capacity: int
+    interval: int
+    entries: deque[Checkpoint]
+    layout: StateLayout | None
+    previous: np.ndarray | None
+
+    def __init__(self, emulator: Emulator, capacity: int = DEFAULT_CAPACITY, interval: int = DEFAULT_INTERVAL) -> None:
+        self.emulator = emulator
+        self.capacity = max(capacity, 1)
+        self.interval = max(interval, 1)
+        self.entries = deque()
+        self.layout = None
+        self.previous = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def save(self) -> None:
+        """Save a checkpoint of the emulator's current state, starting over if its blocks have changed."""
+        layout = self.emulator.get_state_layout()
+
+        if layout is not self.layout:
+            self.entries.clear()
+            self.layout = layout
+            self.previous = None
+
+        state = layout.capture()
+
+        if len(self.entries) == self.capacity:
+            self.discard_oldest()
+
+        if self.previous is None or len(self.entries) - self.full(len(self.entries) - 1) >= self.interval:
+            self.entries.append(Checkpoint(self.emulator.tick, state.tobytes()))
+        else:
+            indices = np.flatnonzero(state != self.previous).astype(np.int32)
+            self.entries.append(Checkpoint(self.emulator.tick, state[indices].tobytes(), indices.tobytes()))
+
+        self.previous = state
+
+    def rewind(self, n: int = 1) -> None:
+        """Restore the state from `n` checkpoints before the latest, discarding any checkpoints after it."""
+        if self.layout is not self.emulator.get_state_layout():
+            description = "checkpoints were saved with different blocks"
+            raise RuntimeError(description)
+
+        if not 0 <= n < len(self.entries):
+            description = f"checkpoint not found: {n} before the latest of {len(self.entries)}"
+            raise RuntimeError(description)
+
+        for _ in range(n):
+            self.entries.pop()
+
+        state = self.state(len(self.entries) - 1)
+        self.layout.apply(state)
+        self.emulator.tick = self.entries[-1].tick
+        self.previous = state
+
+    def full(self, index: int) -> int:
+        """Find the latest full snapshot at or before a checkpoint."""
+        while self.entries[index].indices is not None:
+            index -= 1
+
+        return index
+
+    def state(self, index: int) -> np.ndarray:
+        """Reconstruct the captured vector of values for a checkpoint."""
+        start = self.full(index)
+        state = np.frombuffer(self.entries[start].values, dtype=np.float64).copy()
+
+        for i in range(start + 1, index + 1):
+            checkpoint = self.entries[i]
+            indices = np.frombuffer(checkpoint.indices or b"", dtype=np.int32)
+            state[indices] = np.frombuffer(checkpoint.values, dtype=np.float64)
+
+        return state
+
+    def discard_oldest(self) -> None:
+        """Discard the oldest checkpoint, turning the next into a full snapshot if it only holds changes."""
+        if len(self.entries) > 1 and self.entries[1].indices is not None:
+            self.entries[1] = Checkpoint(self.entries[1].tick, self.state(1).tobytes())
+
+        self.entries.popleft()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Self
+
+import numpy as np
+
+from foxemu.signaling import (
+    BaseValue,
+    BoolValue,
+    IntegerValue,
+    LongValue,
+    Parameter,
+    Precision,
+    RealValue,
+    ShortValue,
+    StoredValue,
+    StringValue,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+DEFAULT_CAPACITY = 64
+"""Number of rows allocated for new storage, which doubles whenever it runs out."""
+
+
+class StoredRealValue(StoredValue, RealValue):
+    def __init__(self, columns: dict[str, np.ndarray], name: str, row: int) -> None:
+        super().__init__(columns, name, row)
+        self.precision = Precision.CONTROLLER
+
+
+class StoredIntegerValue(StoredValue, IntegerValue): ...
+
+
+class StoredShortValue(StoredValue, ShortValue): ...
+
+
+class StoredLongValue(StoredValue, LongValue): ...
+
+
+class StoredBoolValue(StoredValue, BoolValue): ...
+
+
+class StoredStringValue(StoredValue, StringValue): ...
+
+
+STORED_VALUES: dict[type[BaseValue], tuple[type[StoredValue], Any]] = {
+    RealValue: (StoredRealValue, np.float64),
+    IntegerValue: (StoredIntegerValue, np.int16),
+    ShortValue: (StoredShortValue, np.int8),
+    LongValue: (StoredLongValue, np.int32),
+    BoolValue: (StoredBoolValue, np.bool_),
+    StringValue: (StoredStringValue, object),
+}
+"""Stored value type and column dtype for each value type."""
+
+
+class ParameterStorage[P]:
+    """
+    Parameters of many blocks of one type held in a NumPy structured array, with one row per block and one field per
+    parameter, of a dtype matching its value type.
+
+    Blocks use a `ParametersView` of their row in place of their own parameters, so that values of every block can be
+    copied or processed as whole columns, and parameter objects are only created for the parameters that are used.
+    """
+
+    parameters_type: type[P]
+    layout: dict[str, tuple[type[Parameter], type[StoredValue]]]
+    defaults: np.ndarray
+    array: np.ndarray
+    columns: dict[str, np.ndarray]
+    rows: int
+
+    def __init__(self, parameters_type: type[P], capacity: int = DEFAULT_CAPACITY) -> None:
+        # Lay out columns from the default parameters, the type of each parameter and value is the same for every row
+        defaults = parameters_type()
+        dtype = []
+        values = []
+        self.parameters_type = parameters_type
+        self.layout = {}
+
+        for name, parameter in vars(defaults).items():
+            stored, column_dtype = STORED_VALUES[type(parameter.inner)]
+            self.layout[name] = (type(parameter), stored)
+            dtype.append((name, column_dtype))
+            values.append(parameter.inner.get())
+
+        self.defaults = np.array([tuple(values)], dtype=dtype)
+        self.array = np.repeat(self.defaults, max(capacity, 1))
+        self.columns = {name: self.array[name] for name in self.layout}
+        self.rows = 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def allocate(self) -> int:
+        """Allocate a row of default values, growing the array if it's full, and return the row index."""
+        if self.rows == len(self.array):
+            self.array = np.concatenate((self.array, np.repeat(self.defaults, len(self.array))))
+
+            # Stored values hold the columns mapping rather than the arrays, so update it in place
+            self.columns.update((name, self.array[name]) for name in self.layout)
+
+        self.rows += 1
+        return self.rows - 1
+
+    def create(self, row: int, name: str) -> Parameter:
+        """Create a parameter whose value is held in a row of the array."""
+        parameter_type, stored = self.layout[name]
+        return parameter_type(stored(self.columns, name, row))
+
+    def snapshot(self) -> np.ndarray:
+        """Copy the values of every row."""
+        return self.array[: self.rows].copy()
+
+    def restore(self, snapshot: np.ndarray) -> None:
+        """Restore values of rows from a snapshot."""
+        self.array[: len(snapshot)] = snapshot
+
+
+class ParametersView:
+    """
+    Mixin making a parameters dataclass a view of a row in `ParameterStorage`.
+
+    Parameters are created as they're accessed rather than when the view is created. Parameters that can't be stored,
+    ie. connections, are held by the view and take the place of the stored value.
+    """
+
+    storage: ParameterStorage
+    row: int
+
+    def __init__(self, storage: ParameterStorage, row: int) -> None:
+        self.storage = storage
+        self.row = row
+
+    @classmethod
+    def create(cls, storage: ParameterStorage, parameters: object) -> Self:
+        """Store the values of parameters in a new row and return a view of it."""
+        view = cls(storage, storage.allocate())
+
+        for name, parameter in vars(parameters).items():
+            if isinstance(parameter.inner, BaseValue):
+                storage.columns[name][view.row] = parameter.inner.get()
+            else:
+                setattr(view, name, parameter)
+
+        return view
+
+    def __getattr__(self, name: str) -> Parameter:
+        # Only called for attributes that don't exist yet, ie. parameters that haven't been accessed
+        if (storage := self.__dict__.get("storage")) is None or name not in storage.layout:
+            raise AttributeError(name)
+
+        parameter = self.__dict__[name] = storage.create(self.row, name)
+        return parameter
+
+    def parameters_iter(self) -> Generator[Parameter]:
+        """Iterate over parameters, without keeping those created for parameters that haven't been accessed."""
+        return (self.__dict__.get(name) or self.storage.create(self.row, name) for name in self.storage.layout)
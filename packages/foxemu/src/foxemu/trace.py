@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import csv
+from typing import TYPE_CHECKING
+
+import numpy as np
+from foxdata.parsing import CONNECTION_RE
+
+from foxemu.signaling import StringValue
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+    from typing import IO
+
+    from foxemu.emulator import Emulator
+    from foxemu.signaling import Parameter
+
+DEFAULT_CAPACITY = 3600
+"""Default number of samples kept by a `Recorder`."""
+
+
+class Recorder:
+    """
+    Records the values of parameters into a preallocated ring buffer, keeping the latest `capacity` samples.
+
+    Parameters are named in the form `COMPOUND:BLOCK.PARAMETER`. Once attached to an emulator with `Emulator.record`,
+    a sample is recorded after each cycle of `Emulator.execute` and `Emulator.run`, and after each tick of
+    `Emulator.advance`. Samples are numbered in the order they're recorded, so that a consumer can read only the
+    samples it hasn't seen yet, see `Recorder.data`.
+    """
+
+    names: tuple[str, ...]
+    parameters: list[Parameter]
+    capacity: int
+    samples: np.ndarray
+    ticks: np.ndarray
+    values: np.ndarray
+    count: int
+
+    def __init__(self, emulator: Emulator, names: Iterable[str], capacity: int = DEFAULT_CAPACITY) -> None:
+        self.names = tuple(names)
+        self.parameters = [get_parameter(emulator, name) for name in self.names]
+        self.capacity = max(capacity, 1)
+        self.samples = np.zeros(self.capacity, dtype=np.int64)
+        self.ticks = np.zeros(self.capacity, dtype=np.int64)
+        self.values = np.zeros((self.capacity, len(self.names)), dtype=np.float64)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def record(self, tick: int) -> None:
+        """Record a sample of the current value of each parameter."""
+        i = self.count % self.capacity
+        self.values[i] = [parameter.get_value().get() for parameter in self.parameters]
+        self.samples[i] = self.count
+        self.ticks[i] = tick
+        self.count += 1
+
+    def data(self, since: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get sample numbers, ticks and values of samples from sample number `since` onwards, oldest first."""
+        start = max(since, self.count - self.capacity, 0)
+        order = np.arange(start, self.count) % self.capacity
+        return self.samples[order], self.ticks[order], self.values[order]
+
+    def to_csv(self, file: IO[str], since: int = 0) -> None:
+        """Write samples to a CSV file, with a column for the sample number, tick and each parameter."""
+        writer = csv.writer(file)
+        writer.writerow(("sample", "tick", *self.names))
+        samples, ticks, values = self.data(since)
+
+        for sample, tick, row in zip(samples.tolist(), ticks.tolist(), values.tolist(), strict=True):
+            writer.writerow((sample, tick, *row))
+
+    def to_npz(self, file: Path | IO[bytes], since: int = 0) -> None:
+        """Write samples to a NumPy `.npz` archive, with arrays of `names`, `samples`, `ticks` and `values`."""
+        samples, ticks, values = self.data(since)
+        np.savez(file, names=np.array(self.names), samples=samples, ticks=ticks, values=values)
+
+
+def get_parameter(emulator: Emulator, name: str) -> Parameter:
+    """Get a parameter from an emulator by name, in the form `COMPOUND:BLOCK.PARAMETER`."""
+    if (match := CONNECTION_RE.match(name)) is None or not match.group("compound"):
+        description = f"invalid parameter name: '{name}'"
+        raise RuntimeError(description)
+
+    compound, block, parameter = match.group("compound", "block", "parameter")
+
+    if (emulated := emulator.compounds.get(compound, {}).get(block)) is None:
+        description = f"Block not found: '{compound}:{block}'"
+        raise RuntimeError(description)
+
+    if (result := emulated.get_parameter(parameter)) is None or isinstance(result.inner, StringValue):
+        description = f"Numeric parameter not found: '{name}'"
+        raise RuntimeError(description)
+
+    return result
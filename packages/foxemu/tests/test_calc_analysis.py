@@ -0,0 +1,56 @@
+import unittest
+
+from foxemu.blocks.calc.analysis import Finding, analyse_steps
+from foxemu.blocks.calc.block import Calc
+from foxemu.blocks.calc.errors import CalcError
+from foxemu.blocks.calc.parameters import CalcParameters
+from foxemu.blocks.calc.program import parse_program
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+def create_calc(text: tuple[str, ...]) -> Calc:
+    parameters = CalcParameters()
+
+    for i, step in enumerate(text, start=1):
+        parameters.get_step(i).get_value().set(step)
+
+    return Calc("TEST", "TEST", parameters)
+
+
+class TestAnalysis(unittest.TestCase):
+    def test_findings(self) -> None:
+        text = ("IN 2", "IN 3", "ADD", "BIT 7", "NOP", "GTO 8", "OUT RO01", "END", "IN 1", "OUT RO02")
+        analysis = analyse_steps(parse_program((*text, *[""] * 40)).steps)
+
+        self.assertEqual(
+            analysis.findings,
+            ((1, Finding.CONSTANT), (5, Finding.NO_OP), (9, Finding.UNREACHABLE), (10, Finding.UNREACHABLE)),
+        )
+        self.assertEqual([(fold.start, fold.end, fold.value) for fold in analysis.folds], [(1, 3, 5)])
+
+    def test_branch_targets(self) -> None:
+        # Runs aren't folded across steps that can be reached by a branch or skip
+        text = ("IN 2", "BIZ 4", "IN 3", "IN 4", "MUL", "SSZ M01", "IN 5", "IN 6", "CHS", "ADD 2", "OUT RO01")
+        analysis = analyse_steps(parse_program((*text, *[""] * 39)).steps)
+        self.assertEqual([(fold.start, fold.end, fold.value) for fold in analysis.folds], [(8, 9, -6)])
+        self.assertFalse(analysis.unreachable)
+
+        # Indirect branches could go anywhere
+        text = ("IN 2", "IN 3", "ADD", "GTI M01", "END", "IN 1")
+        analysis = analyse_steps(parse_program((*text, *[""] * 44)).steps)
+        self.assertEqual(analysis.findings, ())
+
+    def test_execution(self) -> None:
+        # Folded programs execute the same as the steps as written, including overflowing at the same step
+        for prefix in ((), ("IN 1",) * 15):
+            text = (*prefix, "IN 2", "IN 3", "ADD", "IN 4", "MUL", "OUT RO01", "NOP", "END", "OUT RO02")
+            calc = create_calc(text)
+            self.assertEqual(len(calc.analysis.folds), 1)
+            self.assertIsNone(calc.program[len(prefix) + 1])
+            calc.execute()
+
+            self.assertEqual(calc.parameters.RO01.get_value().get(), 20)
+            self.assertEqual(calc.parameters.RO02.get_value().get(), 0)
+            self.assertEqual(calc.errors, [(len(prefix) + 2, CalcError.STACK_OVERFLOW)] if prefix else [])
@@ -0,0 +1,115 @@
+import unittest
+
+import numpy as np
+from foxemu.blocks.calc.block import Calc
+from foxemu.blocks.calc.parameters import CalcParameters
+from foxemu.signaling import Precision
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+def create_calc(text: tuple[str, ...]) -> Calc:
+    parameters = CalcParameters()
+
+    for i, step in enumerate(text, start=1):
+        parameters.get_step(i).get_value().set(step)
+
+    return Calc("TEST", "TEST", parameters)
+
+
+class TestBatch(unittest.TestCase):
+    def assert_matches_interpreter(self, text: tuple[str, ...], inputs: dict[str, np.ndarray]) -> None:
+        result = create_calc(text).execute_batch(inputs)
+
+        # Each row must end up in the same state as executing a separate block with the row's inputs
+        for row in range(len(next(iter(inputs.values())))):
+            calc = create_calc(text)
+
+            for name, values in inputs.items():
+                getattr(calc.parameters, name).get_value().set(values[row].item())
+
+            calc.execute()
+
+            for name, values in result.values.items():
+                self.assertEqual(values[row], float(getattr(calc.parameters, name).get_value().get()), (row, name))
+
+    def test_branching(self) -> None:
+        text = (
+            "IN RI01",
+            "BIN 6",
+            "DIV RI02",
+            "OUT RO01",
+            "GTO 8",
+            "CHS",
+            "OUT RO02",
+            "IN ~BI01",
+            "ADD RI03",
+            "MAX 2",
+            "STM M01",
+            "IN BI02",
+            "IN BI03",
+            "AND 2",
+            "OUT BO01",
+            "IN II01",
+            "IN 2",
+            "MUL 2",
+            "OUT IO01",
+            "END",
+        )
+        rng = np.random.default_rng(0)
+        inputs = {
+            "RI01": rng.normal(scale=100, size=200),
+            "RI02": rng.choice([0, 0.5, 3], size=200),
+            "RI03": rng.normal(scale=100, size=200),
+            "BI01": rng.integers(0, 2, size=200),
+            "BI02": rng.integers(0, 2, size=200),
+            "BI03": rng.integers(0, 2, size=200),
+            "II01": rng.integers(-40000, 40000, size=200),
+        }
+        self.assert_matches_interpreter(text, inputs)
+
+    def test_fallback(self) -> None:
+        # Steps without a vectorised form are executed row by row, including those using internal state
+        text = ("IN RI01", "SQRT", "STM M01", "RAND", "STM M02", "IN RI02", "IN RI03", "MEDN", "OUT RO01", "POP")
+        rng = np.random.default_rng(0)
+        inputs = {name: rng.normal(scale=10, size=50) for name in ("RI01", "RI02", "RI03")}
+        self.assert_matches_interpreter(text, inputs)
+
+    def test_timers(self) -> None:
+        # Each row starts from the state of the block's timers, which are left unchanged
+        calc = create_calc(("IN BI01", "DON -2", "OUT BO01", "IN BI01", "DOFF 5", "OUT BO02"))
+        calc.parameters.BI01.get_value().set(True)
+        calc.execute()
+        calc.execute()
+        memory = calc.get_memory()
+
+        result = calc.execute_batch({"BI01": np.array([0, 1])})
+        self.assertEqual(result["BO01"].tolist(), [0, 1])
+        self.assertEqual(result["BO02"].tolist(), [1, 1])
+        self.assertEqual(calc.get_memory(), memory)
+
+    def test_errors(self) -> None:
+        result = create_calc(("IN RI01", "DIV RI02", "OUT RO01", "ADD")).execute_batch(
+            {"RI01": [1, 2, 3], "RI02": [0, 1, 0]},
+        )
+        self.assertEqual(result["RO01"].tolist(), [0, 2, 0])
+        self.assertEqual(result.perror.tolist(), [6, 6, 6])
+        self.assertEqual(result.sterr.tolist(), [4, 4, 4])
+
+        result = create_calc(("IN RI01", "DIV RI02", "OUT RO01")).execute_batch({"RI01": [1, 2], "RI02": [0, 1]})
+        self.assertEqual(result.perror.tolist(), [4, 0])
+        self.assertEqual(result.sterr.tolist(), [2, 0])
+
+        with self.assertRaises(RuntimeError):
+            create_calc(("IN RI01",)).execute_batch({"RI01": [1, 2], "RI02": [1, 2, 3]})
+
+        with self.assertRaises(RuntimeError):
+            create_calc(("IN RI01",)).execute_batch({"XYZ": [1, 2]})
+
+    def test_precision(self) -> None:
+        calc = create_calc(("IN RI01", "IN 3", "DIV", "STM M01"))
+        self.assertEqual(calc.execute_batch({"RI01": [1, 2]})["M01"].tolist(), [0.333251953125, 0.66650390625])
+
+        calc.precision = Precision.FAST
+        self.assertEqual(calc.execute_batch({"RI01": [1, 2]})["M01"].tolist(), [1 / 3, 2 / 3])
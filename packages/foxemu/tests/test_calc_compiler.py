@@ -0,0 +1,28 @@
+import unittest
+
+from foxemu.blocks.calc.compiler import compile_program
+from foxemu.blocks.calc.program import parse_program
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestCompiler(unittest.TestCase):
+    def test_basic_blocks(self) -> None:
+        text = ("IN RI01", "BIT 5", "IN 1", "GTO 6", "IN 2", "SSZ M01", "OUT RO01", "IN M02", "END")
+        compiled = compile_program(parse_program((*text, *[""] * 41)).steps)
+
+        # Basic blocks start at the first step, branch targets and skip targets
+        for start in (1, 5, 6, 8):
+            self.assertIn(f"def step_{start}(stack):", compiled.source)
+
+        self.assertEqual(compiled.source.count("def step_"), 4)
+        self.assertEqual(set(compiled.slots), {"RI01", "LSCI1", "HSCI1", "RO01", "LSCO1", "HSCO1", "MA", "M02"})
+
+    def test_inlining(self) -> None:
+        text = ("IN RI01", "ADD M01", "DIV", "OUT RO01", "MEDN", "END")
+        compiled = compile_program(parse_program((*text, *[""] * 44)).steps)
+
+        # Only steps without an inlined form call into the operations module
+        self.assertEqual(compiled.source.count("operation_"), 1)
+        self.assertIn("operation_5(block, *operands_5)", compiled.source)
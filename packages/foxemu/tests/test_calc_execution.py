@@ -1,28 +1,48 @@
+import copy
 import unittest
 from collections.abc import Iterable
 
 from foxemu.blocks.calc.block import Calc
+from foxemu.blocks.calc.errors import CalcError
 from foxemu.blocks.calc.parameters import CalcParameters
 from foxemu.emulator import Emulator
-from foxemu.signaling import Parameter, RealValue
+from foxemu.signaling import Parameter, Precision, RealValue
 
 if __name__ == "__main__":
     unittest.main()
 
 
-def execute_with_assertions(
-    test: unittest.TestCase,
-    parameters: CalcParameters,
-    assertions: Iterable[tuple[Parameter, float]],
-) -> Calc:
+def execute(parameters: CalcParameters, *, compiled: bool) -> Calc:
     parameters.NAME.get_value().set("TEST")
     calc = Calc("TEST", "TEST", parameters)
+
+    if compiled:
+        calc.compile()
+
     emulator = Emulator()
     emulator.add_block(calc)
     emulator.execute()
+    return calc
+
+
+def execute_with_assertions(
+    test: unittest.TestCase,
+    parameters: CalcParameters,
+    assertions: Iterable[tuple[Parameter, float]],
+) -> Calc:
+    # Execute a compiled copy of the block first, which must end up in the same state as the interpreter
+    names = {id(parameter): name for name, parameter in vars(parameters).items()}
+    compiled_parameters = copy.deepcopy(parameters)
+    compiled = execute(compiled_parameters, compiled=True)
+    calc = execute(parameters, compiled=False)
 
     for a, b in assertions:
         test.assertEqual(a.get_value().get(), b)
+        test.assertEqual(getattr(compiled_parameters, names[id(a)]).get_value().get(), b)
+
+    test.assertEqual(compiled.errors, calc.errors)
+    test.assertEqual(compiled.seed, calc.seed)
+    test.assertEqual(list(compiled.stack), list(calc.stack))
 
     return calc
 
@@ -153,6 +173,20 @@ class TestArithmetic(unittest.TestCase):
             ],
         )
 
+        # Integer division by zero pushes 0 rather than a quotient or remainder
+        parameters = CalcParameters()
+        parameters.STEP01.get_value().set("IN 7")
+        parameters.STEP02.get_value().set("IN 0")
+        parameters.STEP03.get_value().set("IDIV M01")
+        parameters.STEP04.get_value().set("OUT RO01")
+        parameters.STEP05.get_value().set("IN 7")
+        parameters.STEP06.get_value().set("IN 0")
+        parameters.STEP07.get_value().set("IMOD")
+        parameters.STEP08.get_value().set("OUT RO02")
+
+        calc = execute_with_assertions(self, parameters, assertions=[(parameters.RO01, 0), (parameters.RO02, 0)])
+        self.assertEqual(calc.errors, [(3, CalcError.DIV), (7, CalcError.DIV)])
+
     def test_exponential(self) -> None:
         parameters = CalcParameters()
         parameters.M01.get_value().set(0.693147)
@@ -385,6 +419,69 @@ class TestArithmetic(unittest.TestCase):
         self.assertEqual(calc.seed, 100001)
 
 
+class TestTiming(unittest.TestCase):
+    def test_timers(self) -> None:
+        # Delays are given by a constant, memory register or the stack, in seconds if positive or cycles if negative
+        text = (
+            "IN BI01",
+            "DON -2",
+            "OUT BO01",
+            "IN BI01",
+            "DOFF M01",
+            "OUT BO02",
+            "IN BI01",
+            "IN 1",
+            "DON",
+            "OUT BO03",
+            "IN BI01",
+            "OSP M02",
+            "OUT BO04",
+            "TIM",
+            "STM M03",
+        )
+        sequence = (
+            (True, [False, True, False, True]),
+            (True, [False, True, False, True]),
+            (True, [True, True, True, False]),
+            (False, [False, True, False, False]),
+            (False, [False, True, False, False]),
+            (False, [False, False, False, False]),
+            (True, [False, True, False, True]),
+        )
+
+        for compiled in (False, True):
+            parameters = CalcParameters()
+            parameters.M01.get_value().set(1)
+            parameters.M02.get_value().set(-2)
+
+            for i, step in enumerate(text, start=1):
+                parameters.get_step(i).get_value().set(step)
+
+            calc = Calc("TEST", "TEST", parameters)
+
+            if compiled:
+                calc.compile()
+
+            # With the default BPC and PERIOD of 0.5s, the block executes every tick
+            emulator = Emulator()
+            emulator.add_block(calc)
+
+            for tick, (value, outputs) in enumerate(sequence):
+                parameters.BI01.get_value().set(value)
+                emulator.advance()
+
+                self.assertEqual([getattr(parameters, f"BO0{x}").get_value().get() for x in range(1, 5)], outputs)
+                self.assertEqual(parameters.M03.get_value().get(), tick * 0.5)
+
+            # Timer state is part of the block's memory
+            memory = calc.get_memory()
+            self.assertEqual(len(memory), 2 + 4 * len(calc.timers))
+            emulator.advance(10)
+            self.assertNotEqual(calc.get_memory(), memory)
+            calc.set_memory(memory)
+            self.assertEqual(calc.get_memory(), memory)
+
+
 class TestBoolean(unittest.TestCase):
     def test_basics(self) -> None:
         parameters = CalcParameters()
@@ -432,6 +529,58 @@ class TestBoolean(unittest.TestCase):
             ],
         )
 
+    def test_logic(self) -> None:
+        parameters = CalcParameters()
+        text = (
+            "IN 1", "IN 1", "NAND", "OUT BO01",
+            "IN 1", "IN 0", "IN 1", "XOR 3", "OUT BO02",
+            "IN 1", "IN 0", "NXOR 2", "OUT BO03",
+            "IN 0", "NOT", "OUT BO04",
+        )  # fmt: skip
+
+        for i, step in enumerate(text, start=1):
+            parameters.get_step(i).get_value().set(step)
+
+        execute_with_assertions(
+            self,
+            parameters,
+            assertions=[
+                (parameters.BO01, False),
+                (parameters.BO02, False),
+                (parameters.BO03, False),
+                (parameters.BO04, True),
+            ],
+        )
+
+    def test_packed(self) -> None:
+        parameters = CalcParameters()
+        text = (
+            "IN 12", "IN 10", "ANDX 2", "STM M01",
+            "IN 12", "IN 10", "IN 1", "ORX 3", "STM M02",
+            "IN 12", "IN 10", "XORX 2", "STM M03",
+            "IN 12", "IN 10", "NANX 2", "STM M04",
+            "IN 0", "NOTX", "STM M05",
+            "IN 12", "IN 10", "NORX 2", "STM M06",
+            "IN 12", "IN 10", "NXOX 2", "STM M07",
+        )  # fmt: skip
+
+        for i, step in enumerate(text, start=1):
+            parameters.get_step(i).get_value().set(step)
+
+        execute_with_assertions(
+            self,
+            parameters,
+            assertions=[
+                (parameters.M01, 8),
+                (parameters.M02, 15),
+                (parameters.M03, 6),
+                (parameters.M04, RealValue(0xFFF7).get()),
+                (parameters.M05, RealValue(0xFFFF).get()),
+                (parameters.M06, RealValue(0xFFF1).get()),
+                (parameters.M07, RealValue(0xFFF9).get()),
+            ],
+        )
+
 
 class TestProgramControl(unittest.TestCase):
     def test_termination(self) -> None:
@@ -469,6 +618,20 @@ class TestProgramControl(unittest.TestCase):
         parameters.STEP06.get_value().set("OUT RO01")
         execute_with_assertions(self, parameters, assertions=[(parameters.RO01, 2)])
 
+    def test_indirect_branch(self) -> None:
+        parameters = CalcParameters()
+        parameters.M01.get_value().set(5.7)
+        parameters.STEP01.get_value().set("IN 1")
+        parameters.STEP02.get_value().set("GTI M01")
+        parameters.STEP03.get_value().set("IN 2")
+        parameters.STEP04.get_value().set("OUT RO01")
+        parameters.STEP05.get_value().set("OUT RO02")
+        parameters.STEP06.get_value().set("IN 0")
+        parameters.STEP07.get_value().set("STM M02")
+        parameters.STEP08.get_value().set("GTI M02")
+        calc = execute_with_assertions(self, parameters, assertions=[(parameters.RO01, 0), (parameters.RO02, 1)])
+        self.assertEqual(calc.errors, [(8, CalcError.INVALID_GOTO)])
+
     def test_cond_branch(self) -> None:  # noqa: PLR0915
         parameters = CalcParameters()
         parameters.STEP01.get_value().set("IN -1")
@@ -632,6 +795,47 @@ class TestBasicRules(unittest.TestCase):
         calc = execute_with_assertions(self, parameters, assertions=[])
         self.assertEqual(len(calc.stack), 0)
 
+        parameters = CalcParameters()
+        parameters.STEP01.get_value().set("IN 111")
+        parameters.STEP02.get_value().set("DUP")
+        parameters.STEP03.get_value().set("ADD")
+        parameters.STEP04.get_value().set("STM M01")
+        calc = execute_with_assertions(self, parameters, assertions=[(parameters.M01, 222)])
+        self.assertEqual(len(calc.stack), 1)
+
+        # Overflow discards the bottom of the stack, underflow pops zero
+        parameters = CalcParameters()
+
+        for i in range(1, 18):
+            parameters.get_step(i).get_value().set(f"IN {i}")
+
+        parameters.STEP18.get_value().set("ADD 16")
+        parameters.STEP19.get_value().set("STM M01")
+        parameters.STEP20.get_value().set("ADD")
+        parameters.STEP21.get_value().set("STM M02")
+        calc = execute_with_assertions(self, parameters, assertions=[(parameters.M01, 152), (parameters.M02, 152)])
+        self.assertEqual(list(calc.stack), [(152, 20)])
+        self.assertEqual(calc.errors, [(17, CalcError.STACK_OVERFLOW), (20, CalcError.STACK_UNDERFLOW)])
+
+    def test_precision(self) -> None:
+        # Fast mode keeps float64 results, controller precision rounds every result to half precision
+        for precision, expected in ((Precision.CONTROLLER, RealValue(1 / 3).get()), (Precision.FAST, 1 / 3)):
+            for compiled in (False, True):
+                parameters = CalcParameters()
+                parameters.STEP01.get_value().set("IN 1")
+                parameters.STEP02.get_value().set("IN 3")
+                parameters.STEP03.get_value().set("DIV")
+                parameters.STEP04.get_value().set("STM M01")
+                calc = Calc("TEST", "TEST", parameters)
+
+                if compiled:
+                    calc.compile()
+
+                emulator = Emulator(precision=precision)
+                emulator.add_block(calc)
+                emulator.execute()
+                self.assertEqual(parameters.M01.get_value().get(), expected)
+
     def test_comments(self) -> None:
         parameters = CalcParameters()
         parameters.STEP01.get_value().set("IN 111; IN 222")
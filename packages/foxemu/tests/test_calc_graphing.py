@@ -1,9 +1,13 @@
 import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
+from foxdata.models import Block, Data
 from foxemu.blocks.calc.block import Calc
 from foxemu.blocks.calc.graphing import generate_dot
 from foxemu.blocks.calc.parameters import CalcParameters
-from pydot import Dot
+from foxemu.blocks.calc.precompute import generate_graphs, initialise_graphs
 
 if __name__ == "__main__":
     unittest.main()
@@ -60,7 +64,64 @@ class TestArithmetic(unittest.TestCase):
         parameters.STEP46.get_value().set("OUT RO03")
         parameters.STEP47.get_value().set("END")
         calc = Calc("TEST", "TEST", parameters)
+        dot = generate_dot(calc)
 
-        match generate_dot(calc):
-            case Dot() as dot:
-                print(dot.to_string())
+        self.assertTrue(dot.startswith('graph "TEST__TEST__calc" {'))
+        self.assertIn('"Step 1"[label="IN RI01\\nOUT RO02\\nIN BI01\\nOR BI02"', dot)
+        self.assertIn('"Step 5"[label="!= 0?", shape="diamond"', dot)
+        self.assertIn('Start -- "Step 1"[label="", dir="forward", fontname="Arial"];', dot)
+        self.assertIn('"Step 5" -- "Step 8"[label="true", dir="forward", fontname="Arial"];', dot)
+        self.assertIn('"Step 29" -- End[label="", dir="forward", fontname="Arial"];', dot)
+
+
+class TestPrecompute(unittest.TestCase):
+    def test_generate_graphs(self) -> None:
+        def block(name: str, block_type: str, **config: str) -> Block:
+            config = {"NAME": f"TEST:{name}", "TYPE": block_type, **config}
+            return Block(config, {"compound": "TEST", "name": name}, set())
+
+        good = block("GOOD", "CALC", STEP01="IN RI01", STEP02="OUT RO01", STEP03="END")
+        bad = block("BAD", "CALC", STEP01="IN RI01", STEP02="GTI M01")
+        other = block("OTHER", "AIN")
+        graphs = generate_graphs([good, bad, other], processes=1)
+
+        self.assertEqual(len(graphs), 2)
+        self.assertIn(good, graphs)
+        self.assertNotIn(other, graphs)
+        self.assertEqual(graphs.get_dot(good), generate_dot(Calc.from_block(good)))
+        self.assertIsNone(graphs.get_dot(other))
+
+        with self.assertRaises(RuntimeError):
+            graphs.get_dot(bad)
+
+        # Bugs in graphing propagate rather than being cached as errors in the block's program
+        with (
+            patch("foxemu.blocks.calc.precompute.generate_dot_from_model", side_effect=TypeError),
+            self.assertRaises(TypeError),
+        ):
+            generate_graphs([good], processes=1)
+
+    def test_changed_program(self) -> None:
+        # Block hashes only cover compound and name, so a changed program must not be served the old graph
+        def block(*steps: str) -> Block:
+            config = {"NAME": "TEST:CHANGED", "TYPE": "CALC"} | {
+                f"STEP{i:02d}": step for i, step in enumerate(steps, 1)
+            }
+            return Block(config, {"compound": "TEST", "name": "CHANGED"}, set())
+
+        original = block("IN RI01", "OUT RO01")
+        changed = block("IN RI01", "BIT 4", "IN 0", "OUT RO01")
+        graphs = generate_graphs([original], processes=1)
+        data = Data((changed,), {hash(changed): changed}, {})
+
+        self.assertIn(original, graphs)
+        self.assertNotIn(changed, graphs)
+        self.assertIsNone(graphs.get_dot(changed))
+        self.assertFalse(graphs.covers(data))
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "graphs.pickle"
+            initialise_graphs(path, Data((original,), {hash(original): original}, {}))
+            graphs = initialise_graphs(path, data)
+
+        self.assertEqual(graphs.get_dot(changed), generate_dot(Calc.from_block(changed)))
@@ -0,0 +1,76 @@
+import unittest
+
+from foxemu.blocks.calc.block import Calc
+from foxemu.blocks.calc.compiler import compile_program
+from foxemu.blocks.calc.errors import CalcError
+from foxemu.blocks.calc.operands import NamedOperand
+from foxemu.blocks.calc.operations import OPERATIONS
+from foxemu.blocks.calc.parameters import CalcParameters
+from foxemu.blocks.calc.program import Step, parse_program
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestProgram(unittest.TestCase):
+    def test_parse(self) -> None:
+        text = ("IN RI01 ;comment", "", "ADD 2", "TEST", "OUT RX01", "; comment only", "END", *[""] * 43)
+        program = parse_program(text)
+
+        self.assertEqual(
+            program.steps,
+            {
+                1: Step("IN", (NamedOperand("RI", "01", inverted=False),)),
+                3: Step("ADD", (2,)),
+                7: Step("END", ()),
+            },
+        )
+        self.assertEqual(program.errors, ((4, CalcError.INVALID_OPCODE), (5, CalcError.INVALID_OPERAND)))
+
+    def test_matches_calc(self) -> None:
+        parameters = CalcParameters()
+        text = ("IN RI01", "BIT 4", "GTO 5", "IN ~BI01", "OUT BO01", "MAX 3", "DUP", "END")
+
+        for i, step in enumerate(text, start=1):
+            parameters.get_step(i).get_value().set(step)
+
+        calc = Calc("TEST", "TEST", parameters)
+        self.assertEqual(parse_program((*text, *[""] * 42)).steps, calc.steps)
+
+    def test_cache(self) -> None:
+        text = ("IN 1", "OUT RO01", *[""] * 48)
+        self.assertIs(parse_program(text), parse_program(tuple(text)))
+
+    def test_shared(self) -> None:
+        text = ("IN RI01", "IN 2", "MUL", "OUT RO01", "END")
+        calcs = []
+
+        for name, value in (("A", 1.5), ("B", 4)):
+            parameters = CalcParameters()
+            parameters.RI01.get_value().set(value)
+
+            for i, step in enumerate(text, start=1):
+                parameters.get_step(i).get_value().set(step)
+
+            calcs.append(Calc("TEST", name, parameters))
+
+        # Blocks with identical programs share parsed steps and compiled code, bound to their own parameters
+        a, b = calcs
+        self.assertIs(a.steps, b.steps)
+        self.assertIs(compile_program(a.steps), compile_program(dict(b.steps)))
+
+        for calc in calcs:
+            calc.compile()
+            calc.execute()
+
+        self.assertEqual(a.parameters.RO01.get_value().get(), 3)
+        self.assertEqual(b.parameters.RO01.get_value().get(), 8)
+
+    def test_registry(self) -> None:
+        # Aliases share the operation and operand rules of the opcode they alias
+        self.assertIs(OPERATIONS["BIF"].operation, OPERATIONS["BIZ"].operation)
+        self.assertIs(OPERATIONS["SSF"].verifier, OPERATIONS["SSZ"].verifier)
+        self.assertEqual(OPERATIONS["BIF"].opcode, "BIF")
+        self.assertNotIn("math", OPERATIONS)
+        self.assertTrue(OPERATIONS["GTI"].verify_operands((NamedOperand("M", "01", inverted=False),)))
+        self.assertFalse(OPERATIONS["GTI"].verify_operands((NamedOperand("M", "99", inverted=False),)))
@@ -0,0 +1,325 @@
+import unittest
+from collections.abc import Iterator, Sequence
+
+from foxdata.models import Block, Data
+from foxemu.blocks import EmulatedBlock
+from foxemu.blocks.calc.block import Calc
+from foxemu.blocks.calc.parameters import CalcParameters
+from foxemu.blocks.passthrough import PassThrough
+from foxemu.emulator import Emulator, Stop
+from foxemu.signaling import (
+    BoolValue,
+    Connection,
+    Input,
+    Output,
+    Parameter,
+    Precision,
+    RealValue,
+    Signal,
+    UnparsedConnection,
+)
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+def create_calc(name: str, text: tuple[str, ...], **connections: str) -> Calc:
+    parameters = CalcParameters()
+
+    for i, step in enumerate(text, start=1):
+        parameters.get_step(i).get_value().set(step)
+
+    # Connections are given as `parameter="BLOCK.PARAMETER"` within the same compound
+    for parameter, source in connections.items():
+        block, source_parameter = source.split(".")
+        setattr(parameters, parameter, Input(UnparsedConnection("TEST", block, source_parameter)))
+
+    return Calc("TEST", name, parameters)
+
+
+class TestScheduling(unittest.TestCase):
+    def test_chain(self) -> None:
+        # Blocks are added in the reverse order of the chain, but execute in the order of their connections
+        emulator = Emulator()
+        emulator.add_block(create_calc("C", ("IN RI01", "IN 1", "ADD", "OUT RO01"), RI01="B.RO01"))
+        emulator.add_block(create_calc("B", ("IN RI01", "IN 1", "ADD", "OUT RO01"), RI01="A.RO01"))
+        emulator.add_block(create_calc("A", ("IN 1", "OUT RO01")))
+        emulator.execute()
+
+        self.assertEqual([block.name for block in emulator.get_schedule()], ["A", "B", "C"])
+        self.assertEqual(emulator.compounds["TEST"]["C"].parameters.RO01.get_value().get(), 3)
+
+    def test_feedback_loop(self) -> None:
+        emulator = Emulator()
+        emulator.add_block(create_calc("D", ("IN RI01", "OUT RO01"), RI01="C.RO01"))
+        emulator.add_block(create_calc("C", ("IN RI01", "ADD RI02", "OUT RO01"), RI01="B.RO01", RI02="A.RO01"))
+        emulator.add_block(create_calc("B", ("IN RI01", "OUT RO01"), RI01="C.RO01"))
+        emulator.add_block(create_calc("A", ("IN 1", "OUT RO01")))
+
+        # Loops execute as a group in the order they were added, after their inputs and before their outputs
+        self.assertEqual([block.name for block in emulator.get_schedule()], ["A", "C", "B", "D"])
+
+        for cycle in range(1, 4):
+            emulator.execute()
+            self.assertEqual(emulator.compounds["TEST"]["D"].parameters.RO01.get_value().get(), cycle)
+
+    def test_invalidation(self) -> None:
+        emulator = Emulator()
+        emulator.add_block(create_calc("B", ("IN RI01", "OUT RO01"), RI01="A.RO01"))
+        emulator.add_block(create_calc("A", ("IN 1", "OUT RO01")))
+        schedule = emulator.get_schedule()
+        self.assertIs(emulator.get_schedule(), schedule)
+
+        emulator.add_block(create_calc("C", ("IN RI01", "OUT RO01"), RI01="B.RO01"))
+        self.assertEqual([block.name for block in emulator.get_schedule()], ["A", "B", "C"])
+
+        emulator.remove_block("TEST", "C")
+        self.assertEqual([block.name for block in emulator.get_schedule()], ["A", "B"])
+
+        with self.assertRaises(RuntimeError):
+            emulator.remove_block("TEST", "C")
+
+
+class TestConnections(unittest.TestCase):
+    def test_resolution(self) -> None:
+        emulator = Emulator()
+        emulator.add_block(create_calc("C", ("IN RI01", "OUT RO01"), RI01="B.RI01"))
+        emulator.add_block(create_calc("B", ("IN RI01", "OUT RO01"), RI01="A.RO01"))
+        emulator.add_block(create_calc("A", ("IN RI01", "OUT RO01")))
+        a, c = emulator.compounds["TEST"]["A"], emulator.compounds["TEST"]["C"]
+        a.parameters.RI01.get_value().set(5)
+        emulator.execute()
+
+        # Connections to connected parameters resolve to the parameter holding the value
+        connection = c.parameters.RI01.inner
+        self.assertIsInstance(connection, Connection)
+        self.assertIs(connection.source, a.parameters.RO01)
+        self.assertEqual(c.parameters.RO01.get_value().get(), 5)
+
+        # Values assigned to the source after resolution are still read through the connection
+        a.parameters.RI01.get_value().set(7)
+        emulator.execute()
+        self.assertEqual(c.parameters.RO01.get_value().get(), 7)
+
+    def test_signal(self) -> None:
+        emulator = Emulator()
+        emulator.add_block(create_calc("B", ("IN RI01", "OUT RO01"), RI01="A.RO01"))
+        emulator.add_block(create_calc("A", ("IN 1", "OUT RO01")))
+        a, b = emulator.compounds["TEST"]["A"], emulator.compounds["TEST"]["B"]
+        a.parameters.RO01.inner = Signal(RealValue(0))
+        emulator.execute()
+
+        # Connections to a parameter holding a signal read the signal's value
+        self.assertIs(b.parameters.RI01.inner.source, a.parameters.RO01)
+        self.assertEqual(b.parameters.RI01.get_value().get(), 1)
+        self.assertEqual(b.parameters.RO01.get_value().get(), 1)
+
+    def test_invalid(self) -> None:
+        emulator = Emulator()
+        emulator.add_block(create_calc("B", ("IN RI01", "OUT RO01"), RI01="A.XYZ"))
+        emulator.add_block(create_calc("A", ("IN 1", "OUT RO01")))
+
+        with self.assertRaises(RuntimeError):
+            emulator.get_schedule()
+
+        emulator = Emulator()
+        emulator.add_block(create_calc("B", ("IN RI01", "OUT RO01"), RI01="A.RI01"))
+        emulator.add_block(create_calc("A", ("IN RI01", "OUT RO01"), RI01="B.RI01"))
+
+        with self.assertRaises(RuntimeError):
+            emulator.get_schedule()
+
+
+class TestMultiRate(unittest.TestCase):
+    def test_periods(self) -> None:
+        # With a BPC of 0.5s, blocks with periods of 0.5s, 1s and 10s execute every 1, 2 and 20 ticks
+        emulator = Emulator(bpc=0.5)
+        counters = {}
+
+        for name, period, phase in (("A", 1, 0), ("B", 2, 1), ("C", 4, 3)):
+            counters[name] = create_calc(name, ("IN M01", "IN 1", "ADD", "STM M01"))
+            counters[name].parameters.PERIOD.get_value().set(period)
+            counters[name].parameters.PHASE.get_value().set(phase)
+            emulator.add_block(counters[name])
+
+        def counts() -> list[float]:
+            return [counter.parameters.M01.get_value().get() for counter in counters.values()]
+
+        emulator.advance()
+        self.assertEqual(counts(), [1, 0, 0])
+
+        emulator.advance(3)
+        self.assertEqual(counts(), [4, 2, 1])
+
+        emulator.advance(36)
+        self.assertEqual(counts(), [40, 20, 2])
+        self.assertEqual(emulator.time, 20)
+
+    def test_timers(self) -> None:
+        # Timers follow simulated time, so an hour of plant time takes moments to emulate
+        emulator = Emulator(precision=Precision.FAST, bpc=0.5)
+        calc = create_calc(
+            "TIMER", ("IN BI01", "DON 1800", "OUT BO01", "IN BI01", "OSP M01", "OUT BO02", "TIM", "STM M02")
+        )
+        calc.parameters.PERIOD.get_value().set(2)
+        calc.parameters.BI01.get_value().set(True)
+        calc.parameters.M01.get_value().set(2)
+        emulator.add_block(calc)
+
+        def outputs() -> list[bool]:
+            return [calc.parameters.BO01.get_value().get(), calc.parameters.BO02.get_value().get()]
+
+        # Executing every 1s at 0s and 1s, then until 1799s
+        emulator.advance(4)
+        self.assertEqual(outputs(), [False, True])
+        emulator.advance(3596)
+        self.assertEqual(outputs(), [False, False])
+        emulator.advance(2)
+        self.assertEqual(outputs(), [True, False])
+
+        emulator.advance(3598)
+        self.assertEqual(emulator.time, 3600)
+        self.assertEqual(calc.parameters.M02.get_value().get(), 3599)
+
+        # Time of day wraps around at midnight
+        emulator.tick = 2 * 86399
+        emulator.advance(2)
+        self.assertEqual(calc.parameters.M02.get_value().get(), 86399)
+        emulator.advance(2)
+        self.assertEqual(calc.parameters.M02.get_value().get(), 0)
+
+    def test_dependency_order(self) -> None:
+        # Blocks due on the same tick still execute in dependency order
+        emulator = Emulator()
+        emulator.add_block(create_calc("B", ("IN RI01", "OUT RO01"), RI01="A.RO01"))
+        emulator.add_block(create_calc("A", ("IN 1", "OUT RO01")))
+        emulator.compounds["TEST"]["A"].parameters.PERIOD.get_value().set(2)
+        emulator.advance()
+
+        self.assertEqual(emulator.compounds["TEST"]["B"].parameters.RO01.get_value().get(), 1)
+
+
+class Countdown(EmulatedBlock):
+    """Turns its output on after a number of executions, counted in memory rather than a parameter."""
+
+    def __init__(self, executions: int) -> None:
+        super().__init__("TEST", "COUNTDOWN")
+        self.remaining = executions
+        self.output = Output(BoolValue(value=False))
+
+    def parameters_iter(self) -> Iterator[Parameter]:
+        yield self.output
+
+    def get_parameter(self, key: str) -> Parameter | None:
+        return self.output if key == "BO01" else None
+
+    def get_memory(self) -> tuple[float, ...]:
+        return (self.remaining,)
+
+    def set_memory(self, memory: Sequence[float]) -> None:
+        self.remaining = int(memory[0])
+
+    def execute(self) -> None:
+        self.remaining = max(0, self.remaining - 1)
+        self.output.get_value().set(self.remaining == 0)
+
+
+class TestRun(unittest.TestCase):
+    def test_convergence(self) -> None:
+        # Values propagate along the chain in a single cycle, the next cycle confirms nothing changed
+        emulator = Emulator()
+        emulator.add_block(create_calc("B", ("IN RI01", "IN 1", "ADD", "OUT RO01"), RI01="A.RO01"))
+        emulator.add_block(create_calc("A", ("IN 1", "OUT RO01")))
+        result = emulator.run(100)
+
+        self.assertTrue(result.converged)
+        self.assertEqual(result.cycles, 2)
+        self.assertEqual(emulator.compounds["TEST"]["B"].parameters.RO01.get_value().get(), 2)
+
+    def test_stop(self) -> None:
+        # Changing memory prevents convergence even though outputs stay the same
+        emulator = Emulator()
+        emulator.add_block(counter := create_calc("A", ("IN M01", "IN 1", "ADD", "STM M01")))
+        result = emulator.run(10)
+
+        self.assertEqual(result.stop, Stop.CYCLES)
+        self.assertEqual(result.cycles, 10)
+        self.assertEqual(counter.parameters.M01.get_value().get(), 10)
+
+        target = 15
+        result = emulator.run(100, until=lambda _: counter.parameters.M01.get_value().get() >= target)
+        self.assertEqual(result.stop, Stop.UNTIL)
+        self.assertEqual(result.cycles, 5)
+
+    def test_memory(self) -> None:
+        # Outputs stay the same while memory counts down, which mustn't be taken for a fixed point
+        emulator = Emulator()
+        emulator.add_block(countdown := Countdown(5))
+        result = emulator.run(100)
+
+        self.assertTrue(result.converged)
+        self.assertEqual(result.cycles, 6)
+        self.assertTrue(countdown.output.get_value().get())
+
+    def test_timers(self) -> None:
+        # A delay in cycles keeps the run going until it elapses, a delay in seconds waits on time that doesn't pass
+        emulator = Emulator()
+        emulator.add_block(cycles := create_calc("CYCLES", ("IN BI01", "DON -5", "OUT BO01")))
+        cycles.parameters.BI01.get_value().set(True)
+        result = emulator.run(100)
+
+        self.assertTrue(result.converged)
+        self.assertEqual(result.cycles, 7)
+        self.assertTrue(cycles.parameters.BO01.get_value().get())
+
+        emulator.add_block(seconds := create_calc("SECONDS", ("IN BI01", "DON 5", "OUT BO01")))
+        seconds.parameters.BI01.get_value().set(True)
+        result = emulator.run(100)
+
+        self.assertTrue(result.converged)
+        self.assertEqual(result.cycles, 2)
+        self.assertFalse(seconds.parameters.BO01.get_value().get())
+
+
+def create_model(cp: str, compound: str, name: str, **config: str) -> Block:
+    return Block(config, {"compound": compound, "name": name, "cp": cp}, set())
+
+
+class TestFromData(unittest.TestCase):
+    def test_from_data(self) -> None:
+        blocks = (
+            create_model("CP1", "C1", "A", TYPE="CALC", RI01=":PID.OUT", RI02="C2:B.RO01", STEP01="IN RI01"),
+            create_model("CP1", "C1", "PID", TYPE="PIDA", OUT="12.5", MEAS="C1:A.RO01"),
+            create_model("CP1", "C1", "D", TYPE="CALC", RI01="C3:MISSING.RO01"),
+            create_model("CP2", "C2", "B", TYPE="CALC", RO01="7", RI01="C1:A.RO01"),
+            create_model("CP2", "C2", "E", TYPE="CALC"),
+        )
+        data = Data(blocks, {hash(block): block for block in blocks}, {})
+
+        emulator = Emulator.from_data(data, cp="CP1", processes=1)
+        emulator.run(2)
+
+        # Unsupported and external blocks are stand-ins, external blocks don't keep their own connections
+        a, pid, b = emulator.compounds["C1"]["A"], emulator.compounds["C1"]["PID"], emulator.compounds["C2"]["B"]
+        self.assertIsInstance(a, Calc)
+        self.assertIsInstance(pid, PassThrough)
+        self.assertIsInstance(b, PassThrough)
+        self.assertIsInstance(emulator.compounds["C3"]["MISSING"], PassThrough)
+        self.assertNotIn("E", emulator.compounds["C2"])
+
+        self.assertEqual(a.parameters.RI01.get_value().get(), 12.5)
+        self.assertEqual(a.parameters.RI02.get_value().get(), 7)
+        self.assertEqual(pid.get_parameter("MEAS").get_value().get(), a.parameters.RO01.get_value().get())
+        self.assertEqual(b.get_parameter("RI01").get_value().get(), "C1:A.RO01")
+
+        emulator = Emulator.from_data(data, compounds=["C2"], processes=1, compiled=True)
+        self.assertEqual(set(emulator.compounds), {"C1", "C2"})
+        self.assertIsNotNone(emulator.compounds["C2"]["E"].compiled)
+
+        # Stored parameters are moved into storage shared by every CALC block
+        stored = Emulator.from_data(data, cp="CP1", processes=1, stored=True)
+        stored.run(2)
+        self.assertEqual(len(stored.storage), 2)
+        self.assertEqual(
+            stored.compounds["C1"]["A"].parameters.RO01.get_value().get(), a.parameters.RO01.get_value().get()
+        )
@@ -0,0 +1,85 @@
+import unittest
+
+from foxdata.models import Block, Data
+from foxemu.emulator import Emulator
+from foxemu.partition import PartitionedEmulator, create_partitions
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+def create_model(compound: str, name: str, **config: str) -> Block:
+    return Block({"TYPE": "CALC", **config}, {"compound": compound, "name": name, "cp": "CP1"}, set())
+
+
+def create_steps(*text: str) -> dict[str, str]:
+    return {f"STEP{i:02}": step for i, step in enumerate(text, start=1)}
+
+
+def create_data() -> Data:
+    blocks = (
+        # Chain of compounds, where each block counts up and adds its input
+        create_model(
+            "C3", "A", RI01="C2:A.RO01", **create_steps("IN M01", "IN 1", "ADD", "STM M01", "ADD RI01", "OUT RO01")
+        ),
+        create_model(
+            "C2", "A", RI01="C1:A.RO01", **create_steps("IN M01", "IN 1", "ADD", "STM M01", "ADD RI01", "OUT RO01")
+        ),
+        create_model("C1", "A", **create_steps("IN M01", "IN 1", "ADD", "STM M01", "OUT RO01", "IN ~BI01", "OUT BO01")),
+        # Compounds in a loop, which also read from the chain and an external block
+        create_model(
+            "C4", "A", RI01="C5:A.RO01", BI01="C1:A.BO01", **create_steps("IN RI01", "IN 1", "ADD", "OUT RO01")
+        ),
+        create_model(
+            "C5",
+            "A",
+            RI01="C4:A.RO01",
+            RI02="C3:A.RO01",
+            RI03="C9:MISSING.RO01",
+            **create_steps("IN RI01", "ADD RI02", "ADD RI03", "OUT RO01", "IN BI01", "OUT BO01"),
+            BI01="C4:A.BI01",
+        ),
+        # Independent compound
+        create_model("C6", "A", **create_steps("IN M01", "IN 2", "ADD", "STM M01", "OUT RO01")),
+    )
+    return Data(blocks, {hash(block): block for block in blocks}, {})
+
+
+class TestPartition(unittest.TestCase):
+    def test_partitions(self) -> None:
+        data = create_data()
+        workers, levels, slots, partitions = create_partitions(data, list(data.blocks), 3)
+
+        # Compounds in a loop share a worker and level, levels follow the chain
+        self.assertEqual(len(partitions), 3)
+        self.assertEqual(workers["C4"], workers["C5"])
+        self.assertEqual([levels[compound] for compound in ("C1", "C2", "C3", "C4", "C5", "C6")], [0, 1, 2, 3, 3, 0])
+
+        # Only values connected between workers are exchanged, by the worker of the source compound
+        for worker, (_, imports, exports) in enumerate(partitions):
+            self.assertTrue(all(workers[slots[i].key[0]] != worker for i in imports))
+            self.assertTrue(all(workers[slots[i].key[0]] == worker for i in exports))
+
+    def test_execution(self) -> None:
+        data = create_data()
+        names = ("C1:A.RO01", "C1:A.BO01", "C2:A.RO01", "C3:A.RO01", "C4:A.RO01", "C5:A.RO01", "C5:A.BO01", "C6:A.RO01")
+        emulator = Emulator.from_data(data, processes=1)
+        emulator.run(5, converge=False)
+
+        # Every block sees the same values as in a single emulator
+        with PartitionedEmulator(data, processes=3) as partitioned:
+            partitioned.run(4)
+            partitioned.execute()
+
+            for name in names:
+                expected = emulator.compounds[name[:2]]["A"].get_parameter(name[5:]).get_value().get()
+                self.assertEqual(partitioned.get_value(name), expected, name)
+
+            with self.assertRaises(RuntimeError):
+                partitioned.get_value("C9:MISSING.RO01")
+
+            with self.assertRaises(RuntimeError):
+                partitioned.get_value("C1:A.XYZ")
+
+            # Workers keep running after failing to get a value
+            self.assertEqual(partitioned.get_value("C6:A.RO01"), 10)
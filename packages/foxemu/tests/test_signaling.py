@@ -0,0 +1,71 @@
+import math
+import unittest
+
+import numpy as np
+from foxemu.signaling import (
+    REAL_LIMIT,
+    IntegerValue,
+    LongValue,
+    Precision,
+    RealValue,
+    ShortValue,
+    emulate_real_precision,
+)
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestPrecision(unittest.TestCase):
+    def test_scalar(self) -> None:
+        values = [0.0, -0.0, 1 / 3, -1 / 3, 1e-8, 6e-8, 123.456, 65504.0, 65519.9, -65520.0, 1e20, 10**40, True, 7]
+        values.extend(np.random.default_rng(0).normal(scale=1000, size=1000).tolist())
+
+        # Rounding must match NumPy half precision, saturating at the limits of a real value
+        for value in values:
+            with np.errstate(over="ignore"):
+                expected = float(np.float16(value))
+
+            if math.isinf(expected):
+                expected = math.copysign(REAL_LIMIT, expected)
+
+            self.assertEqual(emulate_real_precision(value), expected)
+
+        self.assertEqual(emulate_real_precision(math.inf), REAL_LIMIT)
+        self.assertEqual(emulate_real_precision(-math.inf), -REAL_LIMIT)
+        self.assertEqual(emulate_real_precision(math.nan), REAL_LIMIT)
+
+    def test_array(self) -> None:
+        values = np.concatenate(
+            (
+                np.random.default_rng(0).normal(scale=1000, size=1000),
+                [0.0, 65519.9, -65520.0, 1e20, math.inf, -math.inf, math.nan],
+            ),
+        )
+
+        for precision in Precision:
+            rounded = precision.round_array(values)
+            np.testing.assert_array_equal(rounded, [precision.round(value) for value in values.tolist()])
+
+    def test_real_value(self) -> None:
+        self.assertEqual(RealValue(1 / 3).get(), float(np.float16(1 / 3)))
+        self.assertEqual(RealValue(1 / 3, Precision.FAST).get(), 1 / 3)
+
+        # Arithmetic with other values or numbers rounds the result to the same precision
+        self.assertEqual((RealValue(1.5) + RealValue(2.25)).get(), 3.75)
+        self.assertEqual((RealValue(1 / 3, Precision.FAST) * 3).get(), 1)
+        self.assertEqual((RealValue(1) / IntegerValue(3)).get(), float(np.float16(1 / 3)))
+
+    def test_integer_values(self) -> None:
+        # Arithmetic with other values or numbers keeps the type of the left operand, clamped to its range
+        self.assertEqual((IntegerValue(2) + IntegerValue(3)).get(), 5)
+        self.assertEqual((IntegerValue(7) - RealValue(2)).get(), 5)
+        self.assertEqual((IntegerValue(30000) * 2).get(), 32767)
+        self.assertEqual((ShortValue(100) + ShortValue(100)).get(), 127)
+        self.assertEqual((LongValue(7) / IntegerValue(2)).get(), 3)
+
+        for value in (IntegerValue(1) + 1, ShortValue(1) - ShortValue(1), LongValue(1) * RealValue(2)):
+            self.assertIsInstance(value, IntegerValue)
+
+        self.assertIsInstance(ShortValue(1) + 1, ShortValue)
+        self.assertIsInstance(LongValue(1) + 1, LongValue)
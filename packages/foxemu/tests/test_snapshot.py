@@ -0,0 +1,118 @@
+import unittest
+
+from foxemu.blocks.calc.block import Calc
+from foxemu.blocks.calc.parameters import CalcParameters, CalcParametersView
+from foxemu.emulator import Emulator
+from foxemu.signaling import Input, UnparsedConnection
+from foxemu.snapshot import Checkpoints
+from foxemu.storage import ParameterStorage
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+def create_emulator(*, stored: bool) -> Emulator:
+    emulator = Emulator()
+    emulator.storage = ParameterStorage(CalcParameters) if stored else None
+
+    # Counter with a random value, and a block connected to the counter
+    counter = CalcParameters()
+    follower = CalcParameters()
+    follower.RI01 = Input(UnparsedConnection("TEST", "COUNTER", "RO01"))
+
+    for parameters, text in (
+        (counter, ("IN M01", "IN 1", "ADD", "STM M01", "OUT RO01", "RAND", "STM M02")),
+        (follower, ("IN RI01", "IN 2", "MUL", "OUT RO01")),
+    ):
+        for i, step in enumerate(text, start=1):
+            parameters.get_step(i).get_value().set(step)
+
+    for name, parameters in (("COUNTER", counter), ("FOLLOWER", follower)):
+        if emulator.storage is None:
+            emulator.add_block(Calc("TEST", name, parameters))
+        else:
+            emulator.add_block(Calc("TEST", name, CalcParametersView.create(emulator.storage, parameters)))
+
+    return emulator
+
+
+def get_state(emulator: Emulator) -> tuple[float, ...]:
+    counter, follower = emulator.compounds["TEST"]["COUNTER"], emulator.compounds["TEST"]["FOLLOWER"]
+    return (
+        counter.parameters.M01.get_value().get(),
+        counter.parameters.M02.get_value().get(),
+        counter.seed,
+        follower.parameters.RO01.get_value().get(),
+        emulator.tick,
+    )
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_restore(self) -> None:
+        for stored in (False, True):
+            emulator = create_emulator(stored=stored)
+            emulator.advance(3)
+            snapshot = emulator.snapshot()
+            state = get_state(emulator)
+
+            emulator.advance(5)
+            later = get_state(emulator)
+            self.assertNotEqual(later, state)
+
+            # Restoring rewinds parameters, random seed and time, after which execution repeats exactly
+            emulator.restore(snapshot)
+            self.assertEqual(get_state(emulator), state)
+            emulator.advance(5)
+            self.assertEqual(get_state(emulator), later)
+
+            emulator.add_block(Calc("TEST", "OTHER", CalcParameters()))
+
+            with self.assertRaises(RuntimeError):
+                emulator.restore(snapshot)
+
+    def test_checkpoints(self) -> None:
+        emulator = create_emulator(stored=False)
+        checkpoints = Checkpoints(emulator, capacity=10, interval=4)
+        states = []
+
+        for _ in range(25):
+            emulator.advance()
+            checkpoints.save()
+            states.append(get_state(emulator))
+
+        # Only the latest checkpoints are kept, each can be restored
+        self.assertEqual(len(checkpoints), 10)
+
+        for n in (0, 1, 4, 2):
+            states = states[: len(states) - n]
+            checkpoints.rewind(n)
+            self.assertEqual(get_state(emulator), states[-1])
+
+        with self.assertRaises(RuntimeError):
+            checkpoints.rewind(len(checkpoints))
+
+        # Saving after rewinding continues from the restored state
+        emulator.advance()
+        checkpoints.save()
+        checkpoints.rewind(1)
+        self.assertEqual(get_state(emulator), states[-1])
+
+    def test_timers(self) -> None:
+        def create() -> tuple[Emulator, Calc]:
+            parameters = CalcParameters()
+
+            for i, step in enumerate(("IN 1", "DON -5", "OUT BO01"), start=1):
+                parameters.get_step(i).get_value().set(step)
+
+            emulator = Emulator()
+            emulator.add_block(block := Calc("TEST", "TIMER", parameters))
+            return emulator, block
+
+        emulator, block = create()
+        emulator.advance(2)
+        snapshot = emulator.snapshot()
+
+        # Timers keep the delay they're timing, so a block restored into another emulator is fingerprinted the same
+        restored, restored_block = create()
+        restored.get_state_layout().apply(snapshot.state())
+        self.assertEqual(restored_block.get_fingerprint(), block.get_fingerprint())
@@ -0,0 +1,90 @@
+import unittest
+
+from foxemu.blocks.calc.block import Calc
+from foxemu.blocks.calc.parameters import CalcParameters, CalcParametersView
+from foxemu.signaling import Input, Precision, UnparsedConnection
+from foxemu.storage import ParameterStorage
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+def create_parameters(text: tuple[str, ...]) -> CalcParameters:
+    parameters = CalcParameters()
+
+    for i, step in enumerate(text, start=1):
+        parameters.get_step(i).get_value().set(step)
+
+    return parameters
+
+
+class TestStorage(unittest.TestCase):
+    def test_view(self) -> None:
+        storage = ParameterStorage(CalcParameters, 1)
+        parameters = create_parameters(("IN RI01",))
+        parameters.RI01.get_value().set(1.5)
+        parameters.RI02 = Input(UnparsedConnection("TEST", "A", "RO01"))
+        view = CalcParametersView.create(storage, parameters)
+
+        # Values are held in the array, parameters are only created when accessed
+        self.assertEqual(storage.array["RI01"][view.row], 1.5)
+        self.assertEqual(storage.array["STEP01"][view.row], "IN RI01")
+        self.assertNotIn("RI01", vars(view))
+        self.assertEqual(view.RI01.get_value().get(), 1.5)
+        self.assertIn("RI01", vars(view))
+        self.assertIs(view.RI02, parameters.RI02)
+        self.assertIsNone(getattr(view, "XYZ", None))
+        self.assertEqual(view.step_text()[:2], ("IN RI01", ""))
+        self.assertNotIn("STEP01", vars(view))
+
+        # Writes go to the array, including after it grows
+        other = CalcParametersView.create(storage, CalcParameters())
+        self.assertEqual(len(storage), 2)
+        view.RO01.get_value().set(2.5)
+        view.II01.get_value().set(100000)
+        self.assertEqual(storage.array["RO01"].tolist(), [2.5, 0])
+        self.assertEqual(storage.array["II01"][view.row], 32767)
+        self.assertEqual(other.HSCI1.get_value().get(), 100)
+
+        snapshot = storage.snapshot()
+        view.RO01.get_value().set(3)
+        storage.restore(snapshot)
+        self.assertEqual(view.RO01.get_value().get(), 2.5)
+
+    def test_execution(self) -> None:
+        text = (
+            "IN RI01",
+            "IN 3",
+            "DIV",
+            "OUT RO01",
+            "STM M01",
+            "IN II01",
+            "ADD M01",
+            "OUT IO01",
+            "IN ~BI01",
+            "OUT BO01",
+        )
+        storage = ParameterStorage(CalcParameters)
+
+        # Blocks using a view of storage execute the same as blocks holding their own parameters
+        for compiled in (False, True):
+            for precision in Precision:
+                a = Calc("TEST", "A", create_parameters(text))
+                b = Calc("TEST", "B", CalcParametersView.create(storage, create_parameters(text)))
+
+                for block in (a, b):
+                    block.precision = precision
+                    block.parameters.RI01.get_value().set(2)
+                    block.parameters.II01.get_value().set(5)
+
+                    if compiled:
+                        block.compile()
+
+                    block.execute()
+
+                for name in ("RO01", "M01", "IO01", "BO01", "PERROR"):
+                    self.assertEqual(
+                        getattr(a.parameters, name).get_value().get(),
+                        getattr(b.parameters, name).get_value().get(),
+                        (compiled, precision, name),
+                    )
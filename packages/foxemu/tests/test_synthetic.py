@@ -0,0 +1,57 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from foxdata.parsing import generate_data
+from foxdata.synthetic import PlantSpec, generate_dump, write_dumps
+from foxemu.blocks.calc.block import Calc
+from foxemu.emulator import Emulator
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestSynthetic(unittest.TestCase):
+    def test_dumps(self) -> None:
+        spec = PlantSpec(blocks=300, blocks_per_compound=20, compounds_per_cp=5, cross_compound=0.5, seed=1)
+
+        with TemporaryDirectory() as directory:
+            paths = write_dumps(Path(directory), spec, processes=1)
+            data = generate_data(Path(directory).glob("*/*.d"))
+
+        self.assertEqual(len(paths), 3)
+        self.assertEqual(len(data.blocks), spec.blocks + spec.compounds)
+        self.assertEqual({block.meta["cp"] for block in data.blocks}, {path.stem for path in paths})
+        self.assertEqual({block.config["TYPE"] for block in data.blocks}, {"COMPND", *dict(spec.type_mix)})
+
+        # Every connection resolves to a block in the plant, with some referring to other compounds
+        connections = {connection for block in data.blocks for connection in block.connections}
+        self.assertTrue(connections)
+        self.assertTrue(all(connection.source.block_hash in data.index for connection in connections))
+        self.assertTrue(any(connection.source.compound != connection.sink.compound for connection in connections))
+
+        # CALC programs execute without errors
+        emulator = Emulator.from_data(data, processes=1)
+        emulator.advance(10)
+        calcs = [
+            block for blocks in emulator.compounds.values() for block in blocks.values() if isinstance(block, Calc)
+        ]
+        self.assertTrue(calcs)
+        self.assertFalse([block.errors for block in calcs if block.errors])
+
+    def test_deterministic(self) -> None:
+        spec = PlantSpec(blocks=100, seed=2)
+        self.assertEqual(list(generate_dump(spec, 0)), list(generate_dump(spec, 0)))
+        self.assertNotEqual(list(generate_dump(spec, 0)), list(generate_dump(PlantSpec(blocks=100, seed=3), 0)))
+
+    def test_type_mix(self) -> None:
+        spec = PlantSpec(blocks=50, type_mix=(("CALC", 1.0),))
+        types = [
+            line.split("=")[1].strip()
+            for line in "\n".join(generate_dump(spec, 0)).split("\n")
+            if line.startswith("TYPE")
+        ]
+        self.assertEqual(types, ["COMPND", *["CALC"] * 40, "COMPND", *["CALC"] * 10])
+
+        with self.assertRaises(RuntimeError):
+            PlantSpec(blocks=50, type_mix=(("ABC", 1.0),))
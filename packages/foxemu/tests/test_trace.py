@@ -0,0 +1,80 @@
+import csv
+import io
+import unittest
+
+import numpy as np
+from foxemu.blocks.calc.block import Calc
+from foxemu.blocks.calc.parameters import CalcParameters
+from foxemu.emulator import Emulator
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+def create_emulator() -> Emulator:
+    parameters = CalcParameters()
+
+    for i, step in enumerate(("IN M01", "IN 1", "ADD", "STM M01", "OUT RO01", "IN ~BI01", "OUT BO01"), start=1):
+        parameters.get_step(i).get_value().set(step)
+
+    emulator = Emulator()
+    emulator.add_block(Calc("TEST", "COUNTER", parameters))
+    return emulator
+
+
+class TestRecorder(unittest.TestCase):
+    def test_ring(self) -> None:
+        emulator = create_emulator()
+        recorder = emulator.record(["TEST:COUNTER.RO01", "TEST:COUNTER.BO01", "TEST:COUNTER.PERROR"], capacity=3)
+
+        for _ in range(5):
+            emulator.execute()
+
+        # Only the latest samples are kept, oldest first
+        samples, ticks, values = recorder.data()
+        self.assertEqual(len(recorder), 3)
+        self.assertEqual(samples.tolist(), [2, 3, 4])
+        self.assertEqual(ticks.tolist(), [0, 0, 0])
+        self.assertEqual(values.tolist(), [[3, 1, 0], [4, 1, 0], [5, 1, 0]])
+        self.assertEqual(recorder.data(since=4)[2].tolist(), [[5, 1, 0]])
+
+        # Samples are recorded after each tick when advancing, and no more once stopped
+        emulator.advance(2)
+        emulator.stop_recording(recorder)
+        emulator.run(3, converge=False)
+        samples, ticks, values = recorder.data(since=5)
+        self.assertEqual(samples.tolist(), [5, 6])
+        self.assertEqual(ticks.tolist(), [1, 2])
+        self.assertEqual(values[:, 0].tolist(), [6, 7])
+
+    def test_export(self) -> None:
+        emulator = create_emulator()
+        recorder = emulator.record(["TEST:COUNTER.RO01", "TEST:COUNTER.BO01"])
+        emulator.run(4, converge=False)
+
+        file = io.StringIO()
+        recorder.to_csv(file, since=2)
+        rows = list(csv.reader(io.StringIO(file.getvalue())))
+        self.assertEqual(
+            rows,
+            [
+                ["sample", "tick", "TEST:COUNTER.RO01", "TEST:COUNTER.BO01"],
+                ["2", "0", "3.0", "1.0"],
+                ["3", "0", "4.0", "1.0"],
+            ],
+        )
+
+        buffer = io.BytesIO()
+        recorder.to_npz(buffer)
+        buffer.seek(0)
+
+        with np.load(buffer) as archive:
+            self.assertEqual(archive["names"].tolist(), list(recorder.names))
+            self.assertEqual(archive["values"][:, 0].tolist(), [1, 2, 3, 4])
+
+    def test_invalid(self) -> None:
+        emulator = create_emulator()
+
+        for name in ("COUNTER.RO01", "TEST:OTHER.RO01", "TEST:COUNTER.XYZ", "TEST:COUNTER.STEP01"):
+            with self.assertRaises(RuntimeError):
+                emulator.record([name])
@@ -1,7 +1,7 @@
 import gc
 import math
 import subprocess
-from collections.abc import Callable, Generator, Iterable
+from collections.abc import Callable, Generator, Hashable, Iterable, Iterator, Mapping
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Protocol, runtime_checkable
@@ -72,6 +72,185 @@ def filter_map[X, Y](function: Callable[[X], Y | None], iterable: Iterable[X]) -
             yield result
 
 
+def strongly_connected_components[N: Hashable](
+    nodes: Iterable[N],
+    successors: Mapping[N, Iterable[N]],
+) -> list[list[N]]:
+    """
+    Find strongly connected components of a directed graph using an iterative form of Tarjan's algorithm.
+
+    Components are returned in reverse topological order, ie. a component is listed before any component
+    with an edge into it.
+    """
+    index: dict[N, int] = {}
+    low: dict[N, int] = {}
+    stack: list[N] = []
+    on_stack: set[N] = set()
+    work: list[tuple[N, Iterator[N]]] = []
+    components: list[list[N]] = []
+
+    def visit(node: N) -> None:
+        index[node] = low[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        work.append((node, iter(successors.get(node, ()))))
+
+    for root in nodes:
+        if root not in index:
+            visit(root)
+
+        while work:
+            node, children = work[-1]
+
+            for child in children:
+                if child not in index:
+                    # Descend into unvisited child, resuming iteration over siblings afterwards
+                    visit(child)
+                    break
+
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+                if low[node] == index[node]:
+                    components.append(_pop_component(node, stack, on_stack))
+
+    return components
+
+
+def _pop_component[N: Hashable](node: N, stack: list[N], on_stack: set[N]) -> list[N]:
+    """Pop members of a strongly connected component from the stack, down to and including its root node."""
+    component = []
+
+    while (member := stack.pop()) != node:
+        on_stack.discard(member)
+        component.append(member)
+
+    on_stack.discard(node)
+    component.append(node)
+    return component
+
+
+def connected_components[N: Hashable](nodes: Iterable[N], neighbours: Mapping[N, Iterable[N]]) -> list[list[N]]:
+    """Find connected components of an undirected graph, neighbours must be given in both directions."""
+    seen: set[N] = set()
+    components: list[list[N]] = []
+
+    for root in nodes:
+        if root in seen:
+            continue
+
+        seen.add(root)
+        component = [root]
+        stack = [root]
+
+        while stack:
+            for neighbour in neighbours.get(stack.pop(), ()):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    component.append(neighbour)
+                    stack.append(neighbour)
+
+        components.append(component)
+
+    return components
+
+
+def shortest_paths[N: Hashable](
+    source: N,
+    target: N,
+    successors: Mapping[N, Iterable[N]],
+    predecessors: Mapping[N, Iterable[N]],
+    max_hops: int | None = None,
+) -> dict[N, int]:
+    """
+    Find all nodes on the shortest paths between two nodes of a directed graph using bidirectional breadth first search.
+
+    Nodes are mapped to their position along the paths, the result is empty if there is no path within `max_hops`.
+    """
+    if source == target:
+        return {source: 0}
+
+    forward, backward = {source: 0}, {target: 0}
+    forward_frontier, backward_frontier = [source], [target]
+    depth = 0
+    hops = None
+
+    while hops is None and forward_frontier and backward_frontier:
+        # Any path no longer than the combined depth of both searches would already have been found
+        if max_hops is not None and depth >= max_hops:
+            return {}
+
+        # Expand whichever frontier is smaller by one layer, checking if it meets the other search
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier = _expand_frontier(forward_frontier, successors, forward)
+            meeting = [node for node in forward_frontier if node in backward]
+        else:
+            backward_frontier = _expand_frontier(backward_frontier, predecessors, backward)
+            meeting = [node for node in backward_frontier if node in forward]
+
+        depth += 1
+
+        if meeting:
+            hops = min(forward[node] + backward[node] for node in meeting)
+
+    if hops is None or (max_hops is not None and hops > max_hops):
+        return {}
+
+    return _path_positions(hops, successors, predecessors, forward, backward)
+
+
+def _path_positions[N: Hashable](
+    hops: int,
+    successors: Mapping[N, Iterable[N]],
+    predecessors: Mapping[N, Iterable[N]],
+    forward: dict[N, int],
+    backward: dict[N, int],
+) -> dict[N, int]:
+    """Collect nodes on shortest paths by walking outwards from the nodes reached by both searches."""
+    positions = {
+        node: distance for node, distance in forward.items() if node in backward and distance + backward[node] == hops
+    }
+    stack = list(positions)
+
+    while stack:
+        position = positions[node := stack.pop()]
+
+        for predecessor in predecessors.get(node, ()):
+            if predecessor not in positions and forward.get(predecessor) == position - 1:
+                positions[predecessor] = position - 1
+                stack.append(predecessor)
+
+        for successor in successors.get(node, ()):
+            if successor not in positions and backward.get(successor) == hops - position - 1:
+                positions[successor] = position + 1
+                stack.append(successor)
+
+    return positions
+
+
+def _expand_frontier[N: Hashable](
+    frontier: list[N],
+    edges: Mapping[N, Iterable[N]],
+    distances: dict[N, int],
+) -> list[N]:
+    """Expand a breadth first search frontier by one layer, recording the distance to newly discovered nodes."""
+    expanded = []
+
+    for node in frontier:
+        for neighbour in edges.get(node, ()):
+            if neighbour not in distances:
+                distances[neighbour] = distances[node] + 1
+                expanded.append(neighbour)
+
+    return expanded
+
+
 def yarn_install(package_path: Path | None = None, node_modules_link: Path | None = None) -> None:
     """
     Run `yarn install` as a subprocess and optionally set a symbolic link to node_modules.
@@ -87,3 +266,89 @@ def yarn_install(package_path: Path | None = None, node_modules_link: Path | Non
 
     if package_path and node_modules_link:
         node_modules_link.symlink_to(package_path / "node_modules", target_is_directory=True)
+
+
+def quote_if_necessary(p: Stringable) -> str:
+    """
+    If `p` is not wrapped in `'`, `"`, or `<<>>`, escape double quotes and new line characters
+    and wrap `p` in double quotes.
+    """
+
+    def is_wrapped(p: str, s: str, e: str | None = None) -> bool:
+        return p.startswith(s) and p.endswith(s) if not e else p.startswith(s) and p.endswith(e)
+
+    if isinstance(p, str):
+        if is_wrapped(p, "<<", ">>") or is_wrapped(p, '"') or is_wrapped(p, "'"):
+            return p
+
+        else:
+            replace = {
+                '"': r"\"",
+                "\n": r"\n",
+                "\r": r"\r",
+            }
+
+            for a, b in replace.items():
+                p = p.replace(a, b)
+
+    return f'"{p}"'
+
+
+class DotChild:
+    """Represents a child of a DOT graph, ie. node/edge."""
+
+    __slots__ = ("attributes", "name")
+
+    def __init__(self, name: str, **attrs: Stringable) -> None:
+        self.name = name
+        self.attributes = attrs
+
+    def to_string(self) -> str:
+        if self.attributes:
+            return f"{self.name}[{', '.join(f'{k}={quote_if_necessary(v)}' for k, v in self.attributes.items())}];"
+        else:
+            return f"{self.name};"
+
+
+class DotGraph:
+    """
+    Represents a DOT graph and children.
+
+    Node and edge names are emitted as given, so names that are not valid DOT identifiers
+    (eg. containing spaces) should be passed through `quote_if_necessary` first.
+    """
+
+    INDENT = " " * 4
+
+    def __init__(
+        self,
+        name: str = "diagram",
+        *,
+        graph_type: str = "graph",
+        strict: bool = False,
+        **attrs: Stringable,
+    ) -> None:
+        self.name = name
+        self.graph_type = graph_type
+        self.strict = strict
+        self.attributes = attrs
+        self.nodes: list[DotChild] = []
+        self.edges: list[DotChild] = []
+
+    def add_node(self, name: str, **attrs: Stringable) -> None:
+        self.nodes.append(DotChild(name, **attrs))
+
+    def add_edge(self, src: str, dst: str, **attrs: Stringable) -> None:
+        connector = "->" if self.graph_type == "digraph" else "--"
+        self.edges.append(DotChild(f"{src} {connector} {dst}", **attrs))
+
+    def to_string(self) -> str:
+        indent = DotGraph.INDENT
+        output = [f'{"strict " if self.strict else ""}{self.graph_type} "{self.name}" ' + "{"]
+        output.extend(f"{indent}{k}={quote_if_necessary(v)};" for k, v in sorted(self.attributes.items()))
+        output.append("")
+        output.extend(f"{indent}{node.to_string().replace('\n', '\n' + indent)}\n" for node in self.nodes)
+        output.extend(f"{indent}{edge.to_string()}" for edge in self.edges)
+        output.append("}\n")
+
+        return "\n".join(output)